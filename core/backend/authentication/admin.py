@@ -2,12 +2,13 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from core.admin_performance import CachedAllValuesFieldListFilter
 from .models import CustomUser
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
     list_display = ('username', 'email', 'phone', 'is_staff', 'is_active', 'is_google_user')
-    list_filter = ('is_staff', 'is_active', 'country', 'city')
+    list_filter = ('is_staff', 'is_active', ('country', CachedAllValuesFieldListFilter), ('city', CachedAllValuesFieldListFilter))
     search_fields = ('username', 'email', 'phone')
     ordering = ('username',)
 
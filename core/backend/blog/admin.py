@@ -1,11 +1,13 @@
 from django.contrib import admin
+from backend.imaging.admin import force_reoptimize_images, optimize_images
 from .models import Blog
 
 class BlogAdmin(admin.ModelAdmin):
-    list_display = ('id','title', 'slug', 'is_published', 'created_at', 'updated_at', 'get_image_size', 'get_image_dimensions')
+    list_display = ('id','title', 'slug', 'is_published', 'created_at', 'updated_at', 'get_image_size', 'get_image_dimensions', 'image_status')
     list_filter = ('is_published', 'created_at', 'updated_at')
     search_fields = ('title', 'content')
     prepopulated_fields = {'slug': ('title',)}
+    actions = [optimize_images, force_reoptimize_images]
     
     def get_image_size(self, obj):
         """Display image size in admin list."""
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_alter_blog_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the optimized image', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='ready', editable=False, max_length=20),
+        ),
+    ]
@@ -2,13 +2,16 @@ from django.db import models
 from django.utils.text import slugify
 import os
 from PIL import Image
-from django.core.files.base import ContentFile
-from io import BytesIO
 from ckeditor.fields import RichTextField
+from backend.imaging.models import OptimizedImageMixin
 
 # Create your models here.
 
-class Blog(models.Model):
+class Blog(OptimizedImageMixin, models.Model):
+    # Blog images can be larger than product images
+    IMAGE_MAX_SIZE = (1600, 1200)
+    IMAGE_MAX_BYTES = int(1.5 * 1024 * 1024)
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True)
     content = RichTextField()
@@ -105,80 +108,5 @@ class Blog(models.Model):
         
         return cleaned_count
     
-    def optimize_image(self):
-        """Optimize the blog image to reduce file size."""
-        if not self.image:
-            return False
-            
-        try:
-            original_size = self.get_image_size()
-            self._original_image_size = original_size
-            
-            img = Image.open(self.image)
-            
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            original_width, original_height = img.size
-            
-            # Blog images can be larger than product images
-            max_width = 1600
-            max_height = 1200
-            
-            if original_width > max_width or original_height > max_height:
-                ratio = min(max_width / original_width, max_height / original_height)
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-                
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            buffer = BytesIO()
-            
-            quality = 85
-            max_size_mb = 1.5  # Blog images can be slightly larger
-            
-            while quality > 30: 
-                buffer.seek(0)
-                buffer.truncate(0)
-                
-                img.save(buffer, format='JPEG', quality=quality, optimize=True)
-                
-                buffer.seek(0)
-                file_size_mb = len(buffer.getvalue()) / (1024 * 1024)
-                
-                if file_size_mb <= max_size_mb:
-                    break
-                
-                quality -= 10  
-            
-            buffer.seek(0)
-            
-            file_name = f'{self.slug}_{self.id}_optimized.jpg'
-            
-            self.image.save(file_name, ContentFile(buffer.read()), save=False)
-            buffer.close()
-            
-            return True
-            
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Image optimization failed for blog {self.id}: {str(e)}")
-            return False
-    
-    def save(self, *args, **kwargs):
-        is_new_image = False
-        if self.pk:  
-            try:
-                old_blog = Blog.objects.get(pk=self.pk)
-                is_new_image = (old_blog.image != self.image)
-            except Blog.DoesNotExist:
-                is_new_image = True
-        else:
-            is_new_image = bool(self.image)
-        
-        super().save(*args, **kwargs)
-        
-        if is_new_image and self.image:
-            self.optimize_image()
-            super().save(update_fields=['image'])
\ No newline at end of file
+    def optimized_image_name(self):
+        return f'{self.slug}_{self.id}_optimized.jpg'
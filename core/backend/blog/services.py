@@ -0,0 +1,27 @@
+"""
+In-process blog queries shared by the blog API views and the template
+views in ``core.views``.
+"""
+from core.catalog_cache import cached, BLOG
+from .models import Blog
+from .serializers import BlogSerializer
+
+
+def get_published_blogs():
+    """Return published blog posts, newest first."""
+    return Blog.objects.filter(is_published=True).order_by('-created_at')
+
+
+@cached(BLOG, 'blog-list')
+def get_blog_list():
+    """Return serialized published blog posts."""
+    return BlogSerializer(get_published_blogs(), many=True).data
+
+
+@cached(BLOG, 'blog')
+def get_blog(blog_id):
+    """Return a serialized published blog post, or None if it does not exist."""
+    blog = get_published_blogs().filter(pk=blog_id).first()
+    if blog is None:
+        return None
+    return BlogSerializer(blog).data
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.catalog_cache import bump_version_on_commit, BLOG
+from .models import Blog
+
+
+@receiver([post_save, post_delete], sender=Blog)
+def invalidate_blog_cache(sender, **kwargs):
+    """Drop cached blog responses whenever a post changes."""
+    bump_version_on_commit(BLOG)
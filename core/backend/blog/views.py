@@ -4,15 +4,24 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Blog
 from .serializers import BlogSerializer
+from . import services
+from core.catalog_cache import cache_response, BLOG
 
 class BlogViewSet(viewsets.ModelViewSet):
-    queryset = Blog.objects.filter(is_published=True).order_by('-created_at')
+    queryset = services.get_published_blogs()
     serializer_class = BlogSerializer
     pagination_class = PageNumberPagination
     # lookup_field = 'id'
     
     def get_queryset(self):
         """Allow filtering by id."""
-        queryset = Blog.objects.filter(is_published=True).order_by('-created_at')
+        queryset = services.get_published_blogs()
         return queryset
-    
+
+    @cache_response(BLOG)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(BLOG)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -7,12 +7,14 @@ class CartItemInline(admin.TabularInline):
 
 class CartAdmin(admin.ModelAdmin):
     list_display = ('user', 'created_at')
+    list_select_related = ('user', 'guest_user')
     inlines = [CartItemInline]
     search_fields = ['user__username']
     list_filter = ['created_at']
 
 class CartItemAdmin(admin.ModelAdmin):
     list_display = ('cart', 'product', 'quantity')
+    list_select_related = ('cart__user', 'cart__guest_user', 'product')
     search_fields = ['product__name', 'cart__user__username']
     list_filter = ['product']
 
@@ -2,9 +2,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
-from .models import Cart, CartItem, GuestUser
-from backend.products.models import Product
+from .models import Cart, GuestUser
 from .serializers import CartItemSerializer
+from . import services as cart_services
 
 
 class GuestRemoveFromCartView(APIView):
@@ -45,21 +45,11 @@ class GuestRemoveFromCartView(APIView):
                 )
 
             try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
-                return Response(
-                    {'error': 'Product not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                product_name = cart_item.product.name
-                cart_item.delete()
+                product = cart_services.remove_item(cart, product_id)
                 return Response({
-                    'message': f'Successfully removed {product_name} from cart'
+                    'message': f'Successfully removed {product.name} from cart'
                 }, status=status.HTTP_200_OK)
-            except CartItem.DoesNotExist:
+            except cart_services.CartItemNotFound:
                 return Response(
                     {'error': 'Item not found in cart'}, 
                     status=status.HTTP_404_NOT_FOUND
@@ -110,30 +100,17 @@ class GuestDecreaseCartItemView(APIView):
                 )
 
             try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
-                return Response(
-                    {'error': 'Product not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                cart_item.quantity -= 1
-                
-                if cart_item.quantity <= 0:
-                    cart_item.delete()
+                cart_item, removed = cart_services.decrease_item(cart, product_id)
+                if removed:
                     return Response({
-                        'message': f'Removed {product.name} from cart (quantity reached 0)'
-                    }, status=status.HTTP_200_OK)
-                else:
-                    cart_item.save()
-                    return Response({
-                        'message': f'Decreased quantity for {product.name}',
-                        'item': CartItemSerializer(cart_item).data
+                        'message': f'Removed {cart_item.product.name} from cart (quantity reached 0)'
                     }, status=status.HTTP_200_OK)
+                return Response({
+                    'message': f'Decreased quantity for {cart_item.product.name}',
+                    'item': CartItemSerializer(cart_item).data
+                }, status=status.HTTP_200_OK)
                     
-            except CartItem.DoesNotExist:
+            except cart_services.CartItemNotFound:
                 return Response(
                     {'error': 'Item not found in cart'}, 
                     status=status.HTTP_404_NOT_FOUND
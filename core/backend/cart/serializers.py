@@ -29,18 +29,11 @@ class CartItemSerializer(serializers.ModelSerializer):
 
 
 class AddCartItemSerializer(serializers.Serializer):
+    # Existence is checked by the view, which needs the product anyway
     product_id = serializers.IntegerField(
         help_text="ID of the product to add to cart"
     )
 
-    def validate_product_id(self, value):
-        """Validate that product exists"""
-        try:
-            Product.objects.get(id=value)
-        except Product.DoesNotExist:
-            raise serializers.ValidationError("Product does not exist")
-        return value
-
 
 class UpdateCartItemSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(
@@ -50,6 +43,10 @@ class UpdateCartItemSerializer(serializers.Serializer):
 
 
 class CartSerializer(serializers.ModelSerializer):
+    """
+    Cart with its items and totals. Load the cart with
+    services.prefetch_items() so items and products come from one query.
+    """
     items = CartItemSerializer(many=True, read_only=True)
     subtotal = serializers.SerializerMethodField()
     total = serializers.SerializerMethodField()
@@ -60,18 +57,34 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'created_at', 'items', 'subtotal', 'total', 'item_count', 'total_quantity']
 
+    def get_summary(self, obj):
+        """Compute subtotal, item count and total quantity in a single pass over the items."""
+        summary = getattr(obj, '_summary', None)
+        if summary is None:
+            subtotal = Decimal('0')
+            item_count = 0
+            total_quantity = 0
+            for item in obj.items.all():
+                subtotal += item.product.price * item.quantity
+                item_count += 1
+                total_quantity += item.quantity
+            summary = obj._summary = {
+                'subtotal': subtotal,
+                'item_count': item_count,
+                'total_quantity': total_quantity,
+            }
+        return summary
+
     def get_subtotal(self, obj):
-        subtotal = sum(item.product.price * item.quantity for item in obj.items.all())
-        return f"{subtotal:.2f}"
+        return f"{self.get_summary(obj)['subtotal']:.2f}"
 
     def get_total(self, obj):
-        subtotal = sum(item.product.price * item.quantity for item in obj.items.all())
-        return f"{subtotal:.2f}"
+        return f"{self.get_summary(obj)['subtotal']:.2f}"
 
     def get_item_count(self, obj):
         """Get total number of unique items in cart"""
-        return obj.items.count()
+        return self.get_summary(obj)['item_count']
 
     def get_total_quantity(self, obj):
         """Get total quantity of all items in cart (sum of all quantities)"""
-        return sum(item.quantity for item in obj.items.all())
+        return self.get_summary(obj)['total_quantity']
@@ -0,0 +1,92 @@
+"""
+Cart mutations shared by the user and guest cart views.
+
+Quantities are changed with single conditional statements (an upsert or
+an F() update) instead of read-modify-write, so concurrent clicks on the
+same item never lose updates.
+"""
+from django.db import connection, transaction
+from django.db.models import F, Prefetch, prefetch_related_objects
+from .models import CartItem
+
+
+class CartItemNotFound(Exception):
+    """Raised when the product is not in the cart."""
+
+
+def prefetch_items(cart):
+    """Load a cart's items together with their products in a single query."""
+    prefetch_related_objects(
+        [cart],
+        Prefetch('items', queryset=CartItem.objects.select_related('product').order_by('id'))
+    )
+    return cart
+
+
+def add_item(cart, product, quantity=1):
+    """
+    Add a product to the cart, or increase its quantity if it is already there,
+    with one INSERT ... ON CONFLICT statement (PostgreSQL and SQLite 3.35+).
+    Returns (cart_item, created).
+    """
+    table = connection.ops.quote_name(CartItem._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (cart_id, product_id, quantity) VALUES (%s, %s, %s) '
+            f'ON CONFLICT (cart_id, product_id) '
+            f'DO UPDATE SET quantity = {table}.quantity + EXCLUDED.quantity '
+            f'RETURNING id, quantity',
+            [cart.pk, product.pk, quantity]
+        )
+        item_id, new_quantity = cursor.fetchone()
+
+    cart_item = CartItem(id=item_id, cart=cart, product=product, quantity=new_quantity)
+    # Existing items always hold at least one unit, so the stored quantity
+    # only equals the added quantity when the row was just inserted.
+    return cart_item, new_quantity == quantity
+
+
+def _get_item(cart, product_id):
+    return CartItem.objects.select_related('product').get(cart=cart, product_id=product_id)
+
+
+def increase_item(cart, product_id):
+    """Increase the quantity of a cart item by one. Returns the updated item."""
+    updated = CartItem.objects.filter(cart=cart, product_id=product_id).update(quantity=F('quantity') + 1)
+    if not updated:
+        raise CartItemNotFound
+    return _get_item(cart, product_id)
+
+
+def decrease_item(cart, product_id):
+    """
+    Decrease the quantity of a cart item by one, deleting it when it would
+    reach zero. Returns (cart_item, removed).
+    """
+    with transaction.atomic():
+        updated = (
+            CartItem.objects.filter(cart=cart, product_id=product_id, quantity__gt=1)
+            .update(quantity=F('quantity') - 1)
+        )
+        try:
+            cart_item = _get_item(cart, product_id)
+        except CartItem.DoesNotExist:
+            raise CartItemNotFound
+        if updated:
+            return cart_item, False
+
+        deleted, _ = CartItem.objects.filter(pk=cart_item.pk, quantity__lte=1).delete()
+        if not deleted:
+            # Quantity was raised concurrently; decrement it instead
+            return decrease_item(cart, product_id)
+        return cart_item, True
+
+
+def remove_item(cart, product_id):
+    """Remove a product from the cart. Returns the removed item's product."""
+    try:
+        cart_item = _get_item(cart, product_id)
+    except CartItem.DoesNotExist:
+        raise CartItemNotFound
+    CartItem.objects.filter(pk=cart_item.pk).delete()
+    return cart_item.product
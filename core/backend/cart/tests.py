@@ -1,3 +1,205 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from backend.products.models import Product
+from .models import Cart, CartItem, GuestUser
+from .services import CartItemNotFound, add_item, decrease_item, increase_item
 
-# Create your tests here.
+CART_SIZES = (1, 20, 200)
+
+
+class CartQueryCountTests(TestCase):
+    """Cart reads and writes must cost the same number of queries however many items the cart holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = Product.objects.bulk_create(
+            Product(name=f'Product {index}', sku=f'SKU-{index}', price=100 + index)
+            for index in range(max(CART_SIZES) + 1)
+        )
+        # The extra product is in no cart, so adding it creates a new item
+        cls.extra = cls.products[-1]
+
+    def make_cart(self, size, guest=False):
+        if guest:
+            cart = Cart.objects.create(guest_user=GuestUser.objects.create())
+        else:
+            user = get_user_model().objects.create_user(
+                username=f'shopper-{size}', email=f'shopper-{size}@example.com'
+            )
+            cart = Cart.objects.create(user=user)
+        CartItem.objects.bulk_create(
+            CartItem(cart=cart, product=product, quantity=2) for product in self.products[:size]
+        )
+        return cart
+
+    def client_for(self, cart):
+        client = APIClient()
+        if cart.user:
+            client.force_authenticate(cart.user)
+        return client
+
+    def assertConstantQueries(self, request, guest=False):
+        """Run request(client, cart) against carts of every size; all must use the queries of the smallest."""
+        expected = None
+        for size in CART_SIZES:
+            cart = self.make_cart(size, guest=guest)
+            client = self.client_for(cart)
+            with self.subTest(items=size):
+                if expected is None:
+                    with CaptureQueriesContext(connection) as queries:
+                        response = request(client, cart)
+                    expected = len(queries.captured_queries)
+                else:
+                    with self.assertNumQueries(expected):
+                        response = request(client, cart)
+                self.assertLess(response.status_code, 300, response.data)
+
+    def test_read_cart(self):
+        def read(client, cart):
+            response = client.get('/api/cart/')
+            self.assertEqual(len(response.data['items']), cart.items.count())
+            return response
+        self.assertConstantQueries(read)
+
+    def test_read_guest_cart(self):
+        self.assertConstantQueries(
+            lambda client, cart: client.get('/api/cart/guest/', HTTP_X_GUEST_TOKEN=cart.guest_user.guest_token),
+            guest=True
+        )
+
+    def test_add_new_item(self):
+        self.assertConstantQueries(
+            lambda client, cart: client.post('/api/cart/add/', {'product_id': self.extra.id}, format='json')
+        )
+
+    def test_add_existing_item(self):
+        self.assertConstantQueries(
+            lambda client, cart: client.post('/api/cart/add/', {'product_id': self.products[0].id}, format='json')
+        )
+
+    def test_increase_item(self):
+        self.assertConstantQueries(
+            lambda client, cart: client.put(f'/api/cart/update/{self.products[0].id}/')
+        )
+
+    def test_decrease_item(self):
+        self.assertConstantQueries(
+            lambda client, cart: client.put(f'/api/cart/decrease/{self.products[0].id}/')
+        )
+
+    def test_remove_item(self):
+        self.assertConstantQueries(
+            lambda client, cart: client.delete(f'/api/cart/remove/{self.products[0].id}/')
+        )
+
+
+class CartMutationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+        cls.other = Product.objects.create(name='Attar', sku='ATTAR', price=200)
+
+    def setUp(self):
+        self.cart = Cart.objects.create(guest_user=GuestUser.objects.create())
+
+    def quantity(self, product=None):
+        return CartItem.objects.get(cart=self.cart, product=product or self.product).quantity
+
+    def test_add_item_inserts_then_increments(self):
+        item, created = add_item(self.cart, self.product)
+        self.assertTrue(created)
+        self.assertEqual(item.quantity, 1)
+
+        item, created = add_item(self.cart, self.product, quantity=3)
+        self.assertFalse(created)
+        self.assertEqual((item.quantity, self.quantity()), (4, 4))
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 1)
+
+        add_item(self.cart, self.other)
+        self.assertEqual((self.quantity(), self.quantity(self.other)), (4, 1))
+
+    def test_increase_item(self):
+        add_item(self.cart, self.product)
+        self.assertEqual(increase_item(self.cart, self.product.id).quantity, 2)
+        self.assertEqual(self.quantity(), 2)
+        with self.assertRaises(CartItemNotFound):
+            increase_item(self.cart, self.other.id)
+
+    def test_decrease_item_deletes_the_last_unit(self):
+        add_item(self.cart, self.product, quantity=2)
+        item, removed = decrease_item(self.cart, self.product.id)
+        self.assertEqual((item.quantity, removed), (1, False))
+
+        item, removed = decrease_item(self.cart, self.product.id)
+        self.assertTrue(removed)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        with self.assertRaises(CartItemNotFound):
+            decrease_item(self.cart, self.product.id)
+
+    def test_endpoints_change_quantities(self):
+        user = get_user_model().objects.create_user(username='shopper', email='shopper@example.com')
+        self.cart = Cart.objects.create(user=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        for _ in range(2):
+            client.post('/api/cart/add/', {'product_id': self.product.id}, format='json')
+        client.put(f'/api/cart/update/{self.product.id}/')
+        self.assertEqual(self.quantity(), 3)
+
+        for _ in range(3):
+            response = client.put(f'/api/cart/decrease/{self.product.id}/')
+            self.assertLess(response.status_code, 300, response.data)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+
+
+def retry_locked(mutate):
+    """Run mutate() in its own connection, retrying SQLite's immediate table-lock errors."""
+    try:
+        while True:
+            try:
+                return mutate()
+            except OperationalError:
+                # The in-memory SQLite test database reports a locked table at
+                # once instead of waiting; the statement changed nothing, so retry
+                if connection.vendor != 'sqlite':
+                    raise
+    finally:
+        connection.close()
+
+
+class ConcurrentCartMutationTests(TransactionTestCase):
+    """Concurrent clicks on the same item must never lose an update."""
+
+    CLICKS = 40
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+        self.cart = Cart.objects.create(guest_user=GuestUser.objects.create())
+
+    def run_parallel(self, mutate):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(lambda _: retry_locked(mutate), range(self.CLICKS)))
+
+    def test_concurrent_adds(self):
+        results = self.run_parallel(lambda: add_item(self.cart, self.product))
+        self.assertEqual([created for _, created in results].count(True), 1)
+        self.assertEqual(CartItem.objects.get(cart=self.cart, product=self.product).quantity, self.CLICKS)
+
+    def test_concurrent_decreases(self):
+        add_item(self.cart, self.product, quantity=self.CLICKS // 2)
+
+        def decrease():
+            try:
+                return decrease_item(self.cart, self.product.id)[1]
+            except CartItemNotFound:
+                return None
+
+        results = self.run_parallel(decrease)
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(results.count(False), self.CLICKS // 2 - 1)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
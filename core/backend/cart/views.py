@@ -3,9 +3,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from django.core.exceptions import ObjectDoesNotExist
-from .models import Cart, CartItem, GuestUser
+from .models import Cart, GuestUser
 from backend.products.models import Product
 from .serializers import CartSerializer, CartItemSerializer, AddCartItemSerializer, UpdateCartItemSerializer
+from . import services as cart_services
 import uuid
 
 
@@ -27,7 +28,7 @@ class CartView(APIView):
         """Get user's cart with all items"""
         try:
             cart = self.get_cart(request.user)
-            serializer = CartSerializer(cart)
+            serializer = CartSerializer(cart_services.prefetch_items(cart))
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
@@ -100,7 +101,6 @@ class AddToCartView(APIView):
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            cart = self.get_cart(request.user)
             product_id = serializer.validated_data['product_id']
             quantity = 1
 
@@ -112,20 +112,15 @@ class AddToCartView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                cart_item.quantity += quantity
-                cart_item.save()
-                message = f'Updated quantity for {product.name}'
-                status_code = status.HTTP_200_OK
-            except CartItem.DoesNotExist:
-                cart_item = CartItem.objects.create(
-                    cart=cart, 
-                    product=product, 
-                    quantity=quantity
-                )
+            cart = self.get_cart(request.user)
+
+            cart_item, created = cart_services.add_item(cart, product, quantity)
+            if created:
                 message = f'Added {product.name} to cart'
                 status_code = status.HTTP_201_CREATED
+            else:
+                message = f'Updated quantity for {product.name}'
+                status_code = status.HTTP_200_OK
 
             return Response({
                 'message': message,
@@ -166,21 +161,11 @@ class RemoveFromCartView(APIView):
                 )
 
             try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
-                return Response(
-                    {'error': 'Product not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                product_name = cart_item.product.name
-                cart_item.delete()
+                product = cart_services.remove_item(cart, product_id)
                 return Response({
-                    'message': f'Successfully removed {product_name} from cart'
+                    'message': f'Successfully removed {product.name} from cart'
                 }, status=status.HTTP_200_OK)
-            except CartItem.DoesNotExist:
+            except cart_services.CartItemNotFound:
                 return Response(
                     {'error': 'Item not found in cart'}, 
                     status=status.HTTP_404_NOT_FOUND
@@ -220,22 +205,12 @@ class UpdateCartItemView(APIView):
                 )
 
             try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
-                return Response(
-                    {'error': 'Product not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                cart_item.quantity += 1
-                cart_item.save()
+                cart_item = cart_services.increase_item(cart, product_id)
                 return Response({
-                    'message': f'Updated quantity for {product.name}',
+                    'message': f'Updated quantity for {cart_item.product.name}',
                     'item': CartItemSerializer(cart_item).data
                 }, status=status.HTTP_200_OK)
-            except CartItem.DoesNotExist:
+            except cart_services.CartItemNotFound:
                 return Response(
                     {'error': 'Item not found in cart'}, 
                     status=status.HTTP_404_NOT_FOUND
@@ -275,30 +250,17 @@ class DecreaseCartItemView(APIView):
                 )
 
             try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
-                return Response(
-                    {'error': 'Product not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                cart_item.quantity -= 1
-                
-                if cart_item.quantity <= 0:
-                    cart_item.delete()
-                    return Response({
-                        'message': f'Removed {product.name} from cart (quantity reached 0)'
-                    }, status=status.HTTP_200_OK)
-                else:
-                    cart_item.save()
+                cart_item, removed = cart_services.decrease_item(cart, product_id)
+                if removed:
                     return Response({
-                        'message': f'Decreased quantity for {product.name}',
-                        'item': CartItemSerializer(cart_item).data
+                        'message': f'Removed {cart_item.product.name} from cart (quantity reached 0)'
                     }, status=status.HTTP_200_OK)
+                return Response({
+                    'message': f'Decreased quantity for {cart_item.product.name}',
+                    'item': CartItemSerializer(cart_item).data
+                }, status=status.HTTP_200_OK)
                     
-            except CartItem.DoesNotExist:
+            except cart_services.CartItemNotFound:
                 return Response(
                     {'error': 'Item not found in cart'}, 
                     status=status.HTTP_404_NOT_FOUND
@@ -407,13 +369,6 @@ class GuestAddToCartView(APIView):
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            cart, error = self.get_cart(guest_token)
-            if error:
-                return Response(
-                    {'error': error},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
             product_id = serializer.validated_data['product_id']
             quantity = 1
 
@@ -425,20 +380,20 @@ class GuestAddToCartView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            try:
-                cart_item = CartItem.objects.get(cart=cart, product=product)
-                cart_item.quantity += quantity
-                cart_item.save()
-                message = f'Updated quantity for {product.name}'
-                status_code = status.HTTP_200_OK
-            except CartItem.DoesNotExist:
-                cart_item = CartItem.objects.create(
-                    cart=cart, 
-                    product=product, 
-                    quantity=quantity
+            cart, error = self.get_cart(guest_token)
+            if error:
+                return Response(
+                    {'error': error},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
+
+            cart_item, created = cart_services.add_item(cart, product, quantity)
+            if created:
                 message = f'Added {product.name} to cart'
                 status_code = status.HTTP_201_CREATED
+            else:
+                message = f'Updated quantity for {product.name}'
+                status_code = status.HTTP_200_OK
 
             return Response({
                 'message': message,
@@ -490,7 +445,7 @@ class GuestCartView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            serializer = CartSerializer(cart)
+            serializer = CartSerializer(cart_services.prefetch_items(cart))
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
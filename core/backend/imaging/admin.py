@@ -0,0 +1,27 @@
+from django.contrib import admin
+from .models import ImageVariant
+from .services import queue_optimization
+
+
+@admin.action(description='Optimize images of the selected rows')
+def optimize_images(modeladmin, request, queryset):
+    """Queue the selected images for the image worker."""
+    queued = queue_optimization(queryset)
+    modeladmin.message_user(request, f'Queued {queued} images for optimization.')
+
+
+@admin.action(description='Force re-optimize images of the selected rows')
+def force_reoptimize_images(modeladmin, request, queryset):
+    """Queue the selected images for the image worker, even optimized ones."""
+    queued = queue_optimization(queryset, force=True)
+    modeladmin.message_user(request, f'Queued {queued} images for re-optimization.')
+
+
+@admin.register(ImageVariant)
+class ImageVariantAdmin(admin.ModelAdmin):
+    """Admin interface for generated responsive image variants."""
+
+    list_display = ('source_hash', 'format', 'width', 'height', 'size', 'created_at')
+    list_filter = ('format', 'width')
+    search_fields = ('source_hash',)
+    readonly_fields = ('source_hash', 'format', 'width', 'height', 'file', 'size', 'created_at')
@@ -0,0 +1,87 @@
+"""
+Pillow helpers shared by the image jobs in processing.py.
+
+- open_image() asks the JPEG decoder for a reduced-size draft when the
+  image will be scaled down anyway, so large photos decode at 1/2, 1/4 or
+  1/8 scale instead of full size.
+- downscale() shrinks by an integer factor with Image.reduce() before the
+  final LANCZOS resize, which then works on far fewer pixels.
+- encode_jpeg() finds the highest quality fitting a byte budget by
+  bisection. Probes are encoded exactly like the final file, so the result
+  is never below the quality the old 85, 75, ... 35 loop picked, and the
+  last fitting probe is returned as is instead of being encoded again.
+"""
+from io import BytesIO
+from PIL import Image
+
+# Quality range searched by encode_jpeg()
+MAX_QUALITY = 85
+MIN_QUALITY = 35
+
+
+def fit_size(size, max_size):
+    """`size` scaled down to fit within `max_size`, keeping its aspect ratio."""
+    width, height = size
+    max_width, max_height = max_size
+    if width <= max_width and height <= max_height:
+        return size
+    ratio = min(max_width / width, max_height / height)
+    return max(int(width * ratio), 1), max(int(height * ratio), 1)
+
+
+def open_image(data, max_size=None):
+    """Open image bytes as an RGB image, decoding JPEGs at reduced scale when they will fit `max_size`."""
+    img = Image.open(BytesIO(data))
+    if max_size:
+        target = fit_size(img.size, max_size)
+        if target != img.size:
+            # No-op for formats other than JPEG; the draft is never smaller than target
+            img.draft('RGB', target)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
+
+def downscale(img, size):
+    """Resize `img` to `size`, first reducing it by an integer factor when it is at least twice as large."""
+    if img.size == size:
+        return img
+    factor = min(img.width // size[0], img.height // size[1]) // 2
+    if factor > 1:
+        img = img.reduce(factor)
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def encode(img, pillow_format, **options):
+    buffer = BytesIO()
+    img.save(buffer, format=pillow_format, **options)
+    return buffer.getvalue()
+
+
+def encode_jpeg(img, max_bytes, max_quality=MAX_QUALITY, min_quality=MIN_QUALITY):
+    """
+    Encode `img` as JPEG with the highest quality from min_quality to
+    max_quality whose output fits `max_bytes`, or at min_quality if none does.
+    """
+    data = encode(img, 'JPEG', quality=max_quality, optimize=True)
+    if len(data) <= max_bytes:
+        return data
+
+    buffer = BytesIO()
+    best = None
+
+    # high never fits; low is the highest quality known to fit, or min_quality
+    low, high = min_quality, max_quality
+    while high - low > 1:
+        quality = (low + high) // 2
+        buffer.seek(0)
+        buffer.truncate(0)
+        img.save(buffer, format='JPEG', quality=quality, optimize=True)
+        if buffer.tell() <= max_bytes:
+            low = quality
+            best = buffer.getvalue()
+        else:
+            high = quality
+    if best is None:
+        return encode(img, 'JPEG', quality=min_quality, optimize=True)
+    return best
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from backend.imaging.models import ImageVariant
+from backend.imaging.services import image_models
+
+
+def file_fields():
+    """(model, [file field names]) of every installed model with file fields."""
+    for model in apps.get_models():
+        fields = [field.name for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+        if fields:
+            yield model, fields
+
+
+def is_referenced(name, fields_by_model):
+    """Whether any file field currently references `name`."""
+    for model, fields in fields_by_model:
+        query = Q()
+        for field_name in fields:
+            query |= Q(**{field_name: name})
+        if model._base_manager.filter(query).exists():
+            return True
+    return False
+
+
+def orphan_variants(cutoff):
+    """Variants created before `cutoff` whose content no image model holds any more."""
+    orphans = ImageVariant.objects.filter(created_at__lte=cutoff)
+    for model in image_models():
+        orphans = orphans.exclude(source_hash__in=model._base_manager.exclude(image_hash='').values('image_hash'))
+    return orphans
+
+
+def walk(storage, directory):
+    """Yield the names of all files below `directory` of `storage`."""
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for name in directories:
+        yield from walk(storage, f'{directory}/{name}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete media files no model file field references any more. Only the upload '
+        'directories of file fields are scanned, and recently written files are kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List the files without deleting them')
+        parser.add_argument('--min-age-hours', type=int, default=settings.MEDIA_GC_MIN_AGE_HOURS,
+                            help='Keep unreferenced files modified more recently than this')
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        cutoff = timezone.now() - timedelta(hours=options['min_age_hours'])
+
+        # Variants of images that were replaced or deleted; their files are collected below
+        orphans = orphan_variants(cutoff)
+        orphan_files = set(orphans.values_list('file', flat=True))
+        if options['dry_run']:
+            self.stdout.write(f'Would delete {len(orphan_files)} variants of images no longer in use')
+        else:
+            pruned, _ = orphans.delete()
+            self.stdout.write(f'Deleted {pruned} variants of images no longer in use')
+
+        fields_by_model = list(file_fields())
+        referenced = set()
+        directories = set()
+        for model, fields in fields_by_model:
+            for field_name in fields:
+                upload_to = model._meta.get_field(field_name).upload_to
+                if isinstance(upload_to, str) and upload_to.strip('/'):
+                    directories.add(upload_to.strip('/').split('/')[0])
+            for names in model._base_manager.values_list(*fields).iterator():
+                referenced.update(name for name in names if name)
+        # Directories of callable upload_to, known from the files they produced
+        directories.update(name.split('/')[0] for name in referenced | orphan_files if '/' in name)
+        # A dry run keeps the orphan variants, but their files count as unreferenced
+        referenced -= orphan_files
+
+        deleted = kept = freed = 0
+        for directory in sorted(directories):
+            if not storage.exists(directory):
+                continue
+            for name in walk(storage, directory):
+                if name in referenced:
+                    continue
+                if storage.get_modified_time(name) > cutoff:
+                    kept += 1
+                    continue
+                size = storage.size(name)
+                if options['dry_run']:
+                    self.stdout.write(f'Would delete {name}')
+                elif is_referenced(name, fields_by_model):
+                    # Referenced by an upload saved since the scan started
+                    continue
+                else:
+                    storage.delete(name)
+                deleted += 1
+                freed += size
+
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {deleted} unreferenced files ({freed / (1024 * 1024):.1f} MB); '
+            f'kept {kept} recent unreferenced files'
+        ))
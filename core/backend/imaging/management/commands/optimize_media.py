@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from backend.imaging.services import (IMAGE_MODELS, image_models, pending_count, process_pending,
+                                      queue_optimization, reset_interrupted)
+
+
+class Command(BaseCommand):
+    help = (
+        'Queue and optimize the images of every image model (or of --model) in a process pool. '
+        'Progress is kept in the database: run again without --force to resume an interrupted run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=list(IMAGE_MODELS),
+                            help='Only optimize images of this model; may be repeated')
+        parser.add_argument('--force', action='store_true',
+                            help='Encode images again even if they are already optimized')
+        parser.add_argument('--queue-only', action='store_true',
+                            help='Only queue the images for the running image worker')
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Images encoded in parallel (default: one per CPU)')
+        parser.add_argument('--batch-size', type=int, default=settings.IMAGE_WORKER_BATCH_SIZE,
+                            help='Images claimed per model and batch')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--processes and --batch-size must be positive')
+        models = image_models(options['models'])
+
+        for model in models:
+            queued = queue_optimization(model.objects.all(), force=options['force'])
+            self.stdout.write(f'Queued {queued} {model._meta.label} images')
+        if options['queue_only']:
+            return
+
+        requeued = reset_interrupted(models)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} images left processing by a previous run')
+
+        total = pending_count(models)
+        totals = [0, 0, 0]
+        with ProcessPoolExecutor(max_workers=options['processes']) as executor:
+            try:
+                while True:
+                    counts = process_pending(executor, options['batch_size'], models)
+                    if not any(counts):
+                        break
+                    totals = [done + count for done, count in zip(totals, counts)]
+                    self.stdout.write(
+                        '[{}/{}] optimized {}, already optimized {}, failed {}'.format(sum(totals), total, *totals)
+                    )
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING('Interrupted; run the command again to resume'))
+        self.stdout.write(self.style.SUCCESS('Optimized {}, already optimized {}, failed {}'.format(*totals)))
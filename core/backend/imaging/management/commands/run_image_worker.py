@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from backend.imaging.services import process_pending, reset_interrupted
+
+
+class Command(BaseCommand):
+    help = 'Optimize uploaded images in a process pool. Runs until interrupted unless --once is given; run a single instance.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Optimize the pending images and exit')
+        parser.add_argument('--processes', type=int, default=settings.IMAGE_WORKER_PROCESSES,
+                            help='Images encoded in parallel')
+        parser.add_argument('--batch-size', type=int, default=settings.IMAGE_WORKER_BATCH_SIZE,
+                            help='Images claimed per model and batch')
+        parser.add_argument('--poll-interval', type=float, default=settings.IMAGE_WORKER_POLL_INTERVAL,
+                            help='Seconds between checks for new images')
+
+    def handle(self, *args, **options):
+        requeued = reset_interrupted()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} images left processing by a previous worker')
+
+        totals = [0, 0, 0]
+        with ProcessPoolExecutor(max_workers=options['processes']) as executor:
+            try:
+                while True:
+                    counts = process_pending(executor, options['batch_size'])
+                    totals = [total + count for total, count in zip(totals, counts)]
+                    if any(counts):
+                        self.stdout.write('Optimized {}, already optimized {}, failed {}'.format(*counts))
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS('Optimized {}, already optimized {}, failed {}'.format(*totals)))
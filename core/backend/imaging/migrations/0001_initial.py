@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 16:57
+
+import backend.imaging.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(db_index=True, max_length=64)),
+                ('format', models.CharField(choices=[('avif', 'AVIF'), ('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=10)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('file', models.FileField(max_length=255, upload_to=backend.imaging.models.variant_upload_to)),
+                ('size', models.PositiveIntegerField(help_text='File size in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['source_hash', 'format', 'width'],
+                'unique_together': {('source_hash', 'format', 'width')},
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+from django.db import models
+
+IMAGE_STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('processing', 'Processing'),
+    ('ready', 'Ready'),
+    ('failed', 'Failed'),
+]
+
+
+class OptimizedImageMixin(models.Model):
+    """
+    Adds background optimization of a model's ``image`` field.
+
+    Saving a new or replaced image only marks it pending; the image worker
+    (``manage.py run_image_worker``) optimizes it later. image_hash is the
+    SHA-256 of the optimized file, so an image that was already optimized
+    is recognized and never encoded twice.
+
+    Subclasses set IMAGE_MAX_SIZE, IMAGE_MAX_BYTES and optimized_image_name(),
+    and IMAGE_RELATED for relations that name uses.
+    """
+    IMAGE_MAX_SIZE = (1200, 1200)
+    IMAGE_MAX_BYTES = 1024 * 1024
+    IMAGE_RELATED = ()
+
+    image_status = models.CharField(max_length=20, choices=IMAGE_STATUS_CHOICES, default='ready', db_index=True, editable=False)
+    image_hash = models.CharField(max_length=64, blank=True, editable=False, help_text="SHA-256 of the optimized image")
+    image_claimed_at = models.DateTimeField(null=True, blank=True, editable=False, help_text="When a worker started processing the image")
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored file name so save() can spot a new image without a query
+        instance._loaded_image_name = instance.__dict__.get('image')
+        return instance
+
+    def optimized_image_name(self):
+        return f'{self._meta.model_name}_{self.pk}_optimized.jpg'
+
+    def _image_changed(self):
+        name = self.image.name if self.image else None
+        if self._state.adding:
+            return bool(name)
+        if not hasattr(self, '_loaded_image_name'):
+            stored = type(self)._base_manager.filter(pk=self.pk).values_list('image', flat=True).first()
+            return (stored or None) != name
+        return (self._loaded_image_name or None) != name
+
+    def save(self, *args, **kwargs):
+        if self._image_changed():
+            # image_hash is kept: re-uploading an optimized file is recognized by it
+            self.image_status = 'pending' if self.image else 'ready'
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'image_status'}
+        super().save(*args, **kwargs)
+        self._loaded_image_name = self.image.name if self.image else None
+
+
+def variant_upload_to(instance, filename):
+    return f'image_variants/{instance.source_hash[:2]}/{filename}'
+
+
+class ImageVariant(models.Model):
+    """
+    A resized copy of an optimized image in one format. Variants belong to
+    image content (the image_hash of OptimizedImageMixin models), so images
+    with the same content share them.
+    """
+    FORMAT_CHOICES = [
+        ('avif', 'AVIF'),
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+    source_hash = models.CharField(max_length=64, db_index=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.FileField(upload_to=variant_upload_to, max_length=255)
+    size = models.PositiveIntegerField(help_text="File size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['source_hash', 'format', 'width']
+        unique_together = ['source_hash', 'format', 'width']
+
+    def __str__(self):
+        return f"{self.source_hash[:12]} {self.width}w {self.format}"
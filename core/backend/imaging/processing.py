@@ -0,0 +1,68 @@
+"""
+Image encoding run in the image worker's process pool.
+
+Functions here take and return bytes and never touch Django, so they can
+run in separate processes.
+"""
+import hashlib
+from PIL import features
+from .encoding import downscale, encode, encode_jpeg, fit_size, open_image
+
+# Pillow format name, MIME type and encoder options of each variant format
+VARIANT_FORMATS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 50}),
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def optimize_image_bytes(data, max_size, max_bytes):
+    """
+    Return `data` re-encoded as JPEG, scaled down to fit `max_size` and
+    with the highest quality (85 down to 35) that fits `max_bytes`.
+    """
+    img = open_image(data, max_size)
+    img = downscale(img, fit_size(img.size, max_size))
+    return encode_jpeg(img, max_bytes)
+
+
+def available_formats():
+    """Variant formats this Pillow build can encode, smallest first."""
+    return [name for name in VARIANT_FORMATS if name == 'jpeg' or features.check(name)]
+
+
+def variant_widths(width, ladder):
+    """Ladder widths narrower than the image, plus the image's own width up to the top rung."""
+    widths = [rung for rung in ladder if rung < width]
+    if width <= max(ladder):
+        widths.append(width)
+    return widths
+
+
+def generate_variants(data, ladder, formats):
+    """Return [(format, width, height, bytes)] of `data` resized to each ladder width."""
+    img = open_image(data)
+
+    variants = []
+    for width in variant_widths(img.width, ladder):
+        height = max(round(img.height * width / img.width), 1)
+        resized = downscale(img, (width, height))
+        for name in formats:
+            pillow_format, _, options = VARIANT_FORMATS[name]
+            variants.append((name, width, height, encode(resized, pillow_format, **options)))
+    return variants
+
+
+def process_image(data, max_size, max_bytes, ladder, formats, optimize=True):
+    """
+    Worker job: optimize `data` (unless it is already optimized) and build
+    its variants. Returns (optimized bytes or None, variants).
+    """
+    optimized = optimize_image_bytes(data, max_size, max_bytes) if optimize else None
+    return optimized, generate_variants(optimized or data, ladder, formats)
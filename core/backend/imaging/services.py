@@ -0,0 +1,180 @@
+"""
+Background image optimization.
+
+Models using OptimizedImageMixin are listed in IMAGE_MODELS. Their rows
+with image_status 'pending' are claimed (moved to 'processing') by the
+image worker, encoded along with their responsive variants (see
+variants.py) in a process pool and written back with a
+conditional UPDATE that only applies if the image was not replaced in the
+meantime. Because the worker writes with update(), it bumps the cache
+namespace of each model itself instead of relying on save() signals.
+"""
+import logging
+from concurrent.futures import as_completed
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from core.catalog_cache import BLOG, CATALOG, bump_version
+from .processing import available_formats, content_hash, process_image
+from .variants import has_variants, store_variants
+
+logger = logging.getLogger(__name__)
+
+# Models with background-optimized images, and the cache namespace showing them
+IMAGE_MODELS = {
+    'products.Product': CATALOG,
+    'products.ProductImage': CATALOG,
+    'blog.Blog': BLOG,
+    'reviews.Review': CATALOG,
+}
+
+# How long a claimed image stays with its worker before reset_interrupted() may requeue it
+CLAIM_TIMEOUT = timedelta(minutes=30)
+
+
+def image_models(labels=None):
+    """The models of IMAGE_MODELS, or of the given labels (e.g. 'products.Product')."""
+    return [apps.get_model(label) for label in labels or IMAGE_MODELS]
+
+
+def queue_optimization(queryset, force=False):
+    """
+    Mark the images of `queryset` pending for the worker. With force, images
+    that are already optimized are encoded again. Returns the number queued.
+    """
+    queryset = queryset.exclude(image='').exclude(image__isnull=True).exclude(image_status='processing')
+    if force:
+        return queryset.update(image_status='pending', image_hash='')
+    return queryset.exclude(image_status='ready', image_hash__gt='').update(image_status='pending')
+
+
+def reset_interrupted(models=None):
+    """
+    Return images of every model (or of `models`) left 'processing' by a
+    stopped worker to the queue. Only claims older than CLAIM_TIMEOUT are
+    reset, so a worker that is still running keeps its images.
+    """
+    stale = Q(image_claimed_at__lte=timezone.now() - CLAIM_TIMEOUT) | Q(image_claimed_at__isnull=True)
+    return sum(
+        model.objects.filter(stale, image_status='processing').update(image_status='pending', image_claimed_at=None)
+        for model in models or image_models()
+    )
+
+
+def claim_pending(model, limit):
+    """Claim up to `limit` pending images of a model. Returns [(pk, image name)]."""
+    candidates = list(
+        model.objects.filter(image_status='pending').order_by('pk').values_list('pk', 'image')[:limit]
+    )
+    now = timezone.now()
+    return [
+        (pk, name) for pk, name in candidates
+        if model.objects.filter(pk=pk, image=name, image_status='pending').update(
+            image_status='processing', image_claimed_at=now
+        )
+    ]
+
+
+def _set_status(model, pk, name, **fields):
+    """Update a claimed row unless its image was replaced since it was claimed."""
+    return model.objects.filter(pk=pk, image=name, image_status='processing').update(**fields)
+
+
+def _store(instance, name, optimized, source_hash, variants):
+    """
+    Save an optimized image (None if it already was) and point the row at
+    it, then save its variants. Returns False, storing no variants, if the
+    image was replaced while it was being optimized.
+    """
+    model = type(instance)
+    if optimized is None:
+        new_name = name
+        updated = _set_status(model, instance.pk, name, image_status='ready')
+    else:
+        field = model._meta.get_field('image')
+        new_name = field.generate_filename(instance, instance.optimized_image_name())
+        new_name = field.storage.save(new_name, ContentFile(optimized), max_length=field.max_length)
+        # The unused file of a replaced image may be shared, so it is left to collect_media_garbage
+        updated = _set_status(model, instance.pk, name, image=new_name, image_status='ready', image_hash=source_hash)
+    if not updated:
+        return False
+
+    try:
+        store_variants(source_hash, variants)
+    except Exception:
+        # The row is no longer 'processing'; mark it failed so a later run adds the variants
+        model.objects.filter(pk=instance.pk, image=new_name, image_status='ready').update(image_status='failed')
+        raise
+    return True
+
+
+def pending_count(models=None):
+    """Number of images waiting for the worker."""
+    return sum(
+        model.objects.filter(image_status__in=('pending', 'processing')).count()
+        for model in models or image_models()
+    )
+
+
+def process_pending(executor, batch_size, models=None):
+    """
+    Optimize one batch of pending images of every model (or of `models`) in
+    `executor`. Returns (optimized, unchanged, failed) counts.
+    """
+    optimized = unchanged = failed = 0
+    ladder = settings.IMAGE_VARIANT_WIDTHS
+    formats = available_formats()
+    for model in models or image_models():
+        storage = model._meta.get_field('image').storage
+        claimed = claim_pending(model, batch_size)
+        if not claimed:
+            continue
+        instances = model.objects.select_related(*model.IMAGE_RELATED).in_bulk([pk for pk, _ in claimed])
+
+        futures = {}
+        for pk, name in claimed:
+            try:
+                with storage.open(name, 'rb') as image_file:
+                    data = image_file.read()
+            except Exception as e:
+                logger.error(f"Cannot read image {name} of {model._meta.label} {pk}: {str(e)}")
+                _set_status(model, pk, name, image_status='failed')
+                failed += 1
+                continue
+
+            instance = instances.get(pk)
+            if instance is None:
+                continue
+            # Already the output of an optimization: at most the variants are missing
+            already_optimized = bool(instance.image_hash) and content_hash(data) == instance.image_hash
+            if already_optimized and has_variants(instance.image_hash):
+                _set_status(model, pk, name, image_status='ready')
+                unchanged += 1
+                continue
+
+            future = executor.submit(
+                process_image, data, model.IMAGE_MAX_SIZE, model.IMAGE_MAX_BYTES, ladder, formats,
+                optimize=not already_optimized
+            )
+            futures[future] = (instance, name)
+
+        changed = False
+        for future in as_completed(futures):
+            instance, name = futures[future]
+            try:
+                optimized_data, variants = future.result()
+                source_hash = content_hash(optimized_data) if optimized_data is not None else instance.image_hash
+                if _store(instance, name, optimized_data, source_hash, variants):
+                    optimized += 1
+                    changed = True
+            except Exception as e:
+                logger.error(f"Image optimization failed for {model._meta.label} {instance.pk}: {str(e)}")
+                _set_status(model, instance.pk, name, image_status='failed')
+                failed += 1
+
+        if changed:
+            bump_version(IMAGE_MODELS[model._meta.label])
+    return optimized, unchanged, failed
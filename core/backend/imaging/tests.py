@@ -0,0 +1,201 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from backend.blog.models import Blog
+from backend.blog.serializers import BlogSerializer
+from backend.products.models import Product, ProductImage
+from backend.products.serializers import ProductDetailSerializer, ProductImageSerializer, ProductSerializer
+from backend.reviews.models import Review
+from backend.reviews.serializers import ReviewSerializer
+from .encoding import MAX_QUALITY, MIN_QUALITY, encode, encode_jpeg
+from .models import ImageVariant, OptimizedImageMixin
+from .processing import generate_variants
+from .services import CLAIM_TIMEOUT, _store, claim_pending, reset_interrupted
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_bytes(size=(320, 240), color=(200, 80, 40)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StoreOptimizedImageTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+        self.product.image.save('original.jpg', ContentFile(jpeg_bytes()))
+        Product.objects.filter(pk=self.product.pk).update(image_status='processing')
+        self.name = self.product.image.name
+        self.optimized = jpeg_bytes(color=(10, 20, 30))
+        self.variants = generate_variants(self.optimized, [160], ['jpeg'])
+
+    def test_stores_variants_after_the_row_is_updated(self):
+        self.assertTrue(_store(self.product, self.name, self.optimized, 'a' * 64, self.variants))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_status, 'ready')
+        self.assertEqual(self.product.image_hash, 'a' * 64)
+        self.assertEqual(ImageVariant.objects.filter(source_hash='a' * 64).count(), len(self.variants))
+
+    def test_replaced_image_stores_no_variants(self):
+        # The image is replaced while the worker encodes it
+        Product.objects.filter(pk=self.product.pk).update(image='product_images/replacement.jpg', image_status='pending')
+        self.assertFalse(_store(self.product, self.name, self.optimized, 'b' * 64, self.variants))
+        self.assertFalse(_store(self.product, self.name, None, 'b' * 64, self.variants))
+        self.assertFalse(ImageVariant.objects.exists())
+
+
+def old_encode_jpeg(img, max_bytes):
+    """The loop encode_jpeg() replaced: quality 85, 75, ... 35 until the output fits."""
+    for quality in range(MAX_QUALITY, MIN_QUALITY - 1, -10):
+        data = encode(img, 'JPEG', quality=quality, optimize=True)
+        if len(data) <= max_bytes:
+            break
+    return quality, data
+
+
+def photo_like(seed, size=(480, 360)):
+    """A deterministic image with smooth gradients and noise."""
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 20 + seed * 15)
+    return Image.merge('RGB', (gradient, noise, gradient.rotate(90 + seed * 45)))
+
+
+class EncodeJpegTests(TestCase):
+    """encode_jpeg() must fit every budget at a quality no lower than the old step-down loop."""
+
+    def quality_of(self, img, data):
+        return next(
+            quality for quality in range(MAX_QUALITY, MIN_QUALITY - 1, -1)
+            if encode(img, 'JPEG', quality=quality, optimize=True) == data
+        )
+
+    def test_quality_never_below_the_old_loop(self):
+        for seed in range(3):
+            img = photo_like(seed)
+            # Budgets from below the smallest to above the largest output
+            sizes = [len(encode(img, 'JPEG', quality=quality, optimize=True)) for quality in range(30, 91, 4)]
+            for budget in sizes:
+                with self.subTest(seed=seed, budget=budget):
+                    old_quality, old_data = old_encode_jpeg(img, budget)
+                    data = encode_jpeg(img, budget)
+                    quality = self.quality_of(img, data)
+                    self.assertGreaterEqual(quality, old_quality)
+                    if len(old_data) <= budget:
+                        self.assertLessEqual(len(data), budget)
+                    else:
+                        # Nothing fits: both fall back to the lowest quality
+                        self.assertEqual(quality, MIN_QUALITY)
+
+
+class ResetInterruptedTests(TestCase):
+
+    def setUp(self):
+        self.products = [
+            Product.objects.create(name=f'Perfume {index}', sku=f'P-{index}', price=100, image=f'product_images/{index}.jpg')
+            for index in range(2)
+        ]
+        Product.objects.update(image_status='pending')
+
+    def test_running_worker_keeps_its_claims(self):
+        claimed = claim_pending(Product, 10)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(reset_interrupted(), 0)
+        self.assertEqual(Product.objects.filter(image_status='processing').count(), 2)
+
+    def test_stale_claims_of_the_selected_models_are_requeued(self):
+        claim_pending(Product, 10)
+        stale = timezone.now() - CLAIM_TIMEOUT * 2
+        Product.objects.filter(pk=self.products[0].pk).update(image_claimed_at=stale)
+
+        self.assertEqual(reset_interrupted([Blog]), 0)
+        self.assertEqual(reset_interrupted([Product]), 1)
+        self.assertEqual(
+            dict(Product.objects.values_list('pk', 'image_status')),
+            {self.products[0].pk: 'pending', self.products[1].pk: 'processing'}
+        )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class CollectMediaGarbageTests(TestCase):
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+        self.product.image.save('kept.jpg', ContentFile(jpeg_bytes()))
+        Product.objects.filter(pk=self.product.pk).update(image_status='ready', image_hash='a' * 64)
+        self.variants = {}
+        for source_hash in ('a' * 64, 'b' * 64):
+            variant = ImageVariant(source_hash=source_hash, format='jpeg', width=160, height=120, size=10)
+            variant.file.save(f'{source_hash}_160w.jpg', ContentFile(jpeg_bytes((160, 120))), save=False)
+            variant.save()
+            self.variants[source_hash] = variant
+        ImageVariant.objects.update(created_at=timezone.now() - timedelta(days=1))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def collect(self, **options):
+        call_command('collect_media_garbage', min_age_hours=0, stdout=StringIO(), **options)
+
+    def test_variants_of_unused_content_are_pruned(self):
+        self.collect()
+        self.assertEqual(list(ImageVariant.objects.values_list('source_hash', flat=True)), ['a' * 64])
+        self.assertTrue(default_storage.exists(self.variants['a' * 64].file.name))
+        self.assertFalse(default_storage.exists(self.variants['b' * 64].file.name))
+        self.assertTrue(default_storage.exists(self.product.image.name))
+
+    def test_dry_run_deletes_nothing(self):
+        self.collect(dry_run=True)
+        self.assertEqual(ImageVariant.objects.count(), 2)
+        self.assertTrue(default_storage.exists(self.variants['b' * 64].file.name))
+
+    def test_file_referenced_during_the_scan_is_kept(self):
+        orphan = default_storage.save('product_images/orphan.jpg', ContentFile(jpeg_bytes(color=(0, 90, 0))))
+        get_modified_time = default_storage.get_modified_time
+
+        def upload_during_scan(name):
+            if name == orphan:
+                # A concurrent upload stores the same content under the same name
+                Product.objects.create(name='Copy', sku='COPY', price=100, image=orphan)
+            return get_modified_time(name) - timedelta(days=1)
+
+        with mock.patch.object(default_storage, 'get_modified_time', side_effect=upload_during_scan):
+            self.collect()
+        self.assertTrue(default_storage.exists(orphan))
+
+
+class SerializerFieldTests(TestCase):
+    """The optimization bookkeeping fields stay out of the public API."""
+
+    def test_mixin_fields_are_not_serialized(self):
+        mixin_fields = {field.name for field in OptimizedImageMixin._meta.get_fields()}
+        product = Product.objects.create(
+            name='Perfume', sku='PERFUME', price=100, image_claimed_at=timezone.now(), image_hash='a' * 64
+        )
+        serialized = [
+            ProductSerializer(product).data,
+            ProductDetailSerializer(product).data,
+            ProductImageSerializer(ProductImage.objects.create(product=product, image='product_images/extra.jpg')).data,
+            ReviewSerializer(Review.objects.create(product=product, description='Lovely', rating=5)).data,
+            BlogSerializer(Blog.objects.create(title='News', content='Text', image='blog_images/news.jpg')).data,
+        ]
+        self.assertEqual(mixin_fields, {'image_status', 'image_hash', 'image_claimed_at'})
+        for data in serialized:
+            self.assertFalse(mixin_fields & set(data), data)
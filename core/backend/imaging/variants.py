@@ -0,0 +1,72 @@
+"""
+Responsive variants of optimized images.
+
+The image worker stores a ladder of widths (IMAGE_VARIANT_WIDTHS) in every
+format Pillow can encode here (AVIF, WebP, JPEG) as ImageVariant rows keyed
+by the image's content hash. Serializers look variants up for a whole page
+of images with one query and describe them as <picture> sources:
+
+    {'type': 'image/webp', 'srcset': '/media/...150w.webp 150w, ...'}
+"""
+from collections import defaultdict
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+from .models import ImageVariant
+from .processing import EXTENSIONS, VARIANT_FORMATS
+
+
+def store_variants(source_hash, variants):
+    """Save generated variants of an image unless they already exist."""
+    existing = set(
+        ImageVariant.objects.filter(source_hash=source_hash).values_list('format', 'width')
+    )
+    for name, width, height, data in variants:
+        if (name, width) in existing:
+            continue
+        variant = ImageVariant(source_hash=source_hash, format=name, width=width, height=height, size=len(data))
+        variant.file.save(f'{source_hash}_{width}w.{EXTENSIONS[name]}', ContentFile(data), save=False)
+        try:
+            variant.save()
+        except IntegrityError:
+            # Stored concurrently by another worker, with the same content and file
+            pass
+
+
+def has_variants(source_hash):
+    return ImageVariant.objects.filter(source_hash=source_hash).exists()
+
+
+def variants_by_hash(hashes):
+    """Map each content hash to its variants, with one query."""
+    hashes = {source_hash for source_hash in hashes if source_hash}
+    grouped = defaultdict(list)
+    if hashes:
+        for variant in ImageVariant.objects.filter(source_hash__in=hashes).order_by('width'):
+            grouped[variant.source_hash].append(variant)
+    return grouped
+
+
+def ready_hash(instance):
+    """Content hash whose variants match the instance's current image, if any."""
+    if instance.image and instance.image_status == 'ready':
+        return instance.image_hash
+    return None
+
+
+def picture_sources(variants):
+    """<picture> sources for an image's variants, preferred formats first."""
+    sources = []
+    for name, (_, mime_type, _) in VARIANT_FORMATS.items():
+        srcset = ', '.join(
+            f'{variant.file.url} {variant.width}w' for variant in variants if variant.format == name
+        )
+        if srcset:
+            sources.append({'type': mime_type, 'srcset': srcset})
+    return sources
+
+
+def srcset_data(variants):
+    """Fields describing an image's variants: sources per format plus the JPEG srcset."""
+    sources = picture_sources(variants)
+    jpeg = next((source['srcset'] for source in sources if source['type'] == 'image/jpeg'), '')
+    return {'srcset': jpeg, 'sources': sources}
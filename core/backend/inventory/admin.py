@@ -1,5 +1,18 @@
 from django.contrib import admin
+from core.admin_performance import LargeTableAdminMixin
 from .models import *
 # Register your models here.
 
-admin.site.register(Inventory)
\ No newline at end of file
+class InventoryAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'stock_quantity', 'restock_date')
+    list_select_related = ('product',)
+    search_fields = ['product__name']
+
+class StockReservationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('__str__', 'order', 'status', 'expires_at', 'created_at')
+    list_select_related = ('order', 'product')
+    list_filter = ['status']
+    raw_id_fields = ['order', 'product', 'inventory']
+
+admin.site.register(Inventory, InventoryAdmin)
+admin.site.register(StockReservation, StockReservationAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.inventory'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from backend.inventory.services import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Release stock held by unpaid orders whose reservation expired, and cancel those orders. Run periodically (e.g. from cron).'
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservations'))
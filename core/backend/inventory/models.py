@@ -8,3 +8,32 @@ class Inventory(models.Model):
 
     def __str__(self):
         return f"{self.product.name} - {self.stock_quantity} in stock"
+
+
+class StockReservation(models.Model):
+    """
+    Stock and sales counted for one order line until the order is cancelled,
+    returned or expires unpaid. Lines of untracked products (no Inventory)
+    have no inventory and only carry the sales count.
+    """
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+    ]
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name="stock_reservations")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_reservations")
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, null=True, blank=True, related_name="reservations")
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    expires_at = models.DateTimeField(help_text="Held stock is released after this time")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} x{self.quantity} - {self.status}"
@@ -0,0 +1,203 @@
+"""
+Stock reservation engine.
+
+At checkout, stock of every tracked product in the order is decremented by
+one conditional UPDATE (``stock_quantity >= n`` for each line), so stock
+can never go negative regardless of concurrency. The reserved quantities
+are recorded as held StockReservations and the products' number_of_sales
+is incremented in the same transaction.
+
+Held reservations are committed once the order is paid or moves past
+pending. Reservations are released (stock and sales returned) when the
+order is cancelled or returned; orders still pending and unpaid when
+their reservations expire are cancelled.
+
+Products without an Inventory row are not stock-tracked; their lines are
+still recorded so number_of_sales is returned on cancellation.
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from backend.products.models import Product
+from core.catalog_cache import bump_version_on_commit, CATALOG
+from .models import Inventory, StockReservation
+
+logger = logging.getLogger(__name__)
+
+# Order states that give reserved stock back, and states that keep it for good
+RELEASE_STATUSES = ('cancelled', 'returned')
+COMMIT_STATUSES = ('confirmed', 'booked', 'processing', 'shipped', 'delivered')
+
+
+class InsufficientStock(Exception):
+    """Raised when tracked products do not have enough stock."""
+
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        super().__init__(f"Insufficient stock for products {product_ids}")
+
+
+def _amount_by(field, amounts):
+    """CASE expression mapping each key of `amounts` to its amount."""
+    return Case(
+        *[When(**{field: key}, then=Value(amount)) for key, amount in amounts.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def _adjust_sales(quantities, sign=1):
+    """Adjust number_of_sales of several products with one UPDATE."""
+    if quantities:
+        Product.objects.filter(id__in=quantities).update(
+            number_of_sales=Greatest(F('number_of_sales') + sign * _amount_by('id', quantities), Value(0))
+        )
+        # update() sends no signals; best sellers and product details show the sales
+        bump_version_on_commit(CATALOG)
+
+
+def reserve_stock(order, quantities):
+    """
+    Reserve stock for an order. `quantities` maps product id -> quantity.
+    Must run inside the transaction that creates the order; raises
+    InsufficientStock (rolling the order back) if any line cannot be met.
+    """
+    inventory_ids = dict(
+        Inventory.objects.filter(product_id__in=quantities).values_list('product_id', 'id')
+    )
+    wanted = {inventory_ids[product_id]: quantities[product_id] for product_id in inventory_ids}
+
+    if wanted:
+        enough = Q()
+        for inventory_id, quantity in wanted.items():
+            enough |= Q(id=inventory_id, stock_quantity__gte=quantity)
+
+        try:
+            with transaction.atomic():
+                updated = Inventory.objects.filter(enough).update(
+                    stock_quantity=F('stock_quantity') - _amount_by('id', wanted)
+                )
+                if updated != len(wanted):
+                    raise InsufficientStock([])
+        except InsufficientStock:
+            # The savepoint is rolled back, so current stock can be compared
+            stock = dict(Inventory.objects.filter(id__in=wanted).values_list('id', 'stock_quantity'))
+            raise InsufficientStock([
+                product_id for product_id, inventory_id in inventory_ids.items()
+                if stock.get(inventory_id, 0) < wanted[inventory_id]
+            ])
+
+    expires_at = timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TIMEOUT)
+    StockReservation.objects.bulk_create(
+        StockReservation(
+            order=order,
+            product_id=product_id,
+            inventory_id=inventory_ids.get(product_id),
+            quantity=quantity,
+            expires_at=expires_at
+        )
+        for product_id, quantity in quantities.items()
+    )
+    _adjust_sales(quantities)
+
+
+def commit_reservations(order):
+    """Keep the stock of an order for good (it was paid or confirmed)."""
+    return StockReservation.objects.filter(order=order, status='held').update(
+        status='committed', updated_at=timezone.now()
+    )
+
+
+def release_reservations(reservations):
+    """
+    Return the stock and sales of reservations that are still counted.
+    Each reservation is claimed with a conditional UPDATE, so concurrent
+    releases never restock twice. Returns the number released.
+    """
+    candidates = list(
+        reservations.exclude(status='released').values_list('id', 'status', 'product_id', 'inventory_id', 'quantity')
+    )
+    released = 0
+    stock = Counter()
+    sales = Counter()
+    with transaction.atomic():
+        for reservation_id, current_status, product_id, inventory_id, quantity in candidates:
+            claimed = StockReservation.objects.filter(id=reservation_id, status=current_status).update(
+                status='released', updated_at=timezone.now()
+            )
+            if claimed:
+                released += 1
+                sales[product_id] += quantity
+                if inventory_id:
+                    stock[inventory_id] += quantity
+
+        if stock:
+            Inventory.objects.filter(id__in=stock).update(
+                stock_quantity=F('stock_quantity') + _amount_by('id', stock)
+            )
+        _adjust_sales(sales, sign=-1)
+    return released
+
+
+def release_order_reservations(order):
+    """Return the stock of a cancelled or returned order."""
+    return release_reservations(StockReservation.objects.filter(order=order))
+
+
+def sync_orders_reservations(order_ids, order_status):
+    """
+    Commit or release the reservations of many orders that all moved to
+    `order_status`, for bulk status updates that bypass the Order signals.
+    """
+    if order_status in RELEASE_STATUSES:
+        return release_reservations(StockReservation.objects.filter(order_id__in=order_ids))
+    if order_status in COMMIT_STATUSES:
+        return StockReservation.objects.filter(order_id__in=order_ids, status='held').update(
+            status='committed', updated_at=timezone.now()
+        )
+    return 0
+
+
+def release_expired_reservations(now=None):
+    """
+    Cancel the orders of expired held reservations that are still pending
+    and unpaid, releasing their stock. The orders are cancelled through
+    bulk_transition(), so their customers are notified as for any other
+    cancellation. Expired reservations of orders that were paid or moved
+    on are committed instead, and those of orders already cancelled or
+    returned are released. Returns the number released.
+    """
+    from backend.orders.models import Order
+    from backend.orders.transitions import bulk_transition
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired_ids = list(
+            StockReservation.objects.filter(status='held', expires_at__lte=now).values_list('id', flat=True)
+        )
+        if not expired_ids:
+            return 0
+        expired = StockReservation.objects.filter(id__in=expired_ids)
+        order_ids = set(expired.values_list('order_id', flat=True))
+
+        # Cancelling releases the orders' reservations (see sync_orders_reservations)
+        cancelled, _ = bulk_transition(
+            Order.objects.filter(id__in=order_ids, order_status='pending').exclude(payment_status='paid'),
+            'cancelled'
+        )
+        released = expired.filter(order_id__in=cancelled, status='released').count()
+
+        still_held = expired.filter(status='held')
+        committed = still_held.filter(
+            Q(order__payment_status='paid') | Q(order__order_status__in=COMMIT_STATUSES)
+        ).update(status='committed', updated_at=now)
+        released += release_reservations(still_held.filter(order__order_status__in=RELEASE_STATUSES))
+    logger.info(
+        f"Released {released} expired stock reservations, committed {committed}, cancelled {len(cancelled)} orders"
+    )
+    return released
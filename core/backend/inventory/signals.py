@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from backend.orders.models import Order
+from .services import COMMIT_STATUSES, RELEASE_STATUSES, commit_reservations, release_order_reservations
+
+
+@receiver(post_save, sender=Order)
+def sync_stock_reservations(sender, instance, created, **kwargs):
+    """Commit or release an order's held stock when its status changes."""
+    if created:
+        return
+    if instance.order_status in RELEASE_STATUSES:
+        release_order_reservations(instance)
+    elif instance.order_status in COMMIT_STATUSES or instance.payment_status == 'paid':
+        commit_reservations(instance)
@@ -1,3 +1,130 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from backend.notifications.models import Notification
+from backend.orders.models import Order
+from backend.products.models import Product
+from .models import Inventory, StockReservation
+from .services import InsufficientStock, release_expired_reservations, reserve_stock
 
-# Create your tests here.
+STOCK = 10
+BUYERS = 24
+
+
+def make_order(index=0, **fields):
+    return Order.objects.create(
+        first_name='Test', last_name=f'Buyer {index}', email=f'buyer-{index}@example.com',
+        mobile='03000000000', address='1 Test Street', city='Lahore', total_amount=100, **fields
+    )
+
+
+class ReserveStockConcurrencyTests(TransactionTestCase):
+    """Concurrent checkouts must never take stock below zero."""
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Scarce', sku='SCARCE', price=100)
+        self.inventory = Inventory.objects.create(product=self.product, stock_quantity=STOCK)
+        self.orders = [make_order(index) for index in range(BUYERS)]
+
+    def reserve(self, order):
+        try:
+            while True:
+                try:
+                    with transaction.atomic():
+                        reserve_stock(order, {self.product.id: 1})
+                    return True
+                except InsufficientStock:
+                    return False
+                except OperationalError:
+                    # The in-memory SQLite test database reports a locked table at
+                    # once instead of waiting; the transaction rolled back, so retry
+                    if connection.vendor != 'sqlite':
+                        raise
+        finally:
+            # Each worker thread opened its own connection
+            connection.close()
+
+    def test_parallel_reservations_never_oversell(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self.reserve, self.orders))
+
+        self.inventory.refresh_from_db()
+        self.assertEqual(results.count(True), STOCK)
+        self.assertEqual(self.inventory.stock_quantity, 0)
+        self.assertEqual(StockReservation.objects.filter(status='held').count(), STOCK)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.number_of_sales, STOCK)
+
+
+class ReleaseExpiredReservationsTests(TestCase):
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+        self.inventory = Inventory.objects.create(product=self.product, stock_quantity=5)
+
+    def reserve(self, order, quantity=2):
+        with transaction.atomic():
+            reserve_stock(order, {self.product.id: quantity})
+
+    def test_expired_pending_order_is_cancelled_through_the_transition_engine(self):
+        order = make_order()
+        self.reserve(order)
+        Notification.objects.all().delete()
+
+        later = timezone.now() + timedelta(days=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(release_expired_reservations(now=later), 1)
+
+        order.refresh_from_db()
+        self.inventory.refresh_from_db()
+        self.assertEqual(order.order_status, 'cancelled')
+        self.assertEqual(self.inventory.stock_quantity, 5)
+        self.assertEqual(
+            list(Notification.objects.values_list('order_id', 'event')), [(order.id, 'status_changed')]
+        )
+
+    def test_paid_order_keeps_its_stock(self):
+        order = make_order(payment_status='paid')
+        self.reserve(order)
+        Notification.objects.all().delete()
+
+        later = timezone.now() + timedelta(days=30)
+        self.assertEqual(release_expired_reservations(now=later), 0)
+
+        order.refresh_from_db()
+        self.inventory.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(order.order_status, 'pending')
+        self.assertEqual(self.inventory.stock_quantity, 3)
+        self.assertEqual(self.product.number_of_sales, 2)
+        self.assertEqual(StockReservation.objects.get(order=order).status, 'committed')
+        self.assertFalse(Notification.objects.exists())
+
+        # Committed reservations are not swept again
+        self.assertEqual(release_expired_reservations(now=later), 0)
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.stock_quantity, 3)
+
+    def test_order_moved_on_keeps_its_stock(self):
+        order = make_order()
+        self.reserve(order)
+        # A bulk update that bypassed the Order signals
+        Order.objects.filter(pk=order.pk).update(order_status='confirmed')
+
+        release_expired_reservations(now=timezone.now() + timedelta(days=30))
+
+        order.refresh_from_db()
+        self.inventory.refresh_from_db()
+        self.assertEqual(order.order_status, 'confirmed')
+        self.assertEqual(self.inventory.stock_quantity, 3)
+        self.assertEqual(StockReservation.objects.get(order=order).status, 'committed')
+
+    def test_unexpired_reservations_are_kept(self):
+        order = make_order()
+        self.reserve(order)
+        self.assertEqual(release_expired_reservations(), 0)
+        order.refresh_from_db()
+        self.assertEqual(order.order_status, 'pending')
+        self.assertEqual(StockReservation.objects.get(order=order).status, 'held')
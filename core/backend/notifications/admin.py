@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.utils import timezone
+from core.admin_performance import LargeTableAdminMixin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Admin interface for queued order notifications."""
+
+    list_display = ('order', 'event', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_select_related = ('order',)
+    list_filter = ('status', 'event')
+    search_fields = ('order__order_number', 'recipient')
+    raw_id_fields = ('order',)
+    readonly_fields = ('created_at', 'sent_at', 'locked_until', 'last_error')
+    actions = ['retry_notifications']
+
+    @admin.action(description='Retry selected notifications now')
+    def retry_notifications(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), locked_until=None
+        )
+        self.message_user(request, f"{updated} notifications queued for retry.")
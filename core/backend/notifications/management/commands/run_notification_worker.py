@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from backend.notifications import queue
+from backend.notifications.services import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued order notifications. Runs until interrupted unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send the notifications that are due and exit')
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_BATCH_SIZE,
+                            help='Notifications sent per mail connection')
+        parser.add_argument('--poll-interval', type=float, default=settings.NOTIFICATION_POLL_INTERVAL,
+                            help='Seconds to wait for new notifications between batches')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = process_batch(batch_size)
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} notifications, {failed} failed')
+                    if sent + failed == batch_size:
+                        # A full batch: more are probably due
+                        continue
+                if options['once']:
+                    break
+                queue.wait(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Sent {total_sent} notifications, {total_failed} failed'))
@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """
+    An email about an order, queued for the notification worker
+    (``manage.py run_notification_worker``). The message is rendered when it
+    is sent, so it reflects the order as it is at that time.
+    """
+    EVENT_CHOICES = [
+        ('order_placed', 'Order Placed'),
+        ('new_order', 'New Order (Staff)'),
+        ('status_changed', 'Status Changed'),
+        ('shipped', 'Shipped'),
+        ('delivered', 'Delivered'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name='notifications')
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    recipient = models.EmailField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="A worker is sending it until this time")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_display()} to {self.recipient} - {self.status}"
@@ -0,0 +1,59 @@
+"""
+Wake-up channel between the request path and the notification worker.
+
+Notification rows in the database are the queue: they survive restarts and
+carry the retry state. When NOTIFICATION_QUEUE_URL points at Redis, the ids
+of new notifications are also pushed onto a Redis list so an idle worker
+blocked on it starts sending immediately. Without Redis, or while it is
+down, the worker falls back to polling the table every poll interval.
+"""
+import logging
+import time
+from functools import lru_cache
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'notifications:queue'
+
+
+@lru_cache(maxsize=1)
+def _client():
+    if not settings.NOTIFICATION_QUEUE_URL:
+        return None
+    import redis
+    return redis.Redis.from_url(settings.NOTIFICATION_QUEUE_URL)
+
+
+def push(notification_ids):
+    """Wake the worker for new notifications. Failures only delay sending."""
+    client = _client()
+    if client is None or not notification_ids:
+        return
+    try:
+        client.lpush(QUEUE_KEY, *notification_ids)
+    except Exception as e:
+        logger.error(f"Notification queue unavailable, the worker will poll instead: {str(e)}")
+
+
+def wait(timeout):
+    """
+    Block until notifications are pushed or `timeout` seconds pass, then
+    drain the list. Returns the pushed ids (empty when polling).
+    """
+    client = _client()
+    if client is not None:
+        try:
+            popped = client.brpop(QUEUE_KEY, timeout=max(int(timeout), 1))
+            if popped is None:
+                return []
+            ids = [int(popped[1])]
+            pipeline = client.pipeline()
+            pipeline.lrange(QUEUE_KEY, 0, -1)
+            pipeline.delete(QUEUE_KEY)
+            rest, _ = pipeline.execute()
+            return ids + [int(notification_id) for notification_id in rest]
+        except Exception as e:
+            logger.error(f"Notification queue unavailable, polling the database: {str(e)}")
+    time.sleep(timeout)
+    return []
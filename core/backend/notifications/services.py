@@ -0,0 +1,228 @@
+"""
+Order notifications sent outside the request path.
+
+Requests only insert Notification rows (in the same transaction as the
+order change that caused them) and wake the worker once they commit. The
+worker claims due notifications in batches, renders them and sends each
+batch over one mail connection. A failed send is retried with exponential
+backoff until NOTIFICATION_MAX_ATTEMPTS is reached, then marked failed.
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from . import queue
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed notification stays locked before another worker may retry it
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# Longest wait between two attempts of the same notification
+MAX_RETRY_DELAY = 60 * 60
+
+
+def _insert(notifications):
+    """Insert notifications with one INSERT; the worker is woken once the transaction commits."""
+    notifications = Notification.objects.bulk_create(notifications)
+    ids = [notification.pk for notification in notifications]
+    if ids:
+        transaction.on_commit(lambda: queue.push(ids))
+    return notifications
+
+
+def enqueue(order, messages):
+    """Queue notifications of an order; `messages` is a list of (event, recipient) pairs."""
+    return _insert([
+        Notification(order=order, event=event, recipient=recipient)
+        for event, recipient in dict.fromkeys(messages) if recipient
+    ])
+
+
+def notify_order_placed(order):
+    """Confirm a new order to the customer and alert the shop staff."""
+    enqueue(order, [('order_placed', order.email)] + [
+        ('new_order', recipient) for recipient in settings.ORDER_NOTIFICATION_EMAILS
+    ])
+
+
+def status_event(order_status):
+    return order_status if order_status in ('shipped', 'delivered') else 'status_changed'
+
+
+def notify_status_change(order):
+    """Tell the customer their order moved to a new status."""
+    enqueue(order, [(status_event(order.order_status), order.email)])
+
+
+def notify_bulk_status_change(order_ids, order_status):
+    """Tell the customers of many orders that moved to `order_status`, with one INSERT."""
+    from backend.orders.models import Order
+
+    event = status_event(order_status)
+    recipients = Order.objects.filter(id__in=order_ids).exclude(email__isnull=True).exclude(email='')
+    return _insert([
+        Notification(order_id=order_id, event=event, recipient=email)
+        for order_id, email in recipients.values_list('id', 'email').iterator()
+    ])
+
+
+def _order_lines(order):
+    return '\n'.join(
+        f"- {item.product_name} x{item.quantity}: RS {item.subtotal}"
+        for item in order.items.all()
+    )
+
+
+def build_message(notification):
+    """Render a notification into (subject, body)."""
+    order = notification.order
+    event = notification.event
+
+    if event == 'order_placed':
+        subject = f"Order #{order.order_number} received"
+        body = (
+            f"Hello {order.first_name},\n\n"
+            f"Thank you for your order. We have received it and will confirm it shortly.\n\n"
+            f"{_order_lines(order)}\n\n"
+            f"Total: RS {order.total_amount}\n"
+            f"Payment method: {order.get_payment_method_display()}\n\n"
+            f"Thanks,\n"
+            f"QnH Enterprises"
+        )
+    elif event == 'new_order':
+        subject = f"New order #{order.order_number} from {order.full_name}"
+        body = (
+            f"Customer: {order.full_name} ({order.mobile})\n"
+            f"City: {order.city}\n"
+            f"Payment method: {order.get_payment_method_display()}\n\n"
+            f"{_order_lines(order)}\n\n"
+            f"Total: RS {order.total_amount}"
+        )
+    elif event == 'shipped':
+        tracking = ''
+        if order.tracking_number:
+            tracking = f"Tracking number: {order.tracking_number}\n"
+        if order.tracking_url:
+            tracking += f"Track it here: {order.tracking_url}\n"
+        subject = f"Order #{order.order_number} has shipped"
+        body = (
+            f"Hello {order.first_name},\n\n"
+            f"Your order is on its way.\n\n"
+            f"{tracking}\n"
+            f"Thanks,\n"
+            f"QnH Enterprises"
+        )
+    elif event == 'delivered':
+        subject = f"Order #{order.order_number} delivered"
+        body = (
+            f"Hello {order.first_name},\n\n"
+            f"Your order has been delivered. We hope you enjoy it!\n\n"
+            f"Thanks,\n"
+            f"QnH Enterprises"
+        )
+    else:
+        subject = f"Order #{order.order_number} is now {order.get_order_status_display()}"
+        body = (
+            f"Hello {order.first_name},\n\n"
+            f"The status of your order is now: {order.get_order_status_display()}.\n\n"
+            f"Thanks,\n"
+            f"QnH Enterprises"
+        )
+    return subject, body
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after `attempts` failures."""
+    return min(settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def claim_batch(batch_size):
+    """
+    Claim up to `batch_size` due notifications for this worker. Each row is
+    claimed with a conditional UPDATE, so concurrent workers never send the
+    same notification twice.
+    """
+    now = timezone.now()
+    due = Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_until__lte=now)
+    candidates = list(
+        Notification.objects.filter(due).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size]
+    )
+    claimed = []
+    for notification_id in candidates:
+        if Notification.objects.filter(due, id=notification_id).update(
+            status='sending', locked_until=now + CLAIM_TIMEOUT
+        ):
+            claimed.append(notification_id)
+    return list(
+        Notification.objects.filter(id__in=claimed)
+        .select_related('order')
+        .prefetch_related('order__items')
+        .order_by('id')
+    )
+
+
+def _mark_failed(notification, error):
+    attempts = notification.attempts + 1
+    fields = {'attempts': attempts, 'locked_until': None, 'last_error': str(error)}
+    if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        fields['status'] = 'failed'
+        logger.error(f"Giving up on notification {notification.pk} after {attempts} attempts: {str(error)}")
+    else:
+        fields['status'] = 'pending'
+        fields['next_attempt_at'] = timezone.now() + timedelta(seconds=retry_delay(attempts))
+        logger.warning(f"Notification {notification.pk} failed (attempt {attempts}), retrying: {str(error)}")
+    Notification.objects.filter(pk=notification.pk).update(**fields)
+
+
+def send_batch(notifications):
+    """Send claimed notifications over one mail connection. Returns (sent, failed)."""
+    sent = []
+    failed = 0
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as e:
+        for notification in notifications:
+            _mark_failed(notification, e)
+        return 0, len(notifications)
+
+    try:
+        for notification in notifications:
+            try:
+                subject, body = build_message(notification)
+                EmailMessage(
+                    subject=subject,
+                    body=body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[notification.recipient],
+                    reply_to=[settings.DEFAULT_FROM_EMAIL],
+                    connection=connection,
+                ).send()
+                sent.append(notification.pk)
+            except Exception as e:
+                failed += 1
+                _mark_failed(notification, e)
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.error(f"Failed to close mail connection: {str(e)}")
+
+    if sent:
+        Notification.objects.filter(pk__in=sent).update(
+            status='sent', sent_at=timezone.now(), locked_until=None, last_error=''
+        )
+    return len(sent), failed
+
+
+def process_batch(batch_size=None):
+    """Claim and send one batch of due notifications. Returns (sent, failed)."""
+    notifications = claim_batch(batch_size or settings.NOTIFICATION_BATCH_SIZE)
+    if not notifications:
+        return 0, 0
+    return send_batch(notifications)
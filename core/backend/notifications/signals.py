@@ -0,0 +1,25 @@
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from backend.orders.models import Order
+from .services import notify_order_placed, notify_status_change
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    """Look the stored status up for orders not loaded with it (see Order.from_db)."""
+    if instance.pk and not hasattr(instance, '_stored_status'):
+        instance._stored_status = (
+            Order.objects.filter(pk=instance.pk).values_list('order_status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Order)
+def queue_order_notifications(sender, instance, created, update_fields=None, **kwargs):
+    """Queue emails for new orders and status changes; the worker sends them."""
+    if update_fields is not None and 'order_status' not in update_fields:
+        return
+    if created:
+        notify_order_placed(instance)
+    elif getattr(instance, '_stored_status', None) not in (None, instance.order_status):
+        notify_status_change(instance)
+    instance._stored_status = instance.order_status
@@ -0,0 +1,62 @@
+from django.core import mail
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from backend.orders.models import Order
+from backend.orders.transitions import transition_order
+from .models import Notification
+from .services import process_batch
+
+
+class OrderNotificationTests(TestCase):
+
+    def setUp(self):
+        self.order = Order.objects.create(
+            first_name='Test', last_name='Buyer', email='buyer@example.com',
+            mobile='03000000000', address='1 Test Street', city='Lahore', total_amount=100
+        )
+        Notification.objects.all().delete()
+
+    def test_status_change_enqueues_one_notification(self):
+        order = Order.objects.get(pk=self.order.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            transition_order(order, 'shipped')
+
+        self.assertEqual(
+            list(Notification.objects.values_list('order_id', 'event', 'recipient', 'status')),
+            [(order.id, 'shipped', 'buyer@example.com', 'pending')]
+        )
+        self.assertEqual(len(callbacks), 1)
+
+    def test_save_does_not_look_up_the_stored_status(self):
+        order = Order.objects.get(pk=self.order.pk)
+        order.order_status = 'confirmed'
+        with CaptureQueriesContext(connection) as queries:
+            order.save()
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('SELECT')])
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_save_without_status_change_enqueues_nothing(self):
+        order = Order.objects.get(pk=self.order.pk)
+        order.admin_notes = 'Called the customer'
+        order.save()
+        self.order.order_status = 'pending'
+        self.order.save()
+        self.assertFalse(Notification.objects.exists())
+
+    def test_order_loaded_without_status_still_notifies(self):
+        order = Order.objects.only('id').get(pk=self.order.pk)
+        order.order_status = 'cancelled'
+        order.save()
+        self.assertEqual(list(Notification.objects.values_list('event', flat=True)), ['status_changed'])
+
+    def test_worker_delivers_the_notification(self):
+        transition_order(Order.objects.get(pk=self.order.pk), 'shipped')
+
+        self.assertEqual(process_batch(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['buyer@example.com'])
+        self.assertIn(self.order.order_number, mail.outbox[0].subject)
+        self.assertEqual(Notification.objects.get().status, 'sent')
+        # Sent notifications are not claimed again
+        self.assertEqual(process_batch(), (0, 0))
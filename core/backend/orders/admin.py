@@ -1,5 +1,39 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from core.admin_performance import CachedAllValuesFieldListFilter, LargeTableAdminMixin
+from .export import export_response
 from .models import Order, OrderItem
+from .transitions import InvalidTransition, bulk_transition, stamp_milestones, validate_transition
+
+
+class OrderAdminForm(forms.ModelForm):
+    """Only allows order status changes permitted by the order state machine."""
+
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def clean_order_status(self):
+        order_status = self.cleaned_data['order_status']
+        current_status = self.initial.get('order_status')
+        if self.instance.pk and current_status and order_status != current_status:
+            try:
+                validate_transition(current_status, order_status)
+            except InvalidTransition as e:
+                raise forms.ValidationError(str(e))
+        return order_status
+
+
+def make_transition_action(target_status, label):
+    def action(modeladmin, request, queryset):
+        moved, skipped = bulk_transition(queryset, target_status)
+        modeladmin.message_user(request, f"{len(moved)} orders marked as {label.lower()}.")
+        if skipped:
+            modeladmin.message_user(
+                request, f"{skipped} orders could not move to {label.lower()} from their status.", messages.WARNING
+            )
+    action.__name__ = f'mark_{target_status}'
+    return admin.action(description=f'Mark selected orders as {label.lower()}')(action)
 
 
 class OrderItemInline(admin.TabularInline):
@@ -12,15 +46,28 @@ class OrderItemInline(admin.TabularInline):
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin interface for Order model."""
     
+    form = OrderAdminForm
+    
+    actions = [
+        'export_csv',
+        'export_ndjson',
+        *[
+            make_transition_action(status, label)
+            for status, label in Order.ORDER_STATUS_CHOICES
+            if status != 'pending'
+        ],
+    ]
+    
     list_display = (
         'order_number', 
         'full_name', 
         'mobile', 
         'email',
         'total_amount', 
+        'total_quantity',
         'payment_status', 
         'order_status', 
         'payment_method',
@@ -34,8 +81,8 @@ class OrderAdmin(admin.ModelAdmin):
         'payment_method',
         'is_guest_order',
         'created_at',
-        'country',
-        'city'
+        ('country', CachedAllValuesFieldListFilter),
+        ('city', CachedAllValuesFieldListFilter)
     )
     
     search_fields = (
@@ -53,7 +100,8 @@ class OrderAdmin(admin.ModelAdmin):
         'order_number',
         'created_at',
         'updated_at',
-        'get_total_items',
+        'item_count',
+        'total_quantity',
         'is_paid',
         'is_delivered',
         'full_name'
@@ -74,7 +122,7 @@ class OrderAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Order Details', {
-            'fields': ('order_notes', 'total_amount', 'get_total_items')
+            'fields': ('order_notes', 'total_amount', 'item_count', 'total_quantity')
         }),
         ('Payment Information', {
             'fields': (
@@ -109,14 +157,27 @@ class OrderAdmin(admin.ModelAdmin):
     
     ordering = ('-created_at',)
     
-    def get_total_items(self, obj):
-        """Display total items in order."""
-        return obj.get_total_items
-    get_total_items.short_description = 'Total Items'
+    @admin.action(description='Export selected orders with items (CSV)')
+    def export_csv(self, request, queryset):
+        return export_response(request, queryset, 'csv')
+    
+    @admin.action(description='Export selected orders with items (NDJSON)')
+    def export_ndjson(self, request, queryset):
+        return export_response(request, queryset, 'ndjson')
+    
+    def save_model(self, request, obj, form, change):
+        if change and 'order_status' in form.changed_data:
+            stamp_milestones(obj)
+        super().save_model(request, obj, form, change)
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Inline item edits change the denormalized totals
+        form.instance.update_item_totals()
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin interface for OrderItem model."""
     
     list_display = (
@@ -132,9 +193,11 @@ class OrderItemAdmin(admin.ModelAdmin):
         'created_at'
     )
     
+    list_select_related = ('order', 'product')
+    
     list_filter = (
         'created_at',
-        'discount_percentage',
+        ('discount_percentage', CachedAllValuesFieldListFilter),
         'order__order_status',
         'order__payment_status'
     )
@@ -170,3 +233,20 @@ class OrderItemAdmin(admin.ModelAdmin):
     )
     
     ordering = ('-created_at',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        obj.order.update_item_totals()
+        if change and 'order' in form.changed_data and form.initial.get('order'):
+            Order.objects.get(pk=form.initial['order']).update_item_totals()
+
+    def delete_model(self, request, obj):
+        order = obj.order
+        super().delete_model(request, obj)
+        order.update_item_totals()
+
+    def delete_queryset(self, request, queryset):
+        orders = list(Order.objects.filter(items__in=queryset).distinct())
+        super().delete_queryset(request, queryset)
+        for order in orders:
+            order.update_item_totals()
@@ -0,0 +1,146 @@
+"""
+Streaming export of orders and their items, for couriers and accounting.
+
+Rows come from one LEFT JOIN of orders and items read with
+``.values().iterator(chunk_size=...)``, which uses a server-side cursor on
+PostgreSQL, so memory stays constant however many orders are exported and
+the first bytes are produced as soon as the first chunk arrives.
+
+- CSV has one row per order item, with the order columns repeated; orders
+  without items get a single row with empty item columns.
+- NDJSON has one JSON object per order with its items nested.
+
+Output is produced in byte chunks of about CHUNK_LINES lines. Served over
+ASGI the chunks are pulled through an async iterator, because Django
+buffers synchronous iterators completely before sending them there.
+"""
+import csv
+import json
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+FORMATS = ('csv', 'ndjson')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched per database round trip, and lines per chunk sent to the client
+CHUNK_SIZE = 2000
+CHUNK_LINES = 500
+
+ORDER_COLUMNS = [
+    'order_number', 'created_at', 'order_status', 'payment_status', 'payment_method',
+    'first_name', 'last_name', 'email', 'mobile',
+    'address', 'city', 'country', 'zipcode',
+    'ship_to_different_address', 'shipping_address', 'shipping_city', 'shipping_country', 'shipping_zipcode',
+    'tracking_number', 'total_amount', 'item_count', 'total_quantity',
+    'confirmed_at', 'shipped_at', 'delivered_at',
+]
+
+ITEM_COLUMNS = ['product_sku', 'product_name', 'quantity', 'price', 'discount_percentage', 'subtotal']
+
+CSV_HEADER = ORDER_COLUMNS + [f'item_{column}' for column in ITEM_COLUMNS]
+
+# Text a spreadsheet would run as a formula; phone numbers like +92... are fine
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+NUMBER_LIKE = re.compile(r'^[+-]?[\d\s().-]+$')
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv_value(value):
+    value = _value(value)
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not NUMBER_LIKE.match(value):
+        return "'" + value
+    return value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yield one dict per order item (or per order without items), ordered by order."""
+    return (
+        queryset.order_by('id', 'items__id')
+        .values('id', *ORDER_COLUMNS, *[f'items__{column}' for column in ITEM_COLUMNS])
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _csv_lines(queryset, chunk_size):
+    class Line:
+        def write(self, value):
+            return value
+
+    writer = csv.writer(Line())
+    yield writer.writerow(CSV_HEADER)
+    for row in export_rows(queryset, chunk_size):
+        yield writer.writerow(
+            [_csv_value(row[column]) for column in ORDER_COLUMNS]
+            + [_csv_value(row[f'items__{column}']) for column in ITEM_COLUMNS]
+        )
+
+
+def _ndjson_lines(queryset, chunk_size):
+    order = None
+    order_id = None
+    for row in export_rows(queryset, chunk_size):
+        if row['id'] != order_id:
+            if order is not None:
+                yield json.dumps(order) + '\n'
+            order_id = row['id']
+            order = {column: _value(row[column]) for column in ORDER_COLUMNS}
+            order['items'] = []
+        if row['items__product_name'] is not None:
+            order['items'].append({column: _value(row[f'items__{column}']) for column in ITEM_COLUMNS})
+    if order is not None:
+        yield json.dumps(order) + '\n'
+
+
+def export_chunks(queryset, export_format='csv', chunk_size=CHUNK_SIZE):
+    """Yield the export of `queryset` as UTF-8 byte chunks of CHUNK_LINES lines."""
+    lines = _csv_lines(queryset, chunk_size) if export_format == 'csv' else _ndjson_lines(queryset, chunk_size)
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= CHUNK_LINES:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+async def _async_chunks(chunks):
+    # thread_sensitive keeps every database read on the thread that opened the cursor
+    next_chunk = sync_to_async(lambda: next(chunks, None), thread_sensitive=True)
+    while True:
+        chunk = await next_chunk()
+        if chunk is None:
+            return
+        yield chunk
+
+
+def export_filename(export_format):
+    return f"orders-{timezone.localtime():%Y%m%d-%H%M%S}.{export_format}"
+
+
+def export_response(request, queryset, export_format='csv'):
+    """StreamingHttpResponse downloading the export of `queryset`."""
+    chunks = export_chunks(queryset, export_format)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(export_format)}"'
+    return response
@@ -0,0 +1,47 @@
+import sys
+from datetime import datetime, time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from backend.orders.export import CHUNK_SIZE, FORMATS, export_chunks
+from backend.orders.models import Order
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Export orders with their items as CSV (one row per item) or NDJSON (one order per line).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', '-o', help='File to write to (default: standard output)')
+        parser.add_argument('--status', action='append', dest='statuses', metavar='STATUS',
+                            help='Only orders in this status (repeatable)')
+        parser.add_argument('--since', help='Only orders created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Only orders created on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all()
+        if options['statuses']:
+            orders = orders.filter(order_status__in=options['statuses'])
+        if options['since']:
+            orders = orders.filter(created_at__gte=timezone.make_aware(datetime.combine(parse_date(options['since']), time.min)))
+        if options['until']:
+            orders = orders.filter(created_at__lte=timezone.make_aware(datetime.combine(parse_date(options['until']), time.max)))
+
+        chunks = export_chunks(orders, options['format'], options['chunk_size'])
+        if options['output']:
+            written = 0
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    written += output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.flush()
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 16:41
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_order_number_sequence(apps, schema_editor):
+    """Start numbering after the highest existing order id, as the old generator did."""
+    Order = apps.get_model('orders', 'Order')
+    start = (Order.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE SEQUENCE IF NOT EXISTS orders_order_number_seq START WITH {int(start)}'
+        )
+    else:
+        OrderNumberCounter = apps.get_model('orders', 'OrderNumberCounter')
+        OrderNumberCounter.objects.update_or_create(name='order_number', defaults={'value': start - 1})
+
+
+def drop_order_number_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP SEQUENCE IF EXISTS orders_order_number_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_order_number_sequence, drop_order_number_sequence),
+    ]
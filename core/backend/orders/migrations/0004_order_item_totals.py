@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 16:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_item_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    Order.objects.update(
+        item_count=Coalesce(Subquery(items.annotate(n=Count('id')).values('n')), 0),
+        total_quantity=Coalesce(Subquery(items.annotate(n=Sum('quantity')).values('n')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of order lines (kept in sync with items)'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of item quantities (kept in sync with items)'),
+        ),
+        migrations.RunPython(backfill_item_totals, migrations.RunPython.noop),
+    ]
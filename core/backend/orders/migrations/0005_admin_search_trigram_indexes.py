@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 17:02
+
+from django.db import migrations
+
+# Admin search_fields are matched with icontains, which PostgreSQL runs as
+# UPPER(column::text) LIKE UPPER('%term%'); trigram GIN indexes on that
+# exact expression let the planner use an index instead of a full scan.
+TRIGRAM_INDEXES = [
+    ('orders_order', 'order_number'),
+    ('orders_order', 'first_name'),
+    ('orders_order', 'last_name'),
+    ('orders_order', 'email'),
+    ('orders_order', 'mobile'),
+    ('orders_order', 'address'),
+    ('orders_order', 'city'),
+    ('orders_order', 'tracking_number'),
+    ('orders_orderitem', 'product_name'),
+    ('orders_orderitem', 'product_sku'),
+]
+
+
+def _index_name(table, column):
+    return f'{table}_{column}_upper_trgm'
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {_index_name(table, column)} '
+            f'ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in reversed(TRIGRAM_INDEXES):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {_index_name(table, column)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_item_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -67,6 +67,8 @@ class Order(models.Model):
     # Order Details
     order_notes = models.TextField(blank=True, null=True, help_text="Additional notes from customer")
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], help_text="Total order amount")
+    item_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of order lines (kept in sync with items)")
+    total_quantity = models.PositiveIntegerField(default=0, editable=False, help_text="Sum of item quantities (kept in sync with items)")
     
     # Payment Information
     payment_method = models.CharField(max_length=50, choices=PAYMENT_METHOD_CHOICES, default='whatsapp')
@@ -100,6 +102,7 @@ class Order(models.Model):
             models.Index(fields=['order_status']),
             models.Index(fields=['payment_status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['user', '-created_at'], name='orders_user_created_idx'),
         ]
     
     def __str__(self):
@@ -108,18 +111,24 @@ class Order(models.Model):
     def save(self, *args, **kwargs):
         """Generate unique order number if not provided."""
         if not self.order_number:
-            # Generate order number: ORD-YYYYMMDD-HHMMSS-XXXX
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-            # Get last order number to increment
-            last_order = Order.objects.order_by('-id').first()
-            if last_order and last_order.id:
-                sequence = str(last_order.id + 1).zfill(4)
-            else:
-                sequence = '0001'
-            self.order_number = f"ORD-{timestamp}-{sequence}"
+            from .numbering import generate_order_number
+            self.order_number = generate_order_number()
         super().save(*args, **kwargs)
-    
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so the notification signals spot a change without a query
+        if 'order_status' in instance.__dict__:
+            instance._stored_status = instance.order_status
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """Reload from the database, also resetting the status the notification signals compare against."""
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or 'order_status' in fields:
+            self._stored_status = self.order_status
+
     @property
     def full_name(self):
         """Return customer's full name."""
@@ -128,7 +137,14 @@ class Order(models.Model):
     @property
     def get_total_items(self):
         """Return total number of items in the order."""
-        return self.items.aggregate(total=models.Sum('quantity'))['total'] or 0
+        return self.total_quantity
+
+    def update_item_totals(self):
+        """Recompute item_count and total_quantity after items were edited outside the order pipeline."""
+        totals = self.items.aggregate(item_count=models.Count('id'), total_quantity=models.Sum('quantity'))
+        self.item_count = totals['item_count']
+        self.total_quantity = totals['total_quantity'] or 0
+        Order.objects.filter(pk=self.pk).update(item_count=self.item_count, total_quantity=self.total_quantity)
     
     @property
     def is_paid(self):
@@ -141,6 +157,18 @@ class Order(models.Model):
         return self.order_status == 'delivered'
 
 
+class OrderNumberCounter(models.Model):
+    """
+    Counter behind order numbers on databases without sequences (SQLite).
+    PostgreSQL uses the orders_order_number_seq sequence instead.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
 class OrderItem(models.Model):
     """Model to track individual products in an order."""
     
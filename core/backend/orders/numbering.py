@@ -0,0 +1,44 @@
+"""
+Order number allocation.
+
+Numbers come from a database sequence (PostgreSQL) or, elsewhere, from a
+counter row advanced with a single UPDATE ... RETURNING statement. Either
+way each number is allocated by one write, with no read-before-write, so
+concurrent checkouts never receive the same number.
+"""
+from django.db import connection
+from django.utils import timezone
+from .models import OrderNumberCounter
+
+SEQUENCE_NAME = 'orders_order_number_seq'
+COUNTER_NAME = 'order_number'
+
+
+def _next_from_counter(cursor):
+    table = connection.ops.quote_name(OrderNumberCounter._meta.db_table)
+    cursor.execute(
+        f'UPDATE {table} SET value = value + 1 WHERE name = %s RETURNING value',
+        [COUNTER_NAME]
+    )
+    row = cursor.fetchone()
+    if row is None:
+        # Counter row missing (e.g. a freshly flushed database)
+        OrderNumberCounter.objects.get_or_create(name=COUNTER_NAME)
+        return _next_from_counter(cursor)
+    return row[0]
+
+
+def next_order_sequence():
+    """Allocate the next value of the order number sequence."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT nextval(%s)', [SEQUENCE_NAME])
+            return cursor.fetchone()[0]
+        return _next_from_counter(cursor)
+
+
+def generate_order_number():
+    """Return a new order number: ORD-YYYYMMDD-HHMMSS-XXXX."""
+    timestamp = timezone.localtime(timezone.now()).strftime('%Y%m%d-%H%M%S')
+    sequence = str(next_order_sequence()).zfill(4)
+    return f"ORD-{timestamp}-{sequence}"
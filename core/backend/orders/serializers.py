@@ -1,21 +1,13 @@
 from rest_framework import serializers
 from .models import Order, OrderItem
-from backend.products.models import Product
 from decimal import Decimal
 
 
 class OrderItemSerializer(serializers.Serializer):
     """Serializer for order items in request."""
+    # Products are checked in bulk when the order is placed (services.place_order)
     product_id = serializers.IntegerField(required=True)
     quantity = serializers.IntegerField(min_value=1, required=True)
-    
-    def validate_product_id(self, value):
-        """Validate that product exists and is active."""
-        try:
-            product = Product.objects.get(id=value, is_active=True)
-        except Product.DoesNotExist:
-            raise serializers.ValidationError(f"Product with ID {value} does not exist or is not active.")
-        return value
 
 
 class CreateOrderSerializer(serializers.Serializer):
@@ -105,12 +97,30 @@ class OrderReadSerializer(serializers.ModelSerializer):
             'shipping_zipcode', 'order_notes', 'total_amount',
             'payment_method', 'payment_status', 'payment_transaction_id',
             'order_status', 'tracking_number', 'tracking_url',
-            'items', 'get_total_items', 'is_paid', 'is_delivered',
+            'items', 'item_count', 'total_quantity', 'get_total_items', 'is_paid', 'is_delivered',
             'created_at', 'updated_at', 'confirmed_at', 'shipped_at',
             'delivered_at', 'is_guest_order'
         ]
         read_only_fields = [
-            'id', 'order_number', 'created_at', 'updated_at',
+            'id', 'order_number', 'item_count', 'total_quantity', 'created_at', 'updated_at',
             'confirmed_at', 'shipped_at', 'delivered_at'
         ]
 
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    """One order status change in a bulk status update."""
+    order_number = serializers.CharField(max_length=50)
+    status = serializers.ChoiceField(choices=Order.ORDER_STATUS_CHOICES)
+
+
+class BulkOrderStatusSerializer(serializers.Serializer):
+    """Serializer for bulk order status updates."""
+    transitions = OrderTransitionSerializer(many=True, allow_empty=False, max_length=10000)
+    
+    def validate_transitions(self, value):
+        """Each order may only appear once."""
+        order_numbers = [transition['order_number'] for transition in value]
+        if len(set(order_numbers)) != len(order_numbers):
+            raise serializers.ValidationError("Each order number may only appear once.")
+        return value
@@ -0,0 +1,108 @@
+"""
+Order placement pipeline used by the order API views.
+
+An order and all of its items are written in one transaction with a
+constant number of queries: products are fetched with a single in_bulk
+query, the items are inserted with one bulk_create and stock is reserved
+with conditional updates (see backend.inventory.services).
+"""
+from collections import Counter
+from decimal import Decimal
+from django.db import transaction
+from backend.inventory.services import InsufficientStock, reserve_stock
+from backend.products.models import Product
+from .models import Order, OrderItem
+
+
+class OrderError(Exception):
+    """Raised when an order cannot be placed; the message is shown to the client."""
+
+
+def price_line(product, quantity):
+    """Return (unit price, discount percentage, subtotal) for an order line."""
+    price = product.price
+    discount_percentage = product.discount_percentage
+
+    if discount_percentage > 0:
+        discount_amount = (price * Decimal(discount_percentage)) / Decimal('100')
+        item_price = price - discount_amount
+    else:
+        item_price = price
+
+    return price, discount_percentage, item_price * quantity
+
+
+def place_order(validated_data, user=None):
+    """
+    Create an order and its items from CreateOrderSerializer data.
+    Nothing is written if any step fails. Raises OrderError for unknown or
+    inactive products and for insufficient stock.
+    """
+    items_data = validated_data['items']
+
+    with transaction.atomic():
+        products = Product.objects.filter(is_active=True).in_bulk(
+            {item_data['product_id'] for item_data in items_data}
+        )
+
+        total_amount = Decimal('0.00')
+        order_items = []
+        for item_data in items_data:
+            product = products.get(item_data['product_id'])
+            if product is None:
+                raise OrderError(
+                    f"Product with ID {item_data['product_id']} does not exist or is not active."
+                )
+
+            quantity = item_data['quantity']
+            price, discount_percentage, subtotal = price_line(product, quantity)
+            total_amount += subtotal
+            order_items.append(OrderItem(
+                product=product,
+                product_name=product.name,
+                product_sku=product.sku,
+                quantity=quantity,
+                price=price,
+                discount_percentage=discount_percentage,
+                subtotal=subtotal
+            ))
+
+        order = Order.objects.create(
+            user=user,
+            first_name=validated_data['first_name'],
+            last_name=validated_data['last_name'],
+            email=validated_data.get('email', ''),
+            mobile=validated_data['mobile'],
+            address=validated_data['address'],
+            city=validated_data['city'],
+            country=validated_data.get('country', 'Pakistan'),
+            zipcode=validated_data.get('zipcode', ''),
+            ship_to_different_address=validated_data.get('ship_to_different_address', False),
+            shipping_address=validated_data.get('shipping_address', ''),
+            shipping_city=validated_data.get('shipping_city', ''),
+            shipping_country=validated_data.get('shipping_country', ''),
+            shipping_zipcode=validated_data.get('shipping_zipcode', ''),
+            order_notes=validated_data.get('order_notes', ''),
+            total_amount=total_amount,
+            item_count=len(order_items),
+            total_quantity=sum(order_item.quantity for order_item in order_items),
+            payment_method=validated_data.get('payment_method', 'whatsapp'),
+            payment_status='pending',  # Set to pending by default
+            order_status='pending',  # Set to pending by default
+            is_guest_order=user is None
+        )
+
+        for order_item in order_items:
+            order_item.order = order
+        OrderItem.objects.bulk_create(order_items)
+
+        quantities = Counter()
+        for item_data in items_data:
+            quantities[item_data['product_id']] += item_data['quantity']
+        try:
+            reserve_stock(order, quantities)
+        except InsufficientStock as e:
+            names = ', '.join(products[product_id].name for product_id in e.product_ids)
+            raise OrderError(f"Not enough stock for: {names}")
+
+    return order
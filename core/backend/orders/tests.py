@@ -1,3 +1,168 @@
-from django.test import TestCase
+import itertools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from backend.products.models import Product
+from .models import Order
+from .numbering import generate_order_number, next_order_sequence
+from . import services
+from .services import place_order
+from .transitions import bulk_transition
 
-# Create your tests here.
+THREADS = 8
+ORDERS_PER_THREAD = 250
+
+
+def checkout(product_id, index):
+    return {
+        'first_name': 'Test', 'last_name': f'Buyer {index}', 'email': f'buyer-{index}@example.com',
+        'mobile': '03000000000', 'address': '1 Test Street', 'city': 'Lahore',
+        'items': [{'product_id': product_id, 'quantity': 1}],
+    }
+
+
+def place_one(data):
+    for attempt in itertools.count():
+        try:
+            return place_order(data)
+        except OperationalError:
+            # The in-memory SQLite test database reports a locked table at once
+            # instead of waiting; the whole order rolled back, so back off and retry
+            if connection.vendor != 'sqlite':
+                raise
+            time.sleep(random.uniform(0, 0.001 * 2 ** min(attempt, 6)))
+
+
+def place_orders(batch):
+    try:
+        return [place_one(data).order_number for data in batch]
+    finally:
+        # Each worker thread opened its own connection
+        connection.close()
+
+
+def sequence_of(order_number):
+    return int(order_number.rsplit('-', 1)[1])
+
+
+class OrderNumberConcurrencyTests(TransactionTestCase):
+    """Orders placed in parallel must get unique, increasing, gap-free numbers."""
+
+    def test_parallel_checkouts(self):
+        product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+        start = next_order_sequence()
+        batches = [
+            [checkout(product.id, thread * ORDERS_PER_THREAD + index) for index in range(ORDERS_PER_THREAD)]
+            for thread in range(THREADS)
+        ]
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            placed = list(executor.map(place_orders, batches))
+
+        total = THREADS * ORDERS_PER_THREAD
+        stored = list(Order.objects.values_list('order_number', flat=True))
+        self.assertEqual(len(stored), total)
+        self.assertEqual(len(set(stored)), total)
+        self.assertEqual(sorted(map(sequence_of, stored)), list(range(start + 1, start + 1 + total)))
+        for numbers in placed:
+            # Each checkout's orders are numbered in the order they were placed
+            sequences = list(map(sequence_of, numbers))
+            self.assertEqual(sequences, sorted(sequences))
+        product.refresh_from_db()
+        self.assertEqual(product.number_of_sales, total)
+
+    def test_order_number_format(self):
+        prefix, date, clock, sequence = generate_order_number().split('-')
+        self.assertEqual(prefix, 'ORD')
+        self.assertRegex(f'{date}-{clock}', r'^\d{8}-\d{6}$')
+        self.assertGreaterEqual(len(sequence), 4)
+
+
+class BulkTransitionTests(TestCase):
+
+    def setUp(self):
+        for index, order_status in enumerate(['pending', 'confirmed', 'delivered', 'cancelled']):
+            Order.objects.create(
+                first_name='Test', last_name=f'Buyer {index}', mobile='03000000000',
+                address='1 Test Street', city='Lahore', total_amount=100, order_status=order_status
+            )
+
+    def test_returns_moved_ids_and_skipped_count(self):
+        eligible = set(Order.objects.filter(order_status__in=['pending', 'confirmed']).values_list('id', flat=True))
+        # Savepoint, one SELECT for both counts, the UPDATE, reservations, recipients, release
+        with self.assertNumQueries(6):
+            moved, skipped = bulk_transition(Order.objects.all(), 'shipped')
+        self.assertEqual(set(moved), eligible)
+        self.assertEqual(skipped, 2)
+        self.assertEqual(Order.objects.filter(order_status='shipped').count(), 2)
+
+    def test_nothing_eligible(self):
+        self.assertEqual(bulk_transition(Order.objects.filter(order_status='cancelled'), 'shipped'), ([], 1))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'idempotency-tests'}})
+class IdempotentCreateOrderTests(TestCase):
+    """POST /api/orders/create/ with an Idempotency-Key never creates a second order."""
+
+    url = '/api/orders/create/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.product = Product.objects.create(name='Perfume', sku='PERFUME', price=100)
+
+    def create(self, data, key='checkout-1', client=None):
+        return (client or self.client).post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_returns_original_response(self):
+        data = checkout(self.product.id, 1)
+        first = self.create(data)
+        self.assertEqual(first.status_code, 201)
+
+        replay = self.create(data)
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_different_body_with_same_key_is_rejected(self):
+        self.assertEqual(self.create(checkout(self.product.id, 1)).status_code, 201)
+
+        response = self.create(checkout(self.product.id, 2))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_retry_while_processing_conflicts(self):
+        data = checkout(self.product.id, 1)
+        retries = []
+
+        def place_and_retry(*args, **kwargs):
+            # A client retry that lands while the first request is still running
+            retries.append(self.create(data, client=APIClient()))
+            return place_order(*args, **kwargs)
+
+        with mock.patch.object(services, 'place_order', side_effect=place_and_retry):
+            first = self.create(data)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retries[0].status_code, 409)
+        self.assertEqual(retries[0]['Retry-After'], '1')
+        self.assertEqual(Order.objects.count(), 1)
+        # Once the first request has finished, a retry gets its response
+        self.assertEqual(self.create(data).json(), first.json())
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        data = checkout(self.product.id, 1)
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, data, format='json').status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    @override_settings(IDEMPOTENCY_PROCESSING_TIMEOUT=0)
+    def test_processing_timeout_comes_from_settings(self):
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            self.create(checkout(self.product.id, 1))
+        self.assertEqual(add.call_args.args[2], 0)
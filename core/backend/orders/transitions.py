@@ -0,0 +1,126 @@
+"""
+Order status state machine.
+
+TRANSITIONS lists the statuses an order may move to from each status;
+cancelled and returned are final. Moving into a status stamps the
+milestones it implies (confirmed_at, shipped_at, delivered_at) unless they
+are already set, so an order shipped straight from pending still gets a
+confirmation time.
+
+transition_order() moves a single order with save(), so the Order signals
+(stock reservations, notifications) run as usual. bulk_transition() moves
+any number of orders with one UPDATE and then applies the same side
+effects in bulk, since QuerySet.update() does not send signals.
+"""
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from backend.inventory.services import sync_orders_reservations
+from backend.notifications.services import notify_bulk_status_change
+from .models import Order
+
+TRANSITIONS = {
+    'pending': ('confirmed', 'booked', 'processing', 'shipped', 'cancelled'),
+    'confirmed': ('booked', 'processing', 'shipped', 'cancelled'),
+    'booked': ('processing', 'shipped', 'cancelled'),
+    'processing': ('shipped', 'cancelled'),
+    'shipped': ('delivered', 'returned'),
+    'delivered': ('returned',),
+    'cancelled': (),
+    'returned': (),
+}
+
+# Timestamp fields stamped when an order enters a status
+MILESTONES = {
+    'confirmed': ('confirmed_at',),
+    'booked': ('confirmed_at',),
+    'processing': ('confirmed_at',),
+    'shipped': ('confirmed_at', 'shipped_at'),
+    'delivered': ('confirmed_at', 'shipped_at', 'delivered_at'),
+}
+
+
+class InvalidTransition(Exception):
+    """Raised when an order cannot move to the requested status."""
+
+
+def can_transition(current_status, target_status):
+    return target_status in TRANSITIONS.get(current_status, ())
+
+
+def source_statuses(target_status):
+    """Statuses from which an order may move to `target_status`."""
+    return [status for status, targets in TRANSITIONS.items() if target_status in targets]
+
+
+def validate_transition(current_status, target_status):
+    if target_status not in TRANSITIONS:
+        raise InvalidTransition(f"Unknown order status '{target_status}'")
+    if not can_transition(current_status, target_status):
+        raise InvalidTransition(f"An order cannot move from '{current_status}' to '{target_status}'")
+
+
+def stamp_milestones(order, now=None):
+    """Set the unset milestone timestamps implied by the order's current status."""
+    now = now or timezone.now()
+    stamped = []
+    for field in MILESTONES.get(order.order_status, ()):
+        if getattr(order, field) is None:
+            setattr(order, field, now)
+            stamped.append(field)
+    return stamped
+
+
+def transition_order(order, target_status):
+    """Move one order to `target_status`, stamping its milestones. Raises InvalidTransition."""
+    validate_transition(order.order_status, target_status)
+    order.order_status = target_status
+    stamped = stamp_milestones(order)
+    order.save(update_fields=['order_status', 'updated_at', *stamped])
+    return order
+
+
+def bulk_transition(queryset, target_status):
+    """
+    Move every order of `queryset` that may enter `target_status` with one
+    UPDATE. Orders in other statuses are left alone. Returns (moved, skipped):
+    the ids of the orders that moved and the number of orders that could not.
+    """
+    if target_status not in TRANSITIONS:
+        raise InvalidTransition(f"Unknown order status '{target_status}'")
+
+    now = timezone.now()
+    stamps = {field: Coalesce(F(field), Value(now)) for field in MILESTONES.get(target_status, ())}
+    sources = set(source_statuses(target_status))
+    with transaction.atomic():
+        # Locked on PostgreSQL so concurrent transitions cannot interleave
+        statuses = list(queryset.select_for_update().values_list('id', 'order_status'))
+        order_ids = [order_id for order_id, order_status in statuses if order_status in sources]
+        skipped = len(statuses) - len(order_ids)
+        if not order_ids:
+            return [], skipped
+        Order.objects.filter(id__in=order_ids).update(order_status=target_status, updated_at=now, **stamps)
+
+        sync_orders_reservations(order_ids, target_status)
+        notify_bulk_status_change(order_ids, target_status)
+    return order_ids, skipped
+
+
+def bulk_transition_many(transitions):
+    """
+    Apply {order_number: target_status} with one bulk_transition() per target
+    status. Returns (moved, skipped) lists of order numbers; skipped orders
+    were missing or could not move to their target.
+    """
+    by_status = {}
+    for order_number, target_status in transitions.items():
+        by_status.setdefault(target_status, []).append(order_number)
+
+    moved = []
+    with transaction.atomic():
+        for target_status, order_numbers in by_status.items():
+            order_ids, _ = bulk_transition(Order.objects.filter(order_number__in=order_numbers), target_status)
+            moved += Order.objects.filter(id__in=order_ids).values_list('order_number', flat=True)
+    moved_set = set(moved)
+    return moved, [order_number for order_number in transitions if order_number not in moved_set]
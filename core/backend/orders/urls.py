@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import CreateOrderAPIView
+from .views import BulkOrderStatusAPIView, CreateOrderAPIView, MyOrdersAPIView, OrderDetailAPIView
 
 urlpatterns = [
     path('create/', CreateOrderAPIView.as_view(), name='create-order'),
+    path('bulk-status/', BulkOrderStatusAPIView.as_view(), name='bulk-order-status'),
+    path('mine/', MyOrdersAPIView.as_view(), name='my-orders'),
+    path('<str:order_number>/', OrderDetailAPIView.as_view(), name='order-detail'),
 ]
-
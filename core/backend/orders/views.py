@@ -1,12 +1,14 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from rest_framework.permissions import AllowAny
+from rest_framework import status, pagination
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import NotFound
 from django.contrib.auth import get_user_model
-from .models import Order, OrderItem
-from .serializers import CreateOrderSerializer, OrderReadSerializer
-from backend.products.models import Product
-from decimal import Decimal
+from .models import Order
+from .serializers import BulkOrderStatusSerializer, CreateOrderSerializer, OrderReadSerializer
+from . import services
+from .transitions import bulk_transition_many
+from core.idempotency import idempotent
 
 User = get_user_model()
 
@@ -15,9 +17,12 @@ class CreateOrderAPIView(APIView):
     """
     API endpoint to create a new order.
     Sets order_status to 'pending' and payment_status to 'pending' by default.
+    Clients should send an Idempotency-Key header so retries never create
+    duplicate orders.
     """
     permission_classes = [AllowAny]
     
+    @idempotent('orders-create')
     def post(self, request):
         """
         Create a new order with order items.
@@ -56,94 +61,15 @@ class CreateOrderAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            validated_data = serializer.validated_data
-            items_data = validated_data.pop('items')
-            
-            # Calculate total amount
-            total_amount = Decimal('0.00')
-            order_items_data = []
-            
-            for item_data in items_data:
-                product_id = item_data['product_id']
-                quantity = item_data['quantity']
-                
-                try:
-                    product = Product.objects.get(id=product_id, is_active=True)
-                except Product.DoesNotExist:
-                    return Response(
-                        {'error': f'Product with ID {product_id} does not exist or is not active.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                # Get price and discount
-                price = product.price
-                discount_percentage = product.discount_percentage
-                
-                # Calculate price after discount
-                if discount_percentage > 0:
-                    discount_amount = (price * Decimal(discount_percentage)) / Decimal('100')
-                    item_price = price - discount_amount
-                else:
-                    item_price = price
-                
-                # Calculate subtotal for this item
-                item_subtotal = item_price * quantity
-                total_amount += item_subtotal
-                
-                # Store item data for later creation
-                order_items_data.append({
-                    'product': product,
-                    'product_name': product.name,
-                    'product_sku': product.sku,
-                    'quantity': quantity,
-                    'price': price,
-                    'discount_percentage': discount_percentage,
-                    'subtotal': item_subtotal
-                })
-            
             # Get user if authenticated
-            user = None
-            if request.user.is_authenticated:
-                user = request.user
-            
-            # Determine if guest order
-            is_guest_order = user is None
-            
-            # Create order
-            order = Order.objects.create(
-                user=user,
-                first_name=validated_data['first_name'],
-                last_name=validated_data['last_name'],
-                email=validated_data.get('email', ''),
-                mobile=validated_data['mobile'],
-                address=validated_data['address'],
-                city=validated_data['city'],
-                country=validated_data.get('country', 'Pakistan'),
-                zipcode=validated_data.get('zipcode', ''),
-                ship_to_different_address=validated_data.get('ship_to_different_address', False),
-                shipping_address=validated_data.get('shipping_address', ''),
-                shipping_city=validated_data.get('shipping_city', ''),
-                shipping_country=validated_data.get('shipping_country', ''),
-                shipping_zipcode=validated_data.get('shipping_zipcode', ''),
-                order_notes=validated_data.get('order_notes', ''),
-                total_amount=total_amount,
-                payment_method=validated_data.get('payment_method', 'whatsapp'),
-                payment_status='pending',  # Set to pending by default
-                order_status='pending',  # Set to pending by default
-                is_guest_order=is_guest_order
-            )
-            
-            # Create order items
-            for item_data in order_items_data:
-                OrderItem.objects.create(
-                    order=order,
-                    product=item_data['product'],
-                    product_name=item_data['product_name'],
-                    product_sku=item_data['product_sku'],
-                    quantity=item_data['quantity'],
-                    price=item_data['price'],
-                    discount_percentage=item_data['discount_percentage'],
-                    subtotal=item_data['subtotal']
+            user = request.user if request.user.is_authenticated else None
+
+            try:
+                order = services.place_order(serializer.validated_data, user=user)
+            except services.OrderError as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
             
             # Serialize and return the created order
@@ -162,3 +88,117 @@ class CreateOrderAPIView(APIView):
                 {'error': f'Failed to create order: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class OrderCursorPagination(pagination.CursorPagination):
+    """Keyset pagination on (created_at, id), served by the (user, -created_at) index."""
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    ordering = ('-created_at', '-id')
+
+
+class MyOrdersAPIView(APIView):
+    """Order history of the logged in user, newest first."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            orders = Order.objects.filter(user=request.user).prefetch_related('items')
+            paginator = OrderCursorPagination()
+            try:
+                page = paginator.paginate_queryset(orders, request, view=self)
+            except NotFound as e:
+                return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
+
+            serializer = OrderReadSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to fetch orders: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+def normalize_mobile(mobile):
+    """Digits of a mobile number, so formatting differences do not matter."""
+    return ''.join(char for char in str(mobile or '') if char.isdigit())
+
+
+class OrderDetailAPIView(APIView):
+    """
+    Single order by order number. Logged in users can see their own orders;
+    anyone else (guests) must also pass the order's mobile number as ?mobile=.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, order_number):
+        try:
+            order = Order.objects.prefetch_related('items').filter(order_number=order_number).first()
+
+            is_owner = (
+                order is not None
+                and request.user.is_authenticated
+                and order.user_id == request.user.pk
+            )
+            mobile = normalize_mobile(request.query_params.get('mobile'))
+            mobile_matches = order is not None and mobile and mobile == normalize_mobile(order.mobile)
+
+            # Same response whether the order is missing or the mobile is wrong
+            if not (is_owner or mobile_matches):
+                return Response(
+                    {'error': 'Order not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            return Response(OrderReadSerializer(order).data)
+
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to fetch order: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class BulkOrderStatusAPIView(APIView):
+    """
+    Staff endpoint moving many orders to new statuses at once. Orders going
+    to the same status are updated with a single query; orders that cannot
+    make their move (see backend.orders.transitions) are reported as skipped.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """
+        Expected payload:
+        {
+            "transitions": [
+                {"order_number": "ORD-20250101-120000-0001", "status": "shipped"},
+                {"order_number": "ORD-20250101-120000-0002", "status": "cancelled"}
+            ]
+        }
+        """
+        try:
+            serializer = BulkOrderStatusSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    {'errors': serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            moved, skipped = bulk_transition_many({
+                transition['order_number']: transition['status']
+                for transition in serializer.validated_data['transitions']
+            })
+            return Response({
+                'updated': len(moved),
+                'updated_orders': moved,
+                'skipped_orders': skipped,
+            })
+
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to update orders: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
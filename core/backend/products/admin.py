@@ -1,5 +1,6 @@
 from django.contrib import admin
 import os
+from backend.imaging.admin import force_reoptimize_images, optimize_images
 from .models import Product, FeaturedProducts, ProductImage
 
 
@@ -13,11 +14,11 @@ class ProductImageInline(admin.TabularInline):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('id','name', 'price', 'product_type', 'newly_added', 'best_seller', 'is_active', 'discount_percentage', 'number_of_sales', 'image_size')
+    list_display = ('id','name', 'price', 'product_type', 'newly_added', 'best_seller', 'is_active', 'discount_percentage', 'number_of_sales', 'image_size', 'image_status')
     list_filter = ('product_type', 'is_active', 'discount_percentage')
     search_fields = ('name', 'description', 'brand')
-    actions = ['optimize_images', 'cleanup_orphaned_images', 'force_reoptimize_images']
-    readonly_fields = ('image_size', 'original_image_size', 'optimization_savings', 'image_dimensions', 'discounted_price')
+    actions = [optimize_images, 'cleanup_orphaned_images', force_reoptimize_images]
+    readonly_fields = ('image_status', 'image_size', 'original_image_size', 'optimization_savings', 'image_dimensions', 'discounted_price')
     inlines = [ProductImageInline]
     
     fieldsets = (
@@ -28,7 +29,7 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('discount_percentage', 'discount_text', 'discounted_price', 'number_of_sales')
         }),
         ('Main Image', {
-            'fields': ('image', 'image_dimensions', 'image_size', 'original_image_size', 'optimization_savings'),
+            'fields': ('image', 'image_status', 'image_dimensions', 'image_size', 'original_image_size', 'optimization_savings'),
             'classes': ('collapse',)
         }),
         ('Status & Features', {
@@ -98,35 +99,6 @@ class ProductAdmin(admin.ModelAdmin):
             return "Error"
     image_dimensions.short_description = 'Dimensions'
     
-    def optimize_images(self, request, queryset):
-        """Admin action to optimize selected product images."""
-        optimized_count = 0
-        failed_count = 0
-        
-        for product in queryset:
-            if product.image:
-                try:
-                    original_size = product.get_image_size()
-                    product._original_image_size = original_size
-                    
-                    if product.optimize_image():
-                        optimized_count += 1
-                        product.save(update_fields=['image'])
-                    else:
-                        failed_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Failed to optimize product {product.id}: {str(e)}")
-        
-        message = f'Successfully optimized {optimized_count} product images.'
-        if failed_count > 0:
-            message += f' Failed to optimize {failed_count} images.'
-        
-        self.message_user(request, message)
-    optimize_images.short_description = "Optimize selected product images"
-    
     def cleanup_orphaned_images(self, request, queryset):
         """Admin action to clean up orphaned image references."""
         cleaned_count = 0
@@ -140,52 +112,12 @@ class ProductAdmin(admin.ModelAdmin):
             f'Cleaned up {cleaned_count} orphaned image references.'
         )
     cleanup_orphaned_images.short_description = "Clean up orphaned images"
-    
-    def force_reoptimize_images(self, request, queryset):
-        """Admin action to force re-optimization of all selected product images."""
-        optimized_count = 0
-        failed_count = 0
-        
-        for product in queryset:
-            if product.image:
-                try:
-                    original_size = product.get_image_size()
-                    product._original_image_size = original_size
-                    
-                    if product.optimize_image():
-                        optimized_count += 1
-                        product.save(update_fields=['image'])
-                    else:
-                        failed_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Failed to re-optimize product {product.id}: {str(e)}")
-        
-        message = f'Successfully re-optimized {optimized_count} product images.'
-        if failed_count > 0:
-            message += f' Failed to re-optimize {failed_count} images.'
-        
-        self.message_user(request, message)
-    force_reoptimize_images.short_description = "Force re-optimize selected images"
-    
-    def save_model(self, request, obj, form, change):
-        """Custom save logic to track image size changes."""
-        if change and obj.image:  
-            try:
-                old_obj = Product.objects.get(pk=obj.pk)
-                if old_obj.image and old_obj.image != obj.image:
-                    obj._original_image_size = old_obj.get_image_size()
-            except Product.DoesNotExist:
-                pass
-        
-        super().save_model(request, obj, form, change)
 
 
 @admin.register(FeaturedProducts)
 class FeaturedProductsAdmin(admin.ModelAdmin):
     list_display = ('id', 'product_name', 'product_type', 'discount_percentage', 'discount_text')
+    list_select_related = ('product',)
     list_filter = ('discount_percentage',)
     search_fields = ('product__name', 'discount_text')
     
@@ -202,18 +134,20 @@ class FeaturedProductsAdmin(admin.ModelAdmin):
 
 @admin.register(ProductImage)
 class ProductImageAdmin(admin.ModelAdmin):
-    list_display = ('product', 'order', 'alt_text', 'is_active', 'image_size', 'image_dimensions')
+    list_display = ('product', 'order', 'alt_text', 'is_active', 'image_size', 'image_dimensions', 'image_status')
+    list_select_related = ('product',)
     list_filter = ('is_active', 'product__product_type')
     search_fields = ('product__name', 'alt_text')
     ordering = ('product', 'order')
-    readonly_fields = ('image_size', 'image_dimensions')
+    actions = [optimize_images, force_reoptimize_images]
+    readonly_fields = ('image_status', 'image_size', 'image_dimensions')
     
     fieldsets = (
         ('Image Information', {
             'fields': ('product', 'image', 'alt_text', 'order', 'is_active')
         }),
         ('Image Details', {
-            'fields': ('image_dimensions', 'image_size'),
+            'fields': ('image_status', 'image_dimensions', 'image_size'),
             'classes': ('collapse',)
         })
     )
@@ -237,12 +171,3 @@ class ProductImageAdmin(admin.ModelAdmin):
         except Exception:
             return "Error"
     image_dimensions.short_description = 'Dimensions'
-    
-    def save_model(self, request, obj, form, change):
-        """Custom save logic for image optimization."""
-        super().save_model(request, obj, form, change)
-        
-        # Optimize image after saving
-        if obj.image:
-            obj.optimize_image()
-            obj.save(update_fields=['image'])
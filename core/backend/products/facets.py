@@ -0,0 +1,130 @@
+"""
+Facet counts for the shop sidebar.
+
+Counts of active products per product type, brand, price bucket and
+season/gender attribute are stored in ProductFacetCount and kept current
+incrementally: Product.save() diffs the stored row (read under its row
+lock) against the saved values and adjusts only the facet values that
+changed, in the same transaction; the delete signal removes a product's
+contribution. ``manage.py rebuild_facets`` recomputes the table from
+scratch, e.g. after bulk updates that bypass save().
+"""
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import F
+from .models import Product, ProductFacetCount
+
+# Product fields a product's facet values are derived from
+FACET_FIELDS = ('is_active', 'product_type', 'brand', 'price', 'attributes')
+
+# Attribute keys exposed as facets (clothing products)
+ATTRIBUTE_FACETS = ('season', 'gender')
+
+# (low, high) price bucket bounds in RS; the last bucket is open-ended
+PRICE_BUCKETS = [
+    (0, 1000),
+    (1000, 5000),
+    (5000, 10000),
+    (10000, 50000),
+    (50000, None),
+]
+
+
+def bucket_label(low, high):
+    return f'{low}+' if high is None else f'{low}-{high}'
+
+
+def price_bucket(price):
+    """Return the label of the bucket a price falls into."""
+    try:
+        price = Decimal(str(price))
+    except (InvalidOperation, ValueError):
+        return None
+    for low, high in PRICE_BUCKETS:
+        if high is None or price < high:
+            return bucket_label(low, high)
+    return None
+
+
+def product_facets(values):
+    """
+    Return the set of (facet, value) pairs of a product, given a mapping of
+    FACET_FIELDS. Inactive products have no facets.
+    """
+    if not values['is_active']:
+        return set()
+
+    facets = {('product_type', values['product_type'])}
+    if values['brand']:
+        facets.add(('brand', values['brand']))
+
+    bucket = price_bucket(values['price'])
+    if bucket:
+        facets.add(('price', bucket))
+
+    attributes = values['attributes'] if isinstance(values['attributes'], dict) else {}
+    for key in ATTRIBUTE_FACETS:
+        if attributes.get(key):
+            facets.add((key, str(attributes[key])))
+    return facets
+
+
+def instance_facets(product):
+    return product_facets({field: getattr(product, field) for field in FACET_FIELDS})
+
+
+def stored_facets(product_id, lock=False):
+    """
+    Return the facets of a product as currently stored in the database;
+    with lock, the row stays locked until the transaction ends.
+    """
+    queryset = Product.objects.filter(pk=product_id)
+    if lock:
+        queryset = queryset.select_for_update()
+    values = queryset.values(*FACET_FIELDS).first()
+    return product_facets(values) if values else set()
+
+
+def _increment(facet, value, delta):
+    updated = ProductFacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+    if not updated and delta > 0:
+        _, created = ProductFacetCount.objects.get_or_create(
+            facet=facet, value=value, defaults={'count': delta}
+        )
+        if not created:
+            # Created concurrently between the update and the insert
+            ProductFacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def apply_facet_changes(old_facets, new_facets):
+    """Move a product's contribution from its old facet values to its new ones."""
+    removed = old_facets - new_facets
+    added = new_facets - old_facets
+    if not removed and not added:
+        return
+    with transaction.atomic():
+        for facet, value in removed:
+            _increment(facet, value, -1)
+        for facet, value in added:
+            _increment(facet, value, 1)
+
+
+def count_facets(rows):
+    """Count facet values over an iterable of product value mappings."""
+    counts = Counter()
+    for values in rows:
+        counts.update(product_facets(values))
+    return counts
+
+
+def rebuild_facet_counts():
+    """Recompute every facet count from the product table. Returns the number of rows."""
+    counts = count_facets(Product.objects.values(*FACET_FIELDS).iterator())
+    with transaction.atomic():
+        ProductFacetCount.objects.all().delete()
+        ProductFacetCount.objects.bulk_create(
+            ProductFacetCount(facet=facet, value=value, count=count)
+            for (facet, value), count in counts.items()
+        )
+    return len(counts)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from core.catalog_cache import bump_version, CATALOG
+from backend.products.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the product facet counts, e.g. after bulk updates that bypass model signals.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_facet_counts()
+        bump_version(CATALOG)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} facet counts'))
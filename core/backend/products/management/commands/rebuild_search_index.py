@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.catalog_cache import bump_version, CATALOG
+from backend.products.search import update_search_vectors, uses_postgres_search
+
+
+class Command(BaseCommand):
+    help = 'Recompute product search vectors, e.g. after bulk imports that bypass model signals.'
+
+    def handle(self, *args, **options):
+        if uses_postgres_search():
+            updated = update_search_vectors()
+            self.stdout.write(self.style.SUCCESS(f'Updated search vectors for {updated} products'))
+        else:
+            self.stdout.write('In-process search index will be rebuilt on the next search')
+        # Also drops cached search responses
+        bump_version(CATALOG)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2 on 2026-10-18 16:36
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# GIN indexes only exist on PostgreSQL; other databases use the in-process
+# search index in backend.products.search.
+POSTGRES_FORWARD_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS products_product_search_vector_gin '
+    'ON products_product USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS products_product_name_trgm '
+    'ON products_product USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS products_product_brand_trgm '
+    'ON products_product USING gin (brand gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS products_product_sku_trgm '
+    'ON products_product USING gin (sku gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE_SQL = [
+    'DROP INDEX IF EXISTS products_product_sku_trgm',
+    'DROP INDEX IF EXISTS products_product_brand_trgm',
+    'DROP INDEX IF EXISTS products_product_name_trgm',
+    'DROP INDEX IF EXISTS products_product_search_vector_gin',
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import TextField
+    from django.db.models.functions import Cast
+
+    for statement in POSTGRES_FORWARD_SQL:
+        schema_editor.execute(statement)
+
+    Product = apps.get_model('products', 'Product')
+    Product.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('sku', weight='A', config='simple')
+        + SearchVector('brand', weight='B', config='simple')
+        + SearchVector(Cast('attributes', output_field=TextField()), weight='C', config='simple')
+        + SearchVector('description', weight='D', config='simple')
+    ))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in POSTGRES_REVERSE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_created_at_product_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-18 16:37
+
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+# Facet rules as of this migration, copied so later changes to
+# backend.products.facets cannot alter it
+PRICE_BUCKETS = [(0, 1000), (1000, 5000), (5000, 10000), (10000, 50000), (50000, None)]
+ATTRIBUTE_FACETS = ('season', 'gender')
+
+
+def product_facets(product):
+    if not product['is_active']:
+        return set()
+
+    facets = {('product_type', product['product_type'])}
+    if product['brand']:
+        facets.add(('brand', product['brand']))
+
+    try:
+        price = Decimal(str(product['price']))
+    except (InvalidOperation, ValueError):
+        price = None
+    if price is not None:
+        for low, high in PRICE_BUCKETS:
+            if high is None or price < high:
+                facets.add(('price', f'{low}+' if high is None else f'{low}-{high}'))
+                break
+
+    attributes = product['attributes'] if isinstance(product['attributes'], dict) else {}
+    for key in ATTRIBUTE_FACETS:
+        if attributes.get(key):
+            facets.add((key, str(attributes[key])))
+    return facets
+
+
+def populate_facet_counts(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductFacetCount = apps.get_model('products', 'ProductFacetCount')
+    counts = Counter()
+    for product in Product.objects.values('is_active', 'product_type', 'brand', 'price', 'attributes').iterator():
+        counts.update(product_facets(product))
+    ProductFacetCount.objects.bulk_create(
+        ProductFacetCount(facet=facet, value=value, count=count)
+        for (facet, value), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=50)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['facet', 'value'],
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_productfacetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the optimized image', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='ready', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the optimized image', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='ready', editable=False, max_length=20),
+        ),
+    ]
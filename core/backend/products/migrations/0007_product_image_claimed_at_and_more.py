@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_image_hash_product_image_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When a worker started processing the image', null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When a worker started processing the image', null=True),
+        ),
+    ]
@@ -1,11 +1,32 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from PIL import Image
-from io import BytesIO
 import os
-from django.core.files.base import ContentFile
+from backend.imaging.models import OptimizedImageMixin
+from backend.imaging.variants import ready_hash, srcset_data, variants_by_hash
 
-class Product(models.Model):
+class ProductQuerySet(models.QuerySet):
+    """Canonical querysets for reading the catalog."""
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def with_images(self):
+        """Prefetch active additional images in display order (one query per page)."""
+        return self.prefetch_related(
+            models.Prefetch(
+                'additional_images',
+                queryset=ProductImage.objects.filter(is_active=True).order_by('order')
+            )
+        )
+
+    def catalog(self):
+        """Active products with their images, ready for serialization."""
+        return self.active().with_images()
+
+
+class Product(OptimizedImageMixin, models.Model):
     """Stores all product details."""
     TYPE_CHOICES = [
         ('perfume', 'Perfume'),
@@ -31,6 +52,35 @@ class Product(models.Model):
     number_of_sales = models.PositiveIntegerField(default=0, help_text="Number of times this product has been sold")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Written by save() and only populated on PostgreSQL (see backend.products.search)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        from .facets import FACET_FIELDS, apply_facet_changes, instance_facets, stored_facets
+        from .search import SEARCH_WEIGHTS, instance_search_vector, uses_postgres_search
+
+        update_fields = kwargs.get('update_fields')
+        refresh_vector = uses_postgres_search() and (
+            update_fields is None or not set(SEARCH_WEIGHTS).isdisjoint(update_fields)
+        )
+        if refresh_vector:
+            self.search_vector = instance_search_vector(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_vector'}
+
+        track_facets = update_fields is None or not set(FACET_FIELDS).isdisjoint(update_fields)
+        with transaction.atomic():
+            # Read under the row lock, so concurrent saves diff against each other's result
+            old_facets = stored_facets(self.pk, lock=True) if track_facets and not self._state.adding else set()
+            super().save(*args, **kwargs)
+            if track_facets:
+                apply_facet_changes(old_facets, instance_facets(self))
+        if refresh_vector:
+            # The stored vector is only known to the database; reloaded if accessed
+            self.__dict__.pop('search_vector', None)
+
     def clean(self):
         if self.rating and self.rating > 5:
             raise ValidationError("Rating must be between 0 and 5")
@@ -53,37 +103,44 @@ class Product(models.Model):
         """Check if product has any discount."""
         return self.discount_percentage > 0
     
-    def get_all_images(self):
-        """Get all images for this product including main image."""
-        images = []
+    def get_all_images(self, variants=None):
+        """
+        Get all images for this product including main image, each with the
+        srcset data of its responsive variants. `variants` maps content hashes
+        to their variants (see backend.imaging.variants); it is looked up when
+        not given.
+        """
+        sources = []
         if self.image:
-            try:
-                images.append({
-                    'image': self.image.url if self.image else None,
-                    'is_primary': True,
-                    'order': 0
-                })
-            except Exception:
-                # Skip image if there's an error
-                pass
+            sources.append((self, True, 0))
         
-        # Add additional images
+        # Add additional images, using the prefetched ones when available
         try:
-            additional_images = self.additional_images.all().order_by('order')
-            for img in additional_images:
-                try:
-                    images.append({
-                        'image': img.image.url if img.image else None,
-                        'is_primary': False,
-                        'order': img.order
-                    })
-                except Exception:
-                    # Skip individual image if there's an error
-                    continue
+            if 'additional_images' in getattr(self, '_prefetched_objects_cache', {}):
+                additional_images = self.additional_images.all()
+            else:
+                additional_images = self.additional_images.filter(is_active=True).order_by('order')
+            sources.extend((img, False, img.order) for img in additional_images)
         except Exception:
             # Skip additional images if there's an error
             pass
         
+        if variants is None:
+            variants = variants_by_hash(ready_hash(source) for source, _, _ in sources)
+        
+        images = []
+        for source, is_primary, order in sources:
+            try:
+                images.append({
+                    'image': source.image.url if source.image else None,
+                    'is_primary': is_primary,
+                    'order': order,
+                    **srcset_data(variants.get(ready_hash(source), [])),
+                })
+            except Exception:
+                # Skip image if there's an error
+                continue
+        
         return images
     
     def get_image_size(self):
@@ -163,83 +220,10 @@ class Product(models.Model):
                 cleaned_count += 1
         
         return cleaned_count
-    
-    def optimize_image(self):
-        """Optimize the product image to reduce file size."""
-        if not self.image:
-            return False
-            
-        try:
-            original_size = self.get_image_size()
-            self._original_image_size = original_size
-            
-            img = Image.open(self.image)
-            
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            original_width, original_height = img.size
-            
-            max_width = 1200
-            max_height = 1200
-            
-            if original_width > max_width or original_height > max_height:
-                ratio = min(max_width / original_width, max_height / original_height)
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-                
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            buffer = BytesIO()
-            
-            quality = 85
-            max_size_mb = 1.0 
-            
-            while quality > 30: 
-                buffer.seek(0)
-                buffer.truncate(0)
-                
-                img.save(buffer, format='JPEG', quality=quality, optimize=True)
-                
-                buffer.seek(0)
-                file_size_mb = len(buffer.getvalue()) / (1024 * 1024)
-                
-                if file_size_mb <= max_size_mb:
-                    break
-                
-                quality -= 10  
-            
-            buffer.seek(0)
-            
-            file_name = f'{self.name}_{self.id}_optimized.jpg'
-            
-            self.image.save(file_name, ContentFile(buffer.read()), save=False)
-            buffer.close()
-            
-            return True
-            
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Image optimization failed for product {self.id}: {str(e)}")
-            return False
-    
-    def save(self, *args, **kwargs):
-        is_new_image = False
-        if self.pk:  
-            try:
-                old_product = Product.objects.get(pk=self.pk)
-                is_new_image = (old_product.image != self.image)
-            except Product.DoesNotExist:
-                is_new_image = True
-        else:
-            is_new_image = bool(self.image)
-        
-        super().save(*args, **kwargs)
-        
-        if is_new_image and self.image:
-            self.optimize_image()
-            super().save(update_fields=['image'])
+
+    def optimized_image_name(self):
+        return f'{self.name}_{self.id}_optimized.jpg'
+
 
 class FeaturedProducts(models.Model):
     """Stores all featured products."""
@@ -250,8 +234,10 @@ class FeaturedProducts(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.discount_percentage}"
 
-class ProductImage(models.Model):
+class ProductImage(OptimizedImageMixin, models.Model):
     """Stores additional images for products."""
+    IMAGE_RELATED = ('product',)
+
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='additional_images')
     image = models.ImageField(upload_to="product_images/")
     alt_text = models.CharField(max_length=255, blank=True, null=True, help_text="Alt text for accessibility")
@@ -303,61 +289,19 @@ class ProductImage(models.Model):
         except Exception:
             return None
     
-    def optimize_image(self):
-        """Optimize the product image to reduce file size."""
-        if not self.image:
-            return False
-            
-        try:
-            original_size = self.get_image_size()
-            
-            img = Image.open(self.image)
-            
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            original_width, original_height = img.size
-            
-            max_width = 1200
-            max_height = 1200
-            
-            if original_width > max_width or original_height > max_height:
-                ratio = min(max_width / original_width, max_height / original_height)
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-                
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            buffer = BytesIO()
-            
-            quality = 85
-            max_size_mb = 1.0 
-            
-            while quality > 30: 
-                buffer.seek(0)
-                buffer.truncate(0)
-                
-                img.save(buffer, format='JPEG', quality=quality, optimize=True)
-                
-                buffer.seek(0)
-                file_size_mb = len(buffer.getvalue()) / (1024 * 1024)
-                
-                if file_size_mb <= max_size_mb:
-                    break
-                
-                quality -= 10  
-            
-            buffer.seek(0)
-            
-            file_name = f'{self.product.name}_{self.product.id}_additional_{self.order}_optimized.jpg'
-            
-            self.image.save(file_name, ContentFile(buffer.read()), save=False)
-            buffer.close()
-            
-            return True
-            
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Image optimization failed for product image {self.id}: {str(e)}")
-            return False
+    def optimized_image_name(self):
+        return f'{self.product.name}_{self.product.id}_additional_{self.order}_optimized.jpg'
+
+
+class ProductFacetCount(models.Model):
+    """Number of active products per facet value, maintained by Product.save() (see facets.py)."""
+    facet = models.CharField(max_length=50)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['facet', 'value']
+        unique_together = ['facet', 'value']
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
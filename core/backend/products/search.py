@@ -0,0 +1,238 @@
+"""
+Ranked full-text search over the product catalog.
+
+On PostgreSQL, products are matched against the stored ``search_vector``
+column (GIN indexed) with prefix queries and ranked with ts_rank; when
+nothing matches, trigram similarity on name, brand and SKU provides typo
+tolerance. Other databases (SQLite in development) use an in-process
+inverted index with the same prefix and typo behaviour, rebuilt whenever
+the catalog cache version changes.
+"""
+import difflib
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from django.contrib.postgres.search import (SearchQuery, SearchRank, SearchVector,
+                                            TrigramSimilarity)
+from django.db import connection
+from django.db.models import Case, F, IntegerField, TextField, Value, When
+from django.db.models.functions import Cast, Greatest
+from core.catalog_cache import get_version, CATALOG
+from .models import Product
+
+# Text search configuration; 'simple' avoids stemming brand names and SKUs
+SEARCH_CONFIG = 'simple'
+
+# Minimum trigram similarity for the typo-tolerant fallback
+TRIGRAM_THRESHOLD = 0.2
+
+# Upper bound on ranked results returned by the in-process index
+MAX_RESULTS = 500
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    """Split text into lowercase search terms."""
+    return TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+# Product fields in the search vector, with their weights
+SEARCH_WEIGHTS = {
+    'name': 'A',
+    'sku': 'A',
+    'brand': 'B',
+    'attributes': 'C',
+    'description': 'D',
+}
+
+
+def _combine(vectors):
+    combined = vectors[0]
+    for vector in vectors[1:]:
+        combined = combined + vector
+    return combined
+
+
+def build_search_vector():
+    """Weighted search vector expression used to fill Product.search_vector."""
+    return _combine([
+        SearchVector(
+            Cast('attributes', output_field=TextField()) if field == 'attributes' else field,
+            weight=weight, config=SEARCH_CONFIG
+        )
+        for field, weight in SEARCH_WEIGHTS.items()
+    ])
+
+
+def instance_search_vector(product):
+    """
+    The search vector of a product's in-memory values, so Product.save()
+    writes it in the same INSERT or UPDATE as the product.
+    """
+    def text(field):
+        value = getattr(product, field)
+        if field == 'attributes' and value is not None:
+            value = json.dumps(value)
+        return Value(value, output_field=TextField())
+
+    return _combine([
+        SearchVector(text(field), weight=weight, config=SEARCH_CONFIG)
+        for field, weight in SEARCH_WEIGHTS.items()
+    ])
+
+
+def uses_postgres_search():
+    return connection.vendor == 'postgresql'
+
+
+def update_search_vectors(queryset=None):
+    """Recompute the stored search vectors (PostgreSQL only)."""
+    if not uses_postgres_search():
+        return 0
+    queryset = Product.objects.all() if queryset is None else queryset
+    return queryset.update(search_vector=build_search_vector())
+
+
+class InvertedIndex:
+    """Token -> {product id: field weight} postings with prefix and fuzzy lookup."""
+
+    FIELD_WEIGHTS = {
+        'name': 3.0,
+        'sku': 3.0,
+        'brand': 2.0,
+        'attributes': 1.0,
+        'description': 0.5,
+    }
+    PREFIX_QUALITY = 0.8
+    FUZZY_QUALITY = 0.6
+    FUZZY_CUTOFF = 0.8
+    MAX_EXPANSIONS = 50
+
+    def __init__(self, rows):
+        postings = defaultdict(dict)
+        for row in rows:
+            for field, weight in self.FIELD_WEIGHTS.items():
+                value = row[field]
+                if isinstance(value, dict):
+                    value = ' '.join(f'{key} {val}' for key, val in value.items())
+                for token in tokenize(value):
+                    if postings[token].get(row['id'], 0) < weight:
+                        postings[token][row['id']] = weight
+        self.postings = dict(postings)
+        self.tokens = sorted(self.postings)
+
+    def expand(self, term):
+        """Return (token, quality) pairs matching a term exactly, by prefix or fuzzily."""
+        matches = []
+        if term in self.postings:
+            matches.append((term, 1.0))
+
+        index = bisect_left(self.tokens, term)
+        while index < len(self.tokens) and len(matches) < self.MAX_EXPANSIONS:
+            token = self.tokens[index]
+            if not token.startswith(term):
+                break
+            if token != term:
+                matches.append((token, self.PREFIX_QUALITY))
+            index += 1
+
+        if not matches and len(term) >= 4:
+            for token in difflib.get_close_matches(term, self.tokens, n=5, cutoff=self.FUZZY_CUTOFF):
+                matches.append((token, self.FUZZY_QUALITY))
+        return matches
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Return product ids ordered by relevance."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = defaultdict(float)
+        matched_terms = defaultdict(int)
+        for term in terms:
+            best = {}
+            for token, quality in self.expand(term):
+                for product_id, weight in self.postings[token].items():
+                    best[product_id] = max(best.get(product_id, 0), weight * quality)
+            for product_id, score in best.items():
+                scores[product_id] += score
+                matched_terms[product_id] += 1
+
+        # Prefer products matching every term; fall back to any term
+        results = [pid for pid in scores if matched_terms[pid] == len(terms)] or list(scores)
+        results.sort(key=lambda pid: (-scores[pid], -pid))
+        return results[:limit]
+
+
+_index_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_inverted_index():
+    """Return the in-process index, rebuilding it after catalog changes."""
+    global _index, _index_version
+    version = get_version(CATALOG)
+    # Without a cache (DummyCache) there is no version to detect changes by
+    stale = version is None or _index_version != version
+    if _index is None or stale:
+        with _index_lock:
+            if _index is None or stale:
+                rows = Product.objects.values('id', *InvertedIndex.FIELD_WEIGHTS)
+                _index = InvertedIndex(rows)
+                _index_version = version
+    return _index
+
+
+def _postgres_search(query, queryset):
+    terms = tokenize(query)
+    if not terms:
+        return queryset.none()
+
+    # Terms only contain word characters, so they are safe in a raw tsquery
+    tsquery = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+    results = (
+        queryset.filter(search_vector=tsquery)
+        .annotate(rank=SearchRank(F('search_vector'), tsquery))
+        .order_by('-rank', '-created_at')
+    )
+    if results.exists():
+        return results
+
+    # Typo tolerance via trigram similarity
+    similarity = Greatest(
+        TrigramSimilarity('name', query),
+        TrigramSimilarity('brand', query),
+        TrigramSimilarity('sku', query),
+    )
+    return (
+        queryset.annotate(rank=similarity)
+        .filter(rank__gte=TRIGRAM_THRESHOLD)
+        .order_by('-rank', '-created_at')
+    )
+
+
+def _inverted_index_search(query, queryset):
+    product_ids = get_inverted_index().search(query)
+    if not product_ids:
+        return queryset.none()
+    ranking = Case(
+        *[When(id=product_id, then=position) for position, product_id in enumerate(product_ids)],
+        output_field=IntegerField()
+    )
+    return queryset.filter(id__in=product_ids).order_by(ranking)
+
+
+def search_products(query, queryset=None):
+    """
+    Return products matching the query, most relevant first.
+    Further filters can be applied to the returned queryset.
+    """
+    if queryset is None:
+        queryset = Product.objects.catalog()
+    if uses_postgres_search():
+        return _postgres_search(query, queryset)
+    return _inverted_index_search(query, queryset)
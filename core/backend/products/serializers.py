@@ -1,7 +1,23 @@
+from django.db import models
 from rest_framework import serializers
+from backend.imaging.variants import ready_hash, variants_by_hash
 from .models import Product, FeaturedProducts, ProductImage
 
 
+class ProductListSerializer(serializers.ListSerializer):
+    """Looks up the image variants of a whole page of products with one query."""
+    
+    def to_representation(self, data):
+        products = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        hashes = []
+        for product in products:
+            hashes.append(ready_hash(product))
+            if 'additional_images' in getattr(product, '_prefetched_objects_cache', {}):
+                hashes.extend(ready_hash(img) for img in product.additional_images.all())
+        self.context['image_variants'] = variants_by_hash(hashes)
+        return super().to_representation(products)
+
+
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for ProductImage model."""
     class Meta:
@@ -17,11 +33,12 @@ class ProductSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_vector', 'image_status', 'image_hash', 'image_claimed_at']
+        list_serializer_class = ProductListSerializer
     
     def get_all_images(self, obj):
         """Get all images including main image and additional images."""
-        return obj.get_all_images()
+        return obj.get_all_images(self.context.get('image_variants'))
 
 
 class ProductDetailSerializer(serializers.ModelSerializer):
@@ -40,10 +57,11 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'rating', 'discount_percentage', 'discount_text', 
             'discounted_price', 'has_discount', 'number_of_sales'
         ]
+        list_serializer_class = ProductListSerializer
     
     def get_all_images(self, obj):
         """Get all images including main image and additional images."""
-        return obj.get_all_images()
+        return obj.get_all_images(self.context.get('image_variants'))
 
 
 class FeaturedProductsSerializer(serializers.ModelSerializer):
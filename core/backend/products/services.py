@@ -0,0 +1,254 @@
+"""
+In-process catalog queries shared by the product API views and the
+template views in ``core.views``.
+"""
+import random
+from django.db.models import Count, Avg
+from core.catalog_cache import cached, CATALOG
+from .models import Product, FeaturedProducts, ProductFacetCount
+from . import facets
+from .search import search_products
+from backend.reviews.models import Review
+from .serializers import (ProductSerializer,
+                          FeaturedProductsSerializer,
+                          NewlyAddedProductsSerializer,
+                          BestSellerProductsSerializer,
+                          ProductTypeCountSerializer,
+                          ProductDetailSerializer
+                          )
+
+
+class InvalidFilterError(ValueError):
+    """Raised when a product filter parameter cannot be parsed."""
+
+
+def get_active_products():
+    """Return all active products with their images, newest first."""
+    return Product.objects.catalog().order_by('-created_at', '-id')
+
+
+def filter_products(params):
+    """
+    Apply the filter-products query parameters to the active catalog.
+    Returns a queryset, ranked by relevance when a search term is given;
+    raises InvalidFilterError on malformed numbers.
+    """
+    queryset = Product.objects.catalog()
+
+    search = (params.get('search') or '').strip()
+    product_type = params.get('product_type')
+    min_price = params.get('min_price')
+    max_price = params.get('max_price')
+    brand = params.get('brand')
+    rating = params.get('rating')
+    season = params.get('season')  # summer or winter
+    gender = params.get('gender')  # male or female
+
+    if product_type:
+        queryset = queryset.filter(product_type=product_type)
+
+    if min_price:
+        try:
+            queryset = queryset.filter(price__gte=float(min_price))
+        except ValueError:
+            raise InvalidFilterError('Invalid min_price parameter')
+
+    if max_price:
+        try:
+            queryset = queryset.filter(price__lte=float(max_price))
+        except ValueError:
+            raise InvalidFilterError('Invalid max_price parameter')
+
+    if brand:
+        queryset = queryset.filter(brand__icontains=brand)
+
+    if rating:
+        try:
+            queryset = queryset.filter(rating__gte=int(rating))
+        except ValueError:
+            raise InvalidFilterError('Invalid rating parameter')
+
+    # Filter by season / gender (for clothing products)
+    if season:
+        queryset = queryset.filter(attributes__season=season)
+
+    if gender:
+        queryset = queryset.filter(attributes__gender=gender)
+
+    if search:
+        queryset = search_products(search, queryset)
+
+    return queryset
+
+
+@cached(CATALOG, 'active-product-ids')
+def get_active_product_ids():
+    """
+    Return the ids of all active products. Cached, and refreshed whenever
+    the catalog changes or the cache entry expires.
+    """
+    return list(Product.objects.active().order_by('id').values_list('id', flat=True))
+
+
+def sample_products(count, seed=None, page=1):
+    """
+    Return up to `count` random active products without loading the catalog.
+    With a seed the order is a stable permutation, so successive pages never
+    repeat a product; without one, a fresh sample is drawn each call.
+    """
+    product_ids = get_active_product_ids()
+    if seed is None:
+        sampled_ids = random.sample(product_ids, min(count, len(product_ids)))
+    else:
+        permutation = list(product_ids)
+        random.Random(seed).shuffle(permutation)
+        start = (page - 1) * count
+        sampled_ids = permutation[start:start + count]
+
+    # Ids of products deactivated since the list was cached are skipped
+    products = Product.objects.catalog().in_bulk(sampled_ids)
+    return [products[product_id] for product_id in sampled_ids if product_id in products]
+
+
+def serialize_products(products, context=None):
+    """Serialize products with the full ProductSerializer."""
+    return ProductSerializer(products, many=True, context=context or {}).data
+
+
+@cached(CATALOG, 'latest-products')
+def get_latest_products(limit):
+    """Return the newest active products, serialized."""
+    return serialize_products(get_active_products()[:limit])
+
+
+@cached(CATALOG, 'featured-products')
+def get_featured_products():
+    """Return serialized featured products."""
+    featured_products = FeaturedProducts.objects.select_related('product')
+    return FeaturedProductsSerializer(featured_products, many=True).data
+
+
+@cached(CATALOG, 'newly-added-products')
+def get_newly_added_products():
+    """Return serialized newly added products."""
+    newly_added_products = Product.objects.filter(newly_added=True)
+    return NewlyAddedProductsSerializer(newly_added_products, many=True).data
+
+
+@cached(CATALOG, 'best-seller-products')
+def get_best_seller_products():
+    """Return serialized best seller products."""
+    best_seller_products = Product.objects.filter(best_seller=True)
+    return BestSellerProductsSerializer(best_seller_products, many=True).data
+
+
+@cached(CATALOG, 'product-type-counts')
+def get_product_type_counts():
+    """Return the active product count for every product type, including empty ones."""
+    count_dict = dict(
+        ProductFacetCount.objects.filter(facet='product_type').values_list('value', 'count')
+    )
+
+    full_data = [
+        {
+            'product_type': key,
+            'count': count_dict.get(key, 0)
+        }
+        for key, _ in Product.TYPE_CHOICES
+    ]
+
+    return ProductTypeCountSerializer(full_data, many=True).data
+
+
+@cached(CATALOG, 'facet-counts')
+def get_facet_counts():
+    """
+    Return active product counts for every facet, read from the maintained
+    facet table (no aggregate queries).
+    """
+    grouped = {}
+    for facet, value, count in ProductFacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        grouped.setdefault(facet, {})[value] = count
+
+    type_counts = grouped.get('product_type', {})
+    price_counts = grouped.get('price', {})
+    buckets = []
+    for low, high in facets.PRICE_BUCKETS:
+        label = facets.bucket_label(low, high)
+        buckets.append({'value': label, 'min_price': low, 'max_price': high, 'count': price_counts.get(label, 0)})
+
+    def by_count(facet):
+        counts = grouped.get(facet, {})
+        return [
+            {'value': value, 'count': counts[value]}
+            for value in sorted(counts, key=lambda value: (-counts[value], value))
+        ]
+
+    return {
+        'product_type': [
+            {'value': key, 'name': name, 'count': type_counts.get(key, 0)}
+            for key, name in Product.TYPE_CHOICES
+        ],
+        'brand': by_count('brand'),
+        'price': buckets,
+        'season': by_count('season'),
+        'gender': by_count('gender'),
+    }
+
+
+@cached(CATALOG, 'product-data')
+def get_product_data(product_id):
+    """Return the serialized active product, or None if it does not exist."""
+    try:
+        product = Product.objects.with_images().get(id=product_id, is_active=True)
+    except Product.DoesNotExist:
+        return None
+    return ProductDetailSerializer(product).data
+
+
+@cached(CATALOG, 'product-reviews')
+def get_product_reviews(product_id):
+    """Return review stats and the 10 most recent active reviews of a product."""
+    reviews = Review.objects.filter(product_id=product_id, is_active=True).order_by('-created_at')
+    review_stats = reviews.aggregate(count=Count('id'), average_rating=Avg('rating'))
+
+    reviews_data = {
+        'count': review_stats['count'],
+        'average_rating': review_stats['average_rating'] or 0,
+        'reviews': []
+    }
+
+    for review in reviews[:10]:
+        review_data = {
+            'id': review.id,
+            'name': review.name,
+            'rating': review.rating,
+            'description': review.description,
+            'image': None,
+            'created_at': review.created_at
+        }
+
+        # Safely get image URL
+        if review.image:
+            try:
+                review_data['image'] = review.image.url
+            except Exception:
+                review_data['image'] = None
+
+        reviews_data['reviews'].append(review_data)
+
+    return reviews_data
+
+
+def get_product_detail(product_id):
+    """
+    Return the product detail payload (product plus its latest reviews),
+    or None if the product does not exist or is inactive.
+    """
+    product_data = get_product_data(product_id)
+    if product_data is None:
+        return None
+    return {
+        'product': product_data,
+        'reviews': get_product_reviews(product_id)
+    }
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.catalog_cache import bump_version_on_commit, CATALOG
+from .models import Product, FeaturedProducts, ProductImage
+from .facets import apply_facet_changes, instance_facets
+
+
+@receiver(post_delete, sender=Product)
+def remove_facet_counts(sender, instance, **kwargs):
+    apply_facet_changes(instance_facets(instance), set())
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=FeaturedProducts)
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Drop cached catalog responses whenever a product changes."""
+    bump_version_on_commit(CATALOG)
@@ -1,3 +1,288 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from core.views import SHOP_PAGE_SIZE, ShopView
+from .facets import rebuild_facet_counts
+from .models import Product, ProductFacetCount, ProductImage
 
-# Create your tests here.
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+@override_settings(CACHES=NO_CACHE)
+class ProductListQueryCountTests(TestCase):
+    """Product list endpoints must not issue queries per product or per image."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(25):
+            product = Product.objects.create(
+                name=f'Product {index}',
+                sku=f'SKU-{index}',
+                price=1000 + index,
+                brand='Brand',
+                image=f'product_images/product-{index}.jpg',
+            )
+            for order in (1, 2):
+                ProductImage.objects.create(
+                    product=product, image=f'product_images/product-{index}-{order}.jpg', order=order
+                )
+
+    def assertConstantQueries(self, url):
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+        with self.assertNumQueries(len(small_page.captured_queries)):
+            response = self.client.get(url, {'page_size': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(len(response.data['results'][0]['all_images']), 3)
+
+    def test_get_all_products_query_count(self):
+        self.assertConstantQueries('/api/products/get-all-products/')
+
+    def test_filter_products_query_count(self):
+        self.assertConstantQueries('/api/products/filter-products/')
+
+    def test_filter_products_next_links_cover_every_product(self):
+        seen = []
+        url = '/api/products/filter-products/?page_size=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen += [product['id'] for product in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(seen), sorted(Product.objects.values_list('id', flat=True)))
+
+
+@override_settings(CACHES=NO_CACHE)
+class FilterProductsSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.by_name = Product.objects.create(name='Rose Oud', sku='ROSE-1', price=5000)
+        cls.by_description = [
+            Product.objects.create(name=f'Perfume {index}', sku=f'P-{index}', price=5000,
+                                   description='Notes of rose and amber')
+            for index in range(3)
+        ]
+
+    def test_search_keeps_relevance_order(self):
+        # The name match is the oldest product, so date ordering would put it last
+        response = self.client.get('/api/products/filter-products/', {'search': 'rose', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['id'], self.by_name.id)
+        self.assertIsNone(response.data['previous'])
+        self.assertIn('page=2', response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+        self.assertNotIn('page=', response.data['previous'])
+
+
+@override_settings(CACHES=NO_CACHE)
+class ShopPageSizeTests(TestCase):
+    """ShopView.fetch_product_page(), called directly: page sources run in threads with their own connections."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(8):
+            Product.objects.create(name=f'Product {index}', sku=f'SKU-{index}', price=1000 + index)
+
+    def fetch_product_page(self, **params):
+        view = ShopView()
+        view.setup(RequestFactory().get('/shop/', params))
+        return view.fetch_product_page()
+
+    def test_page_size_below_one_uses_the_default(self):
+        for page_size in ('0', '-5'):
+            with self.subTest(page_size=page_size):
+                products, pagination_info = self.fetch_product_page(page_size=page_size)
+                self.assertEqual(len(products), SHOP_PAGE_SIZE)
+                self.assertEqual(pagination_info['pages'], 2)
+
+    def test_page_size_is_capped(self):
+        products, pagination_info = self.fetch_product_page(page_size='1000')
+        self.assertEqual(len(products), 8)
+        self.assertEqual(pagination_info['pages'], 1)
+
+
+@override_settings(CACHES=NO_CACHE)
+class ProductSearchTests(TestCase):
+    """The search endpoint on the in-process index (development databases)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rose = Product.objects.create(name='Rose Oud', sku='RO-1', price=5000, brand='Amouage')
+        cls.rosewood = Product.objects.create(name='Rosewood Attar', sku='RW-1', price=3000)
+        cls.sandalwood = Product.objects.create(name='Sandalwood Mist', sku='SW-1', price=2000,
+                                                description='A hint of rose')
+        cls.vanilla = Product.objects.create(name='Vanilla Musk', sku='VM-1', price=1500)
+        Product.objects.create(name='Rose Discontinued', sku='RD-1', price=1000, is_active=False)
+
+    def search(self, **params):
+        response = self.client.get('/api/products/search/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [product['id'] for product in response.data['results']]
+
+    def test_exact_then_prefix_then_description_matches(self):
+        self.assertEqual(self.search(q='rose'), [self.rose.id, self.rosewood.id, self.sandalwood.id])
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search(q='sandal'), [self.sandalwood.id])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.search(q='vanila'), [self.vanilla.id])
+        self.assertEqual(self.search(q='amouge'), [self.rose.id])
+
+    def test_every_term_must_match_when_possible(self):
+        self.assertEqual(self.search(q='rose attar'), [self.rosewood.id])
+
+    def test_limit_and_filters(self):
+        self.assertEqual(self.search(q='rose', limit=1), [self.rose.id])
+        self.assertEqual(self.search(q='rose', max_price=2500), [self.sandalwood.id])
+
+    def test_invalid_parameters(self):
+        for params in ({}, {'q': '  '}, {'q': 'rose', 'limit': 0}, {'q': 'rose', 'limit': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/products/search/', params).status_code, 400)
+
+    def test_search_pagination_skips_the_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/products/filter-products/', {'search': 'rose', 'page_size': 1})
+        self.assertEqual([product['id'] for product in response.data['results']], [self.rose.id])
+        self.assertIn('page=2', response.data['next'])
+        self.assertFalse([query for query in queries.captured_queries if 'COUNT(' in query['sql']])
+
+    def test_search_pagination_pages(self):
+        response = self.client.get('/api/products/filter-products/', {'search': 'rose', 'page_size': 2, 'page': 2})
+        self.assertEqual([product['id'] for product in response.data['results']], [self.sandalwood.id])
+        self.assertIsNone(response.data['next'])
+
+        for page in ('0', 'x'):
+            with self.subTest(page=page):
+                response = self.client.get('/api/products/filter-products/', {'search': 'rose', 'page': page})
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=NO_CACHE)
+class RandomProductsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.active_ids = {
+            Product.objects.create(name=f'Product {index}', sku=f'SKU-{index}', price=100 + index).id
+            for index in range(12)
+        }
+        cls.inactive_ids = {
+            Product.objects.create(name=f'Retired {index}', sku=f'OLD-{index}', price=100, is_active=False).id
+            for index in range(3)
+        }
+
+    def sample(self, **params):
+        response = self.client.get('/api/products/random/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [product['id'] for product in response.data]
+
+    def test_same_seed_gives_the_same_page(self):
+        first = self.sample(seed=42, page=2, count=5)
+        self.assertEqual(len(first), 5)
+        self.assertEqual(self.sample(seed=42, page=2, count=5), first)
+        self.assertNotEqual(self.sample(seed=43, page=2, count=5), first)
+
+    def test_seeded_pages_do_not_overlap(self):
+        pages = [self.sample(seed=7, page=page, count=5) for page in (1, 2, 3, 4)]
+        sampled = [product_id for page in pages for product_id in page]
+        self.assertEqual(len(sampled), len(set(sampled)))
+        self.assertEqual(set(sampled), self.active_ids)
+        self.assertEqual(pages[-1], [])
+
+    def test_session_seed_pages_do_not_overlap(self):
+        first = self.sample(page=1, count=6)
+        second = self.sample(page=2, count=6)
+        self.assertEqual(set(first) | set(second), self.active_ids)
+        self.assertIn('random_products_seed', self.client.session)
+
+    def test_only_active_products_are_sampled(self):
+        self.assertEqual(set(self.sample(count=50)), self.active_ids)
+        self.assertEqual(set(self.sample(seed=1, count=50)), self.active_ids)
+
+    def test_invalid_parameters(self):
+        for params in ({'count': 0}, {'page': 0}, {'count': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/products/random/', params).status_code, 400)
+
+
+class FacetCountTests(TestCase):
+    """Facet counts kept by Product.save() must equal a rebuild from scratch."""
+
+    def counts(self):
+        return {
+            (facet, value): count
+            for facet, value, count in ProductFacetCount.objects.exclude(count=0).values_list('facet', 'value', 'count')
+        }
+
+    def assertMatchesRebuild(self, expected=None):
+        incremental = self.counts()
+        if expected is not None:
+            self.assertEqual(incremental, expected)
+        rebuild_facet_counts()
+        self.assertEqual(incremental, self.counts())
+
+    def create(self, index, **fields):
+        defaults = {'name': f'Product {index}', 'sku': f'SKU-{index}', 'price': 800, 'brand': 'Alpha'}
+        return Product.objects.create(**{**defaults, **fields})
+
+    def test_create_edit_and_deactivate(self):
+        shirt = self.create(1, product_type='clothing', attributes={'season': 'summer', 'gender': 'male'})
+        self.create(2, price=7000)
+        self.assertMatchesRebuild()
+
+        shirt.brand = 'Beta'
+        shirt.price = 12000
+        shirt.attributes = {'season': 'winter', 'gender': 'male'}
+        shirt.save()
+        self.assertMatchesRebuild()
+
+        shirt.is_active = False
+        shirt.save(update_fields=['is_active'])
+        self.assertMatchesRebuild()
+        self.assertNotIn(('brand', 'Beta'), self.counts())
+
+        shirt.is_active = True
+        shirt.save()
+        shirt.delete()
+        self.assertMatchesRebuild()
+
+    def test_saves_of_other_fields_leave_counts_alone(self):
+        product = self.create(1)
+        with CaptureQueriesContext(connection) as queries:
+            product.number_of_sales = 5
+            product.save(update_fields=['number_of_sales'])
+        self.assertFalse([query for query in queries.captured_queries if 'facet' in query['sql']])
+        self.assertMatchesRebuild()
+
+    def test_stale_instance_diffs_against_the_stored_row(self):
+        product = self.create(1)
+        stale = Product.objects.get(pk=product.pk)
+
+        product.brand = 'Beta'
+        product.save()
+        # The stale copy still holds brand Alpha, which it writes back with its price change
+        stale.price = 20000
+        stale.save()
+
+        self.assertMatchesRebuild()
+        self.assertEqual(self.counts()[('brand', 'Alpha')], 1)
+        self.assertNotIn(('brand', 'Beta'), self.counts())
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_stored_row_is_read_under_its_lock(self):
+        product = self.create(1)
+        product.brand = 'Beta'
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+        self.assertTrue([query for query in queries.captured_queries if 'FOR UPDATE' in query['sql']])
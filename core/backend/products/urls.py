@@ -4,7 +4,9 @@ from .views import (ProductView,
                     NewlyAddedProductsApiView, 
                     BestSellerProductsApiView,
                     ProductTypeCountAPIView,
+                    ProductFacetsAPIView,
                     FilteredProductsAPIView,
+                    ProductSearchAPIView,
                     ProductsByTypeAPIView,
                     ProductsByPriceRangeAPIView,
                     ProductDetailAPIView,
@@ -17,9 +19,11 @@ urlpatterns = [
     path('get-newly-added-products/', NewlyAddedProductsApiView.as_view(), name='get-newly-added-products'),
     path('get-best-seller-products/', BestSellerProductsApiView.as_view(), name='get-best-seller-products'),
     path('get-product-type-count/', ProductTypeCountAPIView.as_view(), name='get-product-type-count'),
+    path('facets/', ProductFacetsAPIView.as_view(), name='product-facets'),
     
     # New filtering endpoints
     path('filter-products/', FilteredProductsAPIView.as_view(), name='filter-products'),
+    path('search/', ProductSearchAPIView.as_view(), name='product-search'),
     path('products-by-type/<str:product_type>/', ProductsByTypeAPIView.as_view(), name='products-by-type'),
     path('products-by-price/', ProductsByPriceRangeAPIView.as_view(), name='products-by-price'),
     
@@ -1,20 +1,17 @@
-from django.db.models import Count, Q, Avg
 from django_filters import rest_framework as filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Product, FeaturedProducts
-from .serializers import (ProductSerializer, 
-                          FeaturedProductsSerializer, 
-                          NewlyAddedProductsSerializer, 
-                          BestSellerProductsSerializer,
-                          ProductTypeCountSerializer,
-                          ProductDetailSerializer
-                          )
+from .models import Product
+from .serializers import ProductSerializer
+from . import services
+from .search import search_products
+from core.catalog_cache import cache_response, CATALOG
 
 
 from rest_framework import status, pagination, viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.exceptions import NotFound, APIException
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 import random
 
 
@@ -25,10 +22,16 @@ class ProductFilter(filters.FilterSet):
     max_price = filters.NumberFilter(field_name='price', lookup_expr='lte')
     brand = filters.CharFilter(field_name='brand', lookup_expr='icontains')
     rating = filters.NumberFilter(field_name='rating', lookup_expr='gte')
-    
+    search = filters.CharFilter(method='filter_search')
+
     class Meta:
         model = Product
-        fields = ['product_type', 'min_price', 'max_price', 'brand', 'rating']
+        fields = ['product_type', 'min_price', 'max_price', 'brand', 'rating', 'search']
+
+    def filter_search(self, queryset, name, value):
+        """Full-text search, ordered by relevance."""
+        value = value.strip()
+        return search_products(value, queryset) if value else queryset
 
 
 class ProductPagination(pagination.PageNumberPagination):
@@ -48,6 +51,54 @@ class ProductPagination(pagination.PageNumberPagination):
         )
 
 
+class ProductCursorPagination(pagination.CursorPagination):
+    """Keyset pagination on (created_at, id), so deep pages cost the same as the first."""
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class ProductSearchPagination(pagination.PageNumberPagination):
+    """
+    Page numbers over a relevance-ordered queryset, which keyset pagination
+    cannot follow. Instead of a COUNT, one extra row is fetched to tell
+    whether a next page exists.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound('Invalid page.')
+
+        page_size = self.get_page_size(request)
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.has_previous = self.page_number > 1
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
 class ProductView(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     pagination_class = ProductPagination 
@@ -57,16 +108,25 @@ class ProductView(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         try:
-            queryset = Product.objects.filter(is_active=True).order_by('-created_at')
+            queryset = services.get_active_products()
             if not queryset.exists():
                 raise NotFound(detail="No active products found.")
             return queryset
         except Exception as e:
             raise APIException(detail=f"Failed to fetch products: {str(e)}")
 
+    @cache_response(CATALOG)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class FilteredProductsAPIView(APIView):
-    """API for advanced filtering of products by type and price range."""
+    """
+    API for advanced filtering of products by type and price range.
+
+    Results are paginated (page_size, default 20, at most 100) without a
+    total count: follow `next` until it is null to read every match.
+    """
     permission_classes = [AllowAny]
     
     def get(self, request):
@@ -78,62 +138,31 @@ class FilteredProductsAPIView(APIView):
             rating = request.query_params.get('rating')
             season = request.query_params.get('season')  # summer or winter
             gender = request.query_params.get('gender')  # male or female
+            search = request.query_params.get('search')
             
-            queryset = Product.objects.filter(is_active=True)
-            
-            if product_type:
-                queryset = queryset.filter(product_type=product_type)
-            
-            if min_price:
-                try:
-                    min_price = float(min_price)
-                    queryset = queryset.filter(price__gte=min_price)
-                except ValueError:
-                    return Response(
-                        {'error': 'Invalid min_price parameter'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            if max_price:
-                try:
-                    max_price = float(max_price)
-                    queryset = queryset.filter(price__lte=max_price)
-                except ValueError:
-                    return Response(
-                        {'error': 'Invalid max_price parameter'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            if brand:
-                queryset = queryset.filter(brand__icontains=brand)
-            
-            if rating:
-                try:
-                    rating = int(rating)
-                    queryset = queryset.filter(rating__gte=rating)
-                except ValueError:
-                    return Response(
-                        {'error': 'Invalid rating parameter'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            # Filter by season (for clothing products)
-            if season:
-                queryset = queryset.filter(attributes__season=season)
+            try:
+                queryset = services.filter_products(request.query_params)
+            except services.InvalidFilterError as e:
+                return Response(
+                    {'error': str(e)}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            # Filter by gender (for clothing products)
-            if gender:
-                queryset = queryset.filter(attributes__gender=gender)
+            # Search results keep their relevance order
+            paginator = ProductSearchPagination() if (search or '').strip() else ProductCursorPagination()
+            try:
+                page = paginator.paginate_queryset(queryset, request, view=self)
+            except NotFound as e:
+                return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
             
-            if not queryset.exists():
+            if not page and not paginator.has_previous:
                 return Response(
                     {'message': 'No products found with the specified filters', 'results': []},
                     status=status.HTTP_200_OK
                 )
             
-            serializer = ProductSerializer(queryset, many=True)
+            serializer = ProductSerializer(page, many=True)
             return Response({
-                'count': queryset.count(),
                 'filters_applied': {
                     'product_type': product_type,
                     'min_price': min_price,
@@ -141,8 +170,11 @@ class FilteredProductsAPIView(APIView):
                     'brand': brand,
                     'rating': rating,
                     'season': season,
-                    'gender': gender
+                    'gender': gender,
+                    'search': search
                 },
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
                 'results': serializer.data
             })
             
@@ -153,6 +185,55 @@ class FilteredProductsAPIView(APIView):
             )
 
 
+class ProductSearchAPIView(APIView):
+    """Full-text product search, most relevant first. Tolerates prefixes and typos."""
+    permission_classes = [AllowAny]
+    default_limit = 20
+    max_limit = 100
+
+    @cache_response(CATALOG)
+    def get(self, request):
+        try:
+            query = request.query_params.get('q', '').strip()
+            if not query:
+                return Response(
+                    {'error': 'The q parameter is required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+                if limit < 1:
+                    raise ValueError
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid limit parameter'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                queryset = services.filter_products(request.query_params)
+            except services.InvalidFilterError as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            products = list(search_products(query, queryset)[:limit])
+            serializer = ProductSerializer(products, many=True)
+            return Response({
+                'query': query,
+                'count': len(products),
+                'results': serializer.data
+            })
+
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to search products: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class ProductsByTypeAPIView(APIView):
     """API to get products filtered by specific product type."""
     permission_classes = [AllowAny]
@@ -166,10 +247,7 @@ class ProductsByTypeAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            products = Product.objects.filter(
-                product_type=product_type, 
-                is_active=True
-            )
+            products = Product.objects.catalog().filter(product_type=product_type)
             
             if not products.exists():
                 return Response(
@@ -215,7 +293,7 @@ class ProductsByPriceRangeAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            queryset = Product.objects.filter(is_active=True, price__gte=min_price)
+            queryset = Product.objects.catalog().filter(price__gte=min_price)
             if max_price:
                 queryset = queryset.filter(price__lte=max_price)
             
@@ -245,27 +323,21 @@ class ProductsByPriceRangeAPIView(APIView):
 class FeaturedProdcutsApiView(APIView):
     def get(self, request):
         try:
-            featured_products = FeaturedProducts.objects.all()
-            serializer = FeaturedProductsSerializer(featured_products, many=True)
-            return Response(serializer.data)
+            return Response(services.get_featured_products())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class NewlyAddedProductsApiView(APIView):
     def get(self, request):
         try:
-            newly_added_products = Product.objects.filter(newly_added=True)
-            serializer = NewlyAddedProductsSerializer(newly_added_products, many=True)
-            return Response(serializer.data)
+            return Response(services.get_newly_added_products())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class BestSellerProductsApiView(APIView):
     def get(self, request):
         try:
-            best_seller_products = Product.objects.filter(best_seller=True)
-            serializer = BestSellerProductsSerializer(best_seller_products, many=True)
-            return Response(serializer.data)
+            return Response(services.get_best_seller_products())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -273,20 +345,18 @@ class BestSellerProductsApiView(APIView):
 class ProductTypeCountAPIView(APIView):
     permission_classes = [AllowAny]
     def get(self, request):
-        product_counts = Product.objects.values('product_type').annotate(count=Count('id'))
+        return Response(services.get_product_type_counts())
 
-        count_dict = {item['product_type']: item['count'] for item in product_counts}
 
-        full_data = [
-            {
-                'product_type': key,
-                'count': count_dict.get(key, 0)
-            }
-            for key, _ in Product.TYPE_CHOICES
-        ]
+class ProductFacetsAPIView(APIView):
+    """Active product counts per product type, brand, price bucket, season and gender."""
+    permission_classes = [AllowAny]
 
-        serializer = ProductTypeCountSerializer(full_data, many=True)
-        return Response(serializer.data)
+    def get(self, request):
+        try:
+            return Response(services.get_facet_counts())
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class ProductDetailAPIView(APIView):
@@ -295,77 +365,14 @@ class ProductDetailAPIView(APIView):
     
     def get(self, request, product_id):
         try:
-            product = Product.objects.get(id=product_id, is_active=True)
-            
-            # Get product reviews
-            try:
-                reviews = product.reviews.filter(is_active=True).order_by('-created_at')
-            except Exception as e:
-                # If there's an issue with reviews, continue without them
-                reviews = []
-                print(f"Warning: Could not fetch reviews for product {product_id}: {e}")
-            
-            # Serialize product with all details
-            try:
-                product_serializer = ProductDetailSerializer(product)
-                product_data = product_serializer.data
-            except Exception as e:
+            product_data = services.get_product_detail(product_id)
+            if product_data is None:
                 return Response(
-                    {'error': f'Failed to serialize product: {str(e)}'}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    {'error': 'Product not found or inactive'}, 
+                    status=status.HTTP_404_NOT_FOUND
                 )
+            return Response(product_data)
             
-            # Prepare response data
-            response_data = {
-                'product': product_data,
-                'reviews': {
-                    'count': len(reviews) if reviews else 0,
-                    'average_rating': 0,
-                    'reviews': []
-                }
-            }
-            
-            # Calculate average rating if reviews exist
-            if reviews:
-                try:
-                    avg_rating = reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
-                    response_data['reviews']['average_rating'] = avg_rating
-                except Exception as e:
-                    print(f"Warning: Could not calculate average rating: {e}")
-                    response_data['reviews']['average_rating'] = 0
-            
-            # Add review details if needed
-            if reviews:
-                for review in reviews[:10]:  # Limit to 10 most recent reviews
-                    try:
-                        review_data = {
-                            'id': review.id,
-                            'name': review.name,
-                            'rating': review.rating,
-                            'description': review.description,
-                            'image': None,
-                            'created_at': review.created_at
-                        }
-                        
-                        # Safely get image URL
-                        if review.image:
-                            try:
-                                review_data['image'] = review.image.url
-                            except Exception:
-                                review_data['image'] = None
-                        
-                        response_data['reviews']['reviews'].append(review_data)
-                    except Exception as e:
-                        print(f"Warning: Could not serialize review {review.id}: {e}")
-                        continue
-            
-            return Response(response_data)
-            
-        except Product.DoesNotExist:
-            return Response(
-                {'error': 'Product not found or inactive'}, 
-                status=status.HTTP_404_NOT_FOUND
-            )
         except Exception as e:
             return Response(
                 {'error': f'Failed to fetch product details: {str(e)}'}, 
@@ -374,17 +381,37 @@ class ProductDetailAPIView(APIView):
 
 
 class RandomProductsAPIView(APIView):
-    """API for getting random products for product slider."""
+    """
+    API for getting random products for product slider.
+    Pass `seed` (or `page`, which seeds from the session) to get a stable
+    order that can be paged through without repeats.
+    """
     permission_classes = [AllowAny]
+    default_count = 8
+    max_count = 50
+    session_seed_key = 'random_products_seed'
     
     def get(self, request):
         try:
-            products = Product.objects.filter(is_active=True)
-            
-            product_list = list(products)
-            random.shuffle(product_list)
-            
-            random_products = product_list[:8]
+            try:
+                count = min(int(request.query_params.get('count', self.default_count)), self.max_count)
+                page = int(request.query_params.get('page', 1))
+                if count < 1 or page < 1:
+                    raise ValueError
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid count or page parameter'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            seed = request.query_params.get('seed')
+            if seed is None and 'page' in request.query_params:
+                seed = request.session.get(self.session_seed_key)
+                if seed is None:
+                    seed = random.getrandbits(32)
+                    request.session[self.session_seed_key] = seed
+
+            random_products = services.sample_products(count, seed=seed, page=page)
             
             serializer = ProductSerializer(random_products, many=True)
             
@@ -1,9 +1,12 @@
 from django.contrib import admin
+from backend.imaging.admin import force_reoptimize_images, optimize_images
 from .models import Review
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('name', 'product', 'rating', 'is_active', 'created_at', 'updated_at') 
+    list_display = ('name', 'product', 'rating', 'is_active', 'image_status', 'created_at', 'updated_at') 
+    list_select_related = ('product',)
     list_filter = ('product', 'rating', 'is_active', 'created_at') 
     search_fields = ('name', 'description', 'product__name') 
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('image_status', 'created_at', 'updated_at')
+    actions = [optimize_images, force_reoptimize_images]
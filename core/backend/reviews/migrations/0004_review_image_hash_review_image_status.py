@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_review_user_alter_review_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the optimized image', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='ready', editable=False, max_length=20),
+        ),
+    ]
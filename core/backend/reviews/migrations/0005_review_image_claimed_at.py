@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_image_hash_review_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='image_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When a worker started processing the image', null=True),
+        ),
+    ]
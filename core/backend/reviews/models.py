@@ -1,11 +1,12 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
+from backend.imaging.models import OptimizedImageMixin
 from backend.products.models import Product
 
 User = get_user_model()
 
-class Review(models.Model):
+class Review(OptimizedImageMixin, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews', null=True, blank=True)
     name = models.CharField(max_length=255, blank=True)  # Optional, can be auto-populated from user
     product = models.ForeignKey(Product, on_delete=models.CASCADE,null=True, blank=True, related_name='reviews')
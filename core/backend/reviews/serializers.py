@@ -4,7 +4,7 @@ from .models import Review
 class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
-        fields = '__all__'
+        exclude = ['image_status', 'image_hash', 'image_claimed_at']
         read_only_fields = ('created_at', 'updated_at', 'user')
     
     def create(self, validated_data):
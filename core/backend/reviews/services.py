@@ -0,0 +1,14 @@
+"""
+In-process review queries shared by the review API views and the
+template views in ``core.views``.
+"""
+from core.catalog_cache import cached, CATALOG
+from .models import Review
+from .serializers import ReviewSerializer
+
+
+@cached(CATALOG, 'active-reviews')
+def get_active_reviews():
+    """Return serialized active reviews."""
+    reviews = Review.objects.filter(is_active=True)
+    return ReviewSerializer(reviews, many=True).data
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.catalog_cache import bump_version_on_commit, CATALOG
+from .models import Review
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Drop cached catalog responses (product details embed reviews)."""
+    bump_version_on_commit(CATALOG)
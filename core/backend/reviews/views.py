@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from .models import Review
 from .serializers import ReviewSerializer
+from . import services
 from backend.products.models import Product
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
@@ -103,10 +104,9 @@ class ActiveReviewsApiView(APIView):
 
     def get(self, request):
         try:
-            reviews = Review.objects.filter(is_active=True)
-            if not reviews.exists():
+            reviews = services.get_active_reviews()
+            if not reviews:
                 return Response({"message": "No active reviews found."}, status=status.HTTP_404_NOT_FOUND)
-            serializer = ReviewSerializer(reviews, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(reviews, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": "Something went wrong."}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
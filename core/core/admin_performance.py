@@ -0,0 +1,90 @@
+"""
+Changelist helpers for admins over large tables.
+
+Two things make a Django changelist slow once a table grows: the exact
+``COUNT(*)`` behind pagination and the ``SELECT DISTINCT`` that every
+"all values" list filter (e.g. city, country) runs on each page load.
+LargeTableAdminMixin replaces both when ADMIN_PERFORMANCE_MODE is on:
+
+- On PostgreSQL, the unfiltered changelist is paginated with the planner's
+  row estimate (``pg_class.reltuples``) once the table holds more than
+  ADMIN_ESTIMATED_COUNT_THRESHOLD rows. Filtered or searched changelists,
+  smaller tables and other databases still count exactly.
+- CachedAllValuesFieldListFilter keeps the distinct values of a filter in
+  the cache for ADMIN_FILTER_CHOICES_TIMEOUT seconds.
+"""
+import logging
+from django.conf import settings
+from django.contrib.admin.filters import AllValuesFieldListFilter
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def estimated_count(model, using='default'):
+    """Return PostgreSQL's row estimate for a model's table, or None if unknown."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [connection.ops.quote_name(model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 for tables that were never vacuumed or analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the size of unfiltered querysets on large tables."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if getattr(queryset, 'query', None) is not None and not queryset.query.where:
+            try:
+                estimate = estimated_count(queryset.model, queryset.db)
+            except Exception as e:
+                logger.error(f"Failed to estimate row count of {queryset.model._meta.label}: {str(e)}")
+                estimate = None
+            if estimate is not None and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CachedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose distinct values are cached."""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        if not settings.ADMIN_PERFORMANCE_MODE:
+            return
+        # lookup_choices is still a lazy queryset here; evaluate it only on a miss
+        cache_key = f'admin-filter-choices:{model._meta.label_lower}:{field_path}'
+        try:
+            choices = cache.get(cache_key)
+            if choices is None:
+                choices = list(self.lookup_choices)
+                cache.set(cache_key, choices, settings.ADMIN_FILTER_CHOICES_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Admin filter choices cache unavailable: {str(e)}")
+            return
+        self.lookup_choices = choices
+
+
+class LargeTableAdminMixin:
+    """ModelAdmin mixin using estimated counts for changelists of large tables."""
+
+    # Never run a second COUNT(*) of the whole table next to filtered results
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if settings.ADMIN_PERFORMANCE_MODE:
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
@@ -0,0 +1,91 @@
+"""
+Concurrent fan-out for template views that aggregate several independent
+data sources.
+
+Each source is a blocking callable (usually a catalog service query). The
+sources of a page run concurrently in worker threads, each with its own
+timeout, so page latency is bounded by the slowest source instead of the
+sum of all of them. A source that fails or times out falls back to its
+default value and the page still renders.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.views.generic import TemplateView
+
+logger = logging.getLogger(__name__)
+
+# Dedicated pool so a timed-out source never holds up the event loop's
+# default executor when it is shut down.
+source_executor = ThreadPoolExecutor(thread_name_prefix='aggregation')
+
+
+class Source:
+    """A blocking fetch function plus its fallback value and timeout."""
+
+    def __init__(self, fetch, default=None, timeout=None):
+        self.fetch = fetch
+        self.default = default
+        self.timeout = timeout
+
+    def get_default(self):
+        """Return a fresh fallback value (callables are invoked)."""
+        return self.default() if callable(self.default) else self.default
+
+
+def _run_source(fetch):
+    """Run a fetch in a worker thread and release its DB connection afterwards."""
+    try:
+        return fetch()
+    finally:
+        close_old_connections()
+
+
+async def fetch_source(name, source):
+    """Run a single source, degrading to its default on error or timeout."""
+    timeout = source.timeout or settings.AGGREGATION_SOURCE_TIMEOUT
+    try:
+        return await asyncio.wait_for(
+            sync_to_async(_run_source, thread_sensitive=False, executor=source_executor)(source.fetch),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Source '{name}' timed out after {timeout}s, using default")
+    except Exception as e:
+        logger.error(f"Source '{name}' failed: {str(e)}")
+    return source.get_default()
+
+
+async def gather_sources(sources):
+    """
+    Run all sources concurrently.
+    Takes a dict of name -> Source and returns a dict of name -> result.
+    """
+    names = list(sources)
+    results = await asyncio.gather(*(fetch_source(name, sources[name]) for name in names))
+    return dict(zip(names, results))
+
+
+class AggregatedTemplateView(TemplateView):
+    """
+    TemplateView whose context is built from concurrently fetched sources.
+    Subclasses return their sources from get_sources(); the results are
+    merged into the context before get_context_data() post-processes them.
+    """
+
+    def get_sources(self):
+        """Return a dict of context name -> Source."""
+        return {}
+
+    async def get(self, request, *args, **kwargs):
+        self.source_results = await gather_sources(self.get_sources())
+        context = self.get_context_data(**kwargs)
+        return self.render_to_response(context)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.source_results)
+        return context
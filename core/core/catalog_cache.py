@@ -0,0 +1,134 @@
+"""
+Cache layer for the public catalog reads.
+
+Entries are grouped into namespaces (catalog, blog). Each namespace has a
+version number stored in the cache and every key embeds it, so bumping the
+version from a model signal (once the change commits) invalidates the
+whole namespace at once; stale entries simply expire. Keys also embed a
+digest of the query parameters.
+
+Cache errors (e.g. Redis being unavailable) never fail a request: the data
+is computed as if the cache were empty.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CATALOG = 'catalog'  # products, featured products, product images and reviews
+BLOG = 'blog'
+
+
+def _version_key(namespace):
+    return f'catalog-version:{namespace}'
+
+
+def get_version(namespace):
+    """Return the current version of a namespace, initialising it if missing."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed with a timestamp so entries left over from an evicted
+        # version key can never be served again.
+        cache.add(key, int(time.time()), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every cached entry of a namespace."""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time()), timeout=None)
+    except Exception as e:
+        logger.error(f"Failed to invalidate catalog cache '{namespace}': {str(e)}")
+
+
+def bump_version_on_commit(namespace):
+    """
+    Invalidate a namespace once the current transaction commits (at once
+    outside a transaction), so readers cannot cache uncommitted data under
+    the new version.
+    """
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def make_key(namespace, name, params=None):
+    """Build a versioned cache key from a name and optional query parameters."""
+    query = urlencode(sorted(params), doseq=True) if params else ''
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'catalog:{namespace}:{get_version(namespace)}:{name}:{digest}'
+
+
+def cached_call(namespace, name, fetch, params=None, timeout=None):
+    """Return the cached result of fetch(), computing and storing it on a miss."""
+    try:
+        key = make_key(namespace, name, params)
+        value = cache.get(key)
+    except Exception as e:
+        logger.error(f"Catalog cache read failed for '{name}': {str(e)}")
+        return fetch()
+
+    if value is None:
+        value = fetch()
+        try:
+            cache.set(key, value, timeout or settings.CATALOG_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Catalog cache write failed for '{name}': {str(e)}")
+    return value
+
+
+def cached(namespace, name):
+    """Decorator caching a function's result, keyed by its positional arguments."""
+    def decorator(fetch):
+        @wraps(fetch)
+        def wrapper(*args):
+            params = [(f'arg{index}', arg) for index, arg in enumerate(args)]
+            return cached_call(namespace, name, lambda: fetch(*args), params=params)
+        return wrapper
+    return decorator
+
+
+def cache_response(namespace, timeout=None):
+    """
+    Decorator for DRF handler methods that caches successful response data.
+    The key covers the host (serializers may build absolute URLs), the path
+    and the query parameters.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            params = [('host', request.get_host())]
+            params.extend(
+                (name, value)
+                for name, values in request.query_params.lists()
+                for value in values
+            )
+            try:
+                key = make_key(namespace, request.path, params)
+                data = cache.get(key)
+            except Exception as e:
+                logger.error(f"Catalog cache read failed for '{request.path}': {str(e)}")
+                return view_method(self, request, *args, **kwargs)
+
+            if data is not None:
+                return Response(data)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                try:
+                    cache.set(key, response.data, timeout or settings.CATALOG_CACHE_TIMEOUT)
+                except Exception as e:
+                    logger.error(f"Catalog cache write failed for '{request.path}': {str(e)}")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+"""
+Idempotency-Key support for unsafe API endpoints.
+
+A client may send an ``Idempotency-Key`` header with a POST. The first
+request with a key claims it atomically in the cache (``cache.add``) and
+its response is stored for IDEMPOTENCY_KEY_TIMEOUT seconds; retries with
+the same key get the stored response back instead of running the handler
+again. A retry that arrives while the first request is still running (for
+at most IDEMPOTENCY_PROCESSING_TIMEOUT seconds) gets 409 Conflict, and
+reusing a key with a different body gets 422.
+
+Server errors are not stored, so the client can retry them. Requests
+without the header, and any request while the cache is unavailable, are
+handled normally.
+"""
+import hashlib
+import json
+import logging
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+PROCESSING = 'processing'
+DONE = 'done'
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _cache_key(scope, request, key):
+    owner = f'user:{request.user.pk}' if request.user.is_authenticated else 'anonymous'
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'idempotency:{scope}:{owner}:{digest}'
+
+
+def idempotent(scope, timeout=None):
+    """Decorator for DRF handler methods honouring the Idempotency-Key header."""
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            cache_key = _cache_key(scope, request, key)
+            fingerprint = _fingerprint(request)
+            try:
+                claimed = cache.add(
+                    cache_key, {'state': PROCESSING, 'fingerprint': fingerprint}, settings.IDEMPOTENCY_PROCESSING_TIMEOUT
+                )
+                entry = None if claimed else cache.get(cache_key)
+            except Exception as e:
+                logger.error(f"Idempotency store unavailable for '{scope}': {str(e)}")
+                return view_method(self, request, *args, **kwargs)
+
+            if not claimed:
+                if entry is None:
+                    # Expired between add() and get(); treat as a conflict to stay safe
+                    entry = {'state': PROCESSING, 'fingerprint': fingerprint}
+                if entry['fingerprint'] != fingerprint:
+                    return Response(
+                        {'error': f'{HEADER} was already used with a different request body'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                if entry['state'] == PROCESSING:
+                    return Response(
+                        {'error': 'A request with this Idempotency-Key is still being processed'},
+                        status=status.HTTP_409_CONFLICT,
+                        headers={'Retry-After': '1'}
+                    )
+                return Response(entry['data'], status=entry['status'], headers={'Idempotent-Replayed': 'true'})
+
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            except Exception:
+                cache.delete(cache_key)
+                raise
+
+            try:
+                if response.status_code >= 500:
+                    cache.delete(cache_key)
+                else:
+                    cache.set(cache_key, {
+                        'state': DONE,
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'data': response.data,
+                    }, timeout or settings.IDEMPOTENCY_KEY_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Failed to store idempotent response for '{scope}': {str(e)}")
+            return response
+        return wrapper
+    return decorator
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 from decouple import config
 from datetime import timedelta
@@ -92,6 +93,8 @@ INSTALLED_APPS = [
     'backend.cart',
     'backend.blog',
     'backend.dashboard',
+    'backend.notifications',
+    'backend.imaging',
     'social_django',
 ]
 
@@ -113,7 +116,16 @@ MIDDLEWARE = [
     'social_django.middleware.SocialAuthExceptionMiddleware',
 ]
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Mail delivery; the console backend prints emails. For a local stand-in SMTP
+# server run the mailpit service (docker compose --profile mail up) and set
+# EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend, EMAIL_HOST=mailpit, EMAIL_PORT=1025
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@qhenterprises.com')
 
 FRONTEND_URL = 'http://www.qhenterprises.com' 
 
@@ -170,10 +182,75 @@ else:
         }
     }
 
-print(f"Environment: {'PRODUCTION' if PRODUCTION else 'DEVELOPMENT'}")
+print(f"Environment: {'PRODUCTION' if PRODUCTION else 'DEVELOPMENT'}", file=sys.stderr)
 
 # print("database host: ", DATABASES['default']['HOST'])
 
+# Cache Configuration
+if PRODUCTION:
+    # Redis service from docker-compose
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL', default='redis://redis:6379/1'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# How long (seconds) catalog responses stay cached; model signals invalidate them earlier
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=60 * 15, cast=int)
+
+# Per-source timeout (seconds) for template views that fetch their data concurrently
+AGGREGATION_SOURCE_TIMEOUT = config('AGGREGATION_SOURCE_TIMEOUT', default=3.0, cast=float)
+
+# How long (seconds) responses are kept for replays of an Idempotency-Key
+IDEMPOTENCY_KEY_TIMEOUT = config('IDEMPOTENCY_KEY_TIMEOUT', default=60 * 60, cast=int)
+
+# How long (seconds) a claimed Idempotency-Key blocks retries before its request is presumed dead
+IDEMPOTENCY_PROCESSING_TIMEOUT = config('IDEMPOTENCY_PROCESSING_TIMEOUT', default=60, cast=int)
+
+# How long (seconds) stock stays reserved for an unpaid, unconfirmed order
+STOCK_RESERVATION_TIMEOUT = config('STOCK_RESERVATION_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Comma-separated staff addresses alerted about every new order
+ORDER_NOTIFICATION_EMAILS = config('ORDER_NOTIFICATION_EMAILS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
+# Redis list the notification worker blocks on; empty makes it poll the database
+NOTIFICATION_QUEUE_URL = config('NOTIFICATION_QUEUE_URL', default=config('REDIS_URL', default='redis://redis:6379/1') if PRODUCTION else '')
+
+# Notifications sent per mail connection, and seconds the worker waits between polls
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=50, cast=int)
+NOTIFICATION_POLL_INTERVAL = config('NOTIFICATION_POLL_INTERVAL', default=5.0, cast=float)
+
+# Attempts before a notification is marked failed, and seconds before the first retry (doubling)
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=5, cast=int)
+NOTIFICATION_RETRY_DELAY = config('NOTIFICATION_RETRY_DELAY', default=60, cast=int)
+
+# Image worker: images encoded in parallel, images claimed per batch and seconds between polls
+IMAGE_WORKER_PROCESSES = config('IMAGE_WORKER_PROCESSES', default=2, cast=int)
+IMAGE_WORKER_BATCH_SIZE = config('IMAGE_WORKER_BATCH_SIZE', default=20, cast=int)
+IMAGE_WORKER_POLL_INTERVAL = config('IMAGE_WORKER_POLL_INTERVAL', default=5.0, cast=float)
+
+# Widths of the responsive variants (AVIF, WebP, JPEG) generated for each image
+IMAGE_VARIANT_WIDTHS = config(
+    'IMAGE_VARIANT_WIDTHS', default='150,300,600,1200',
+    cast=lambda value: [int(width) for width in value.split(',') if width.strip()]
+)
+
+# Admin changelists of large tables (orders) use estimated counts and cached filter choices
+ADMIN_PERFORMANCE_MODE = config('ADMIN_PERFORMANCE_MODE', default=True, cast=bool)
+
+# Row count above which unfiltered admin changelists use PostgreSQL's estimate
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=10000, cast=int)
+
+# How long (seconds) admin list filter values (e.g. order cities) stay cached
+ADMIN_FILTER_CHOICES_TIMEOUT = config('ADMIN_FILTER_CHOICES_TIMEOUT', default=60 * 10, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -206,6 +283,19 @@ STATIC_ROOT = os.path.join(os.path.dirname(BASE_DIR), 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media files are named by content hash and stored once (see core/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Unreferenced media files younger than this many hours are kept by collect_media_garbage
+MEDIA_GC_MIN_AGE_HOURS = config('MEDIA_GC_MIN_AGE_HOURS', default=24, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,55 @@
+"""
+Content-addressed media storage.
+
+Files are saved in the directory Django chose for them (the field's
+upload_to) under the SHA-256 of their content:
+
+    product_images/9a/9a59d5618527...c4831.jpg
+
+Saving content that is already stored writes nothing and returns the
+existing name, so identical uploads share one file and re-optimizing an
+image to the same bytes reuses it. Since a file may be shared by several
+rows, nothing deletes files when rows change or go away;
+``manage.py collect_media_garbage`` removes the files no row references.
+"""
+import hashlib
+import os
+import posixpath
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+def content_name(name, content):
+    """`name` with its file name replaced by the SHA-256 of `content`, keeping directory and extension."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    hexdigest = digest.hexdigest()
+    directory, filename = posixpath.split(name)
+    extension = os.path.splitext(filename)[1].lower()
+    return posixpath.join(directory, hexdigest[:2], hexdigest + extension)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage naming files by content hash, storing each content once."""
+
+    def __init__(self, **kwargs):
+        # Two concurrent saves of the same content write the same bytes to the same name
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = content_name(name, content)
+        if self.exists(name):
+            try:
+                # A fresh modification time keeps collect_media_garbage away from the reused file
+                os.utime(self.path(name))
+            except OSError:
+                pass
+            return name
+        return super().save(name, content, max_length=max_length)
@@ -6,39 +6,85 @@ from django.contrib.sitemaps import Sitemap
 from django.contrib.sitemaps.views import sitemap
 from backend.products.models import Product
 from backend.blog.models import Blog
+from backend.products import services as product_services
+from backend.reviews import services as review_services
+from backend.blog import services as blog_services
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
-import requests
 from django.conf import settings
+from django.core.paginator import Paginator, InvalidPage
+from .aggregation import AggregatedTemplateView, Source
 from urllib.parse import urljoin
 from datetime import datetime
 
+# Number of products shown in the homepage category tabs
+HOME_PRODUCTS_LIMIT = 10
 
-class HomeView(TemplateView):
+
+def absolutize_images(items, key='image'):
+    """Turn relative media URLs in serialized items into absolute URLs."""
+    for item in items:
+        image = item.get(key)
+        if image:
+            if not image.startswith("http"):
+                item[key] = urljoin(settings.BASE_URL, image)
+        else:
+            item[key] = ''
+    return items
+
+
+def prepare_blogs(blogs):
+    """Absolutize blog images and parse created_at into datetimes."""
+    absolutize_images(blogs)
+    for blog in blogs:
+        created_at = blog.get('created_at')
+        if created_at:
+            try:
+                blog['created_at'] = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+            except ValueError:
+                blog['created_at'] = created_at
+    return blogs
+
+
+class HomeView(AggregatedTemplateView):
     template_name = 'index.html'
+
+    def get_sources(self):
+        return {
+            'products': Source(self.fetch_products, default=list),
+            'featured_products': Source(self.fetch_featured_products, default=list),
+            'newly_added_products': Source(self.fetch_newly_added_products, default=list),
+            'best_seller_products': Source(self.fetch_best_seller_products, default=list),
+            'client_review': Source(self.fetch_client_review, default=list),
+            'blogs': Source(self.fetch_blogs, default=list),
+        }
+
+    def fetch_products(self):
+        #to get all products
+        return absolutize_images(product_services.get_latest_products(HOME_PRODUCTS_LIMIT))
+
+    def fetch_featured_products(self):
+        return absolutize_images(product_services.get_featured_products(), 'product_image')
+
+    def fetch_newly_added_products(self):
+        return absolutize_images(product_services.get_newly_added_products())
+
+    def fetch_best_seller_products(self):
+        return absolutize_images(product_services.get_best_seller_products())
+
+    def fetch_client_review(self):
+        #for testimonial section
+        return absolutize_images(review_services.get_active_reviews())
+
+    def fetch_blogs(self):
+        # Get blogs for the blog section
+        return prepare_blogs(blog_services.get_blog_list())
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        #to get all products
-        response = requests.get(f'{settings.BASE_URL}/api/products/get-all-products/')
-        
-        if response.status_code == 200:
-            data = response.json()
-            products = data.get("results", [])
-        else:
-            products = []
+        products = context.pop('products')
 
-        for product in products:
-            image = product.get('image')
-            if image:
-                if image.startswith("http"):
-                    product['image'] = image
-                else:
-                    product['image'] = urljoin(settings.BASE_URL, image)
-            else:
-                product['image'] = ''
-
-        categorized_products = {
+        context['categorized_products'] = {
             'all_products': products,
             'perfumes': [product for product in products if product['product_type'] == 'perfume'],
             'clothing': [product for product in products if product['product_type'] == 'clothing'],
@@ -47,101 +93,6 @@ class HomeView(TemplateView):
             'watches': [product for product in products if product['product_type'] == 'watches'],
         }
 
-        #to get featured products
-        response = requests.get(f'{settings.BASE_URL}/api/products/get-featured-products/')
-        if response.status_code == 200:
-            featured_products = response.json()
-        else:
-            featured_products = []
-        
-        for product in featured_products:
-            if product['product_image']:
-                if not product['product_image'].startswith("http"):
-                    product['product_image'] = f'{settings.BASE_URL}{product["product_image"]}'
-                else:
-                    product['product_image'] = f'{settings.BASE_URL}{product["product_image"]}' 
-            else:
-                product['product_image'] = ''
-        
-   
-        #to get newly added products
-        response = requests.get(f'{settings.BASE_URL}/api/products/get-newly-added-products/')
-        if response.status_code == 200:
-            newly_added_products = response.json()
-        else:
-            newly_added_products = []
-
-        for product in newly_added_products:
-            if product['image']:
-                if not product['image'].startswith("http"):
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-                else:
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-            else:
-                product['image'] = ''
-        #to get best seller products
-        response = requests.get(f'{settings.BASE_URL}/api/products/get-best-seller-products/')
-        if response.status_code == 200:
-            best_seller_products = response.json()
-        else:
-            best_seller_products = []
-            
-        for product in best_seller_products:
-            if product['image']:
-                if not product['image'].startswith("http"):
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-                else:
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-            else:
-                product['image'] = ''
-                    
-        #for testimonial section
-        response= requests.get(f'{settings.BASE_URL}/api/reviews/active-reviews/')
-        if response.status_code ==200:
-            client_review=response.json()
-        else:
-            client_review= []
-        for product in client_review:
-            if product['image']:
-                if not product['image'].startswith("http"):
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-                else:
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-            else:
-                product['image'] = ''
-        context['categorized_products'] = categorized_products
-        context['featured_products'] = featured_products
-        context['newly_added_products'] = newly_added_products
-        context['best_seller_products'] = best_seller_products
-        context['client_review'] = client_review
-
-        # Get blogs for the blog section
-        response = requests.get(f'{settings.BASE_URL}/api/blog/')
-        if response.status_code == 200:
-            blogs = response.json()
-        else:
-            blogs = []
-        
-        if blogs:
-            for blog in blogs:
-                image = blog.get('image')
-                if image:
-                    if image.startswith("http"):
-                        blog['image'] = image
-                    else:
-                        blog['image'] = f'{settings.BASE_URL}{blog["image"]}'
-                else:
-                    blog['image'] = ''
-                
-                created_at = blog.get('created_at')
-                if created_at:
-                    try:
-                        blog['created_at'] = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except ValueError:
-                        blog['created_at'] = created_at
-        
-        context['blogs'] = blogs
-
         return context
 
 class PageNotFoundView(TemplateView):
@@ -161,163 +112,115 @@ class ContactView(TemplateView):
     template_name = 'contact.html'
 
 
-class ShopView(TemplateView):
+# Products per shop page unless ?page_size= asks for another size (at most 100)
+SHOP_PAGE_SIZE = 6
+
+EMPTY_PAGINATION_INFO = {
+    'count': 0,
+    'pages': 0,
+    'current_page': 1,
+    'has_next': False,
+    'has_previous': False,
+    'next_page': None,
+    'previous_page': None,
+    'page_range': [],
+}
+
+
+class ShopView(AggregatedTemplateView):
     template_name = 'shop.html'
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
+
+    def get_sources(self):
+        return {
+            'product_page': Source(self.fetch_product_page, default=lambda: ([], dict(EMPTY_PAGINATION_INFO))),
+            # Get category filters with counts
+            'side_cat_filters': Source(product_services.get_product_type_counts, default=list),
+            'featured_products': Source(self.fetch_featured_products, default=list),
+        }
+
+    def fetch_product_page(self):
         # Get parameters from request
         page = self.request.GET.get('page', 1)
-        page_size = self.request.GET.get('page_size', 6)  
+        page_size = self.request.GET.get('page_size', SHOP_PAGE_SIZE)
         search = self.request.GET.get('search', '')
         category = self.request.GET.get('category', '')
         min_price = self.request.GET.get('min_price', '')
         max_price = self.request.GET.get('max_price', '')
         
-        # Build API parameters for filtering
-        api_params = {
-            'page': page,
-            'page_size': page_size
-        }
+        filter_params = {}
+        if category:
+            filter_params['product_type'] = category
+        if min_price:
+            filter_params['min_price'] = min_price
+        if max_price:
+            filter_params['max_price'] = max_price
+        if search:
+            filter_params['search'] = search
+
+        try:
+            queryset = product_services.filter_products(filter_params)
+        except product_services.InvalidFilterError:
+            queryset = product_services.get_active_products().none()
+        # Search results keep their relevance order
+        if not search.strip():
+            queryset = queryset.order_by('-created_at', '-id')
+
+        try:
+            # Only the requested page is fetched and serialized
+            page_size = int(page_size)
+            # Zero or negative sizes would break the paginator; use the default instead
+            paginator = Paginator(queryset, min(page_size, 100) if page_size > 0 else SHOP_PAGE_SIZE)
+            page_obj = paginator.page(page)
+        except (InvalidPage, ValueError):
+            return [], dict(EMPTY_PAGINATION_INFO)
+
+        products = absolutize_images(product_services.serialize_products(page_obj.object_list))
+
+        total_count = paginator.count
+        total_pages = paginator.num_pages if total_count else 0
+        current_page = page_obj.number
         
-        # Use the new filtering API if we have specific filters
-        if category or min_price or max_price:
-            filter_params = {}
-            if category:
-                filter_params['product_type'] = category
-            if min_price:
-                filter_params['min_price'] = min_price
-            if max_price:
-                filter_params['max_price'] = max_price
-            if search:
-                filter_params['search'] = search
-                
-            # Use the advanced filtering API
-            response = requests.get(f'{settings.BASE_URL}/api/products/filter-products/', params=filter_params)
-        else:
-            # Use the regular products API with search
-            if search:
-                api_params['search'] = search
-            
-            response = requests.get(f'{settings.BASE_URL}/api/products/get-all-products/', params=api_params)
+        # Generate page range for pagination
+        page_range = list(range(1, total_pages + 1))
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Handle different response formats
-            if 'results' in data:
-                products = data.get("results", [])
-                total_count = data.get('count', 0)
-                
-                # Calculate pagination for filtered results
-                if category or min_price or max_price:
-                    # For filtered results, we'll do client-side pagination
-                    start_idx = (int(page) - 1) * int(page_size)
-                    end_idx = start_idx + int(page_size)
-                    products = products[start_idx:end_idx]
-                    total_pages = (total_count + int(page_size) - 1) // int(page_size)
-                else:
-                    # For regular API, use server pagination
-                    total_pages = data.get('pages', 0)
-            else:
-                products = data
-                total_count = len(products)
-                total_pages = 1
-            
-            current_page = int(page)
-            
-            # Generate page range for pagination
-            page_range = list(range(1, total_pages + 1))
-            
-            pagination_info = {
-                'count': total_count,
-                'pages': total_pages,
-                'current_page': current_page,
-                'has_next': current_page < total_pages,
-                'has_previous': current_page > 1,
-                'next_page': current_page + 1 if current_page < total_pages else None,
-                'previous_page': current_page - 1 if current_page > 1 else None,
-                'page_range': page_range,
-            }
-        else:
-            products = []
-            pagination_info = {
-                'count': 0,
-                'pages': 0,
-                'current_page': 1,
-                'has_next': False,
-                'has_previous': False,
-                'next_page': None,
-                'previous_page': None,
-                'page_range': [],
-            }
+        pagination_info = {
+            'count': total_count,
+            'pages': total_pages,
+            'current_page': current_page,
+            'has_next': current_page < total_pages,
+            'has_previous': current_page > 1,
+            'next_page': current_page + 1 if current_page < total_pages else None,
+            'previous_page': current_page - 1 if current_page > 1 else None,
+            'page_range': page_range,
+        }
+        return products, pagination_info
 
-        # Process product images
-        for product in products:
-            image = product.get('image')
-            if image:
-                if image.startswith("http"):
-                    product['image'] = image
-                else:
-                    product['image'] = urljoin(settings.BASE_URL, image)
-            else:
-                product['image'] = ''
-
-        # Get category filters with counts
-        response = requests.get(f'{settings.BASE_URL}/api/products/get-product-type-count/')
-        if response.status_code == 200:
-            side_cat_filters = response.json()
-        else:
-            side_cat_filters = []
+    def fetch_featured_products(self):
+        return absolutize_images(product_services.get_featured_products(), 'product_image')
 
-        # Get featured products
-        response = requests.get(f'{settings.BASE_URL}/api/products/get-featured-products/')
-        if response.status_code == 200:
-            featured_products = response.json()
-        else:
-            featured_products = []
-        
-        for product in featured_products:
-            if product['product_image']:
-                if not product['product_image'].startswith("http"):
-                    product['product_image'] = f'{settings.BASE_URL}{product["product_image"]}'
-                else:
-                    product['product_image'] = f'{settings.BASE_URL}{product["product_image"]}' 
-            else:
-                product['product_image'] = ''
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        products, pagination_info = context.pop('product_page')
 
         context['products'] = products
         context['pagination_info'] = pagination_info
-        context['side_cat_filters'] = side_cat_filters
-        context['current_search'] = search
-        context['current_category'] = category
-        context['current_min_price'] = min_price
-        context['current_max_price'] = max_price
-        context['featured_products'] = featured_products
+        context['current_search'] = self.request.GET.get('search', '')
+        context['current_category'] = self.request.GET.get('category', '')
+        context['current_min_price'] = self.request.GET.get('min_price', '')
+        context['current_max_price'] = self.request.GET.get('max_price', '')
 
         return context
 
-class TestimonialView(TemplateView):
+class TestimonialView(AggregatedTemplateView):
     template_name = 'testimonial.html'
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        response= requests.get(f'{settings.BASE_URL}/api/reviews/active-reviews/')
-        if response.status_code ==200:
-            client_review=response.json()
-        else:
-            client_review= []
-        for product in client_review:
-            if product['image']:
-                if not product['image'].startswith("http"):
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-                else:
-                    product['image'] = f'{settings.BASE_URL}{product["image"]}'
-            else:
-                product['image'] = ''
-       
-        context['client_review'] = client_review
 
-        return context
+    def get_sources(self):
+        return {
+            'client_review': Source(self.fetch_client_review, default=list),
+        }
+
+    def fetch_client_review(self):
+        return absolutize_images(review_services.get_active_reviews())
 
 class PrivacyPolicyView(TemplateView):
     template_name = 'privacy-policy.html'
@@ -341,81 +244,50 @@ class OAuthSuccessView(TemplateView):
     template_name = 'oauth-success.html'
 
 
-class ProductDetailView(TemplateView):
+class ProductDetailView(AggregatedTemplateView):
     template_name = 'product-detail.html'
+
+    def get_sources(self):
+        product_id = self.kwargs.get('product_id')
+        return {
+            'product_data': Source(lambda: product_services.get_product_data(product_id)),
+            'reviews_data': Source(lambda: product_services.get_product_reviews(product_id)),
+        }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        product_id = self.kwargs.get('product_id')
-        response = requests.get(f'{settings.BASE_URL}/api/products/product-detail/{product_id}/')
-        if response.status_code == 200:
-            product = response.json()
+        product_data = context.pop('product_data')
+        reviews_data = context.pop('reviews_data')
+
+        if product_data is None:
+            context['product'] = {}
         else:
-            product = {}
-        context['product'] = product
+            context['product'] = {
+                'product': product_data,
+                'reviews': reviews_data or {'count': 0, 'average_rating': 0, 'reviews': []}
+            }
         return context
 
 
-class BlogDetailsView(TemplateView):
+class BlogDetailsView(AggregatedTemplateView):
     template_name = 'blog/blog-details.html'
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        blog_id = self.kwargs.get('id')
-        response = requests.get(f'{settings.BASE_URL}/api/blog/{blog_id}/')
-        if response.status_code == 200:
-            blog = response.json()
-        else:
-            blog = None
-        
-        if blog:
-            image = blog.get('image')
-            if image:
-                if image.startswith("http"):
-                    blog['image'] = image
-                else:
-                    blog['image'] = urljoin(settings.BASE_URL, image)
-            else:
-                blog['image'] = ''
-
-            created_at = blog.get('created_at')
-            if created_at:
-                try:
-                    blog['created_at'] = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                except ValueError:
-                    blog['created_at'] = created_at
-        
-        context['blogs'] = [blog] if blog else []
-        return context
 
-class BlogView(TemplateView):
+    def get_sources(self):
+        return {
+            'blogs': Source(self.fetch_blog, default=list),
+        }
+
+    def fetch_blog(self):
+        blog = blog_services.get_blog(self.kwargs.get('id'))
+        return prepare_blogs([blog]) if blog else []
+
+class BlogView(AggregatedTemplateView):
     template_name = 'blog/blog-list.html'
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        response = requests.get(f'{settings.BASE_URL}/api/blog/')
-        if response.status_code == 200:
-            blogs = response.json()
-        else:
-            blogs = []
-        
-        if blogs:
-            for blog in blogs:
-                image = blog.get('image')
-                if image:
-                    if image.startswith("http"):
-                        blog['image'] = image
-                    else:
-                        blog['image'] = urljoin(settings.BASE_URL, image)
-                else:
-                    blog['image'] = ''
-                
-                created_at = blog.get('created_at')
-                if created_at:
-                    try:
-                        blog['created_at'] = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except ValueError:
-                        blog['created_at'] = created_at
-        
-        context['blogs'] = blogs
-        return context
+
+    def get_sources(self):
+        return {
+            'blogs': Source(lambda: prepare_blogs(blog_services.get_blog_list()), default=list),
+        }
 
 class SitemapView(TemplateView):
     def get(self, request, *args, **kwargs):
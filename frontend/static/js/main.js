@@ -410,7 +410,7 @@ function filterClothingProducts() {
     container.html('<div class="col-12 text-center"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Loading...</span></div></div>');
     
     // Build API URL
-    let apiUrl = '/api/products/filter-products/?product_type=clothing';
+    let apiUrl = '/api/products/filter-products/?product_type=clothing&page_size=100';
     
     if (season && season !== 'all') {
         apiUrl += `&season=${season}`;
@@ -420,12 +420,11 @@ function filterClothingProducts() {
         apiUrl += `&gender=${gender}`;
     }
     
-    // Fetch filtered products
-    fetch(apiUrl)
-        .then(response => response.json())
-        .then(data => {
-            if (data.results && data.results.length > 0) {
-                renderClothingProducts(data.results);
+    // Fetch filtered products; results come in pages, so follow the next links
+    fetchAllPages(apiUrl)
+        .then(products => {
+            if (products.length > 0) {
+                renderClothingProducts(products);
             } else {
                 container.html('<div class="col-12 text-center"><p class="text-muted">No products found with the selected filters.</p></div>');
             }
@@ -436,6 +435,15 @@ function filterClothingProducts() {
         });
 }
 
+function fetchAllPages(url, results = []) {
+    return fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            const collected = results.concat(data.results || []);
+            return data.next ? fetchAllPages(data.next, collected) : collected;
+        });
+}
+
 function renderClothingProducts(products) {
     const container = $('#clothingProductsContainer');
     container.empty();